@@ -0,0 +1,62 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from Models.hyperparameter_search import build_pipeline
+from Models.compiled_knn_engine import CompiledKnnEngine
+from Infrastructure.app_constants import AppConstants
+
+
+def load_training_data():
+    data = pd.read_csv(AppConstants.training_data_path).dropna()
+    X = data[AppConstants.feature_columns].to_numpy(dtype=float)
+    y = pd.factorize(data["species"])[0]
+    return X, y
+
+
+def build_queries(X: np.ndarray, count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    mins, maxs = X.min(axis=0), X.max(axis=0)
+    return np.round(rng.uniform(mins, maxs, size=(count, X.shape[1])), 1)
+
+
+def per_call_seconds(predict, queries: np.ndarray, min_seconds: float) -> float:
+    predict(queries)
+    calls, started = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < min_seconds:
+        predict(queries)
+        calls += 1
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sklearn pipeline with the compiled KNN engine")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10_000])
+    parser.add_argument("--n-neighbors", type=int, default=5)
+    parser.add_argument("--weights", default="uniform")
+    parser.add_argument("--metric", default="minkowski")
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    X, y = load_training_data()
+    pipeline = build_pipeline({"n_neighbors": args.n_neighbors, "weights": args.weights, "metric": args.metric},
+                              AppConstants.feature_columns).fit(X, y)
+    engines = {algorithm: CompiledKnnEngine(pipeline, algorithm) for algorithm in CompiledKnnEngine.supported_algorithms}
+
+    print(f"{len(X)} training points, k={args.n_neighbors}, {args.weights} weights, {args.metric} distance")
+    for batch_size in args.batch_sizes:
+        queries = build_queries(X, batch_size)
+        expected = pipeline.predict_proba(queries)
+        baseline = per_call_seconds(pipeline.predict_proba, queries, args.min_seconds)
+        print(f"batch {batch_size:>6} | {'pipeline':>9} {baseline * 1e6:11.1f} us/call")
+
+        for algorithm, engine in engines.items():
+            seconds = per_call_seconds(engine.predict_proba, queries, args.min_seconds)
+            # Other backends may order equidistant neighbours differently from the pipeline's own tree
+            identical = np.array_equal(engine.predict_proba(queries), expected)
+            print(f"batch {batch_size:>6} | {algorithm:>9} {seconds * 1e6:11.1f} us/call | "
+                  f"{baseline / seconds:6.1f}x | identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+from Services.prediction_storage_backend import CsvPredictionStorageBackend, ParquetPredictionStorageBackend, \
+    SqlitePredictionStorageBackend
+
+HEADERS = ["bill_length_mm", "flipper_length_mm", "prediction", "Adelie", "Chinstrap", "Gentoo",
+           "model_version", "prediction_timestamp"]
+SPECIES = np.array(["Adelie", "Chinstrap", "Gentoo"])
+
+
+def build_rows(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    probabilities = rng.dirichlet(np.ones(3), size=count).round(2)
+    bills = rng.uniform(32, 60, size=count).round(1)
+    flippers = rng.uniform(170, 232, size=count).round(1)
+    labels = SPECIES[probabilities.argmax(axis=1)]
+
+    return [
+        {"bill_length_mm": bill, "flipper_length_mm": flipper, "prediction": label,
+         "Adelie": proba[0], "Chinstrap": proba[1], "Gentoo": proba[2],
+         "model_version": "v1.0", "prediction_timestamp": "2025-05-04 20:40:00"}
+        for bill, flipper, label, proba in zip(bills.tolist(), flippers.tolist(), labels.tolist(),
+                                               probabilities.tolist())
+    ]
+
+
+def disk_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run(backend, rows, folder: str, batch_size: int):
+    path = os.path.join(folder, f"predictions{backend.extension}")
+
+    async def append_all():
+        for start in range(0, len(rows), batch_size):
+            await backend.append(path, rows[start:start + batch_size], HEADERS)
+
+    _, append_seconds = timed(asyncio.run, append_all())
+    _, full_seconds = timed(backend.read_frame, [path])
+    _, projected_seconds = timed(backend.read_frame, [path], ["prediction", "Gentoo"])
+    filtered, filtered_seconds = timed(backend.read_frame, [path], ["bill_length_mm", "prediction"],
+                                       [("prediction", "==", "Gentoo"), ("bill_length_mm", ">", 50.0)])
+
+    print(f"{backend.name:>8} {len(rows):>9} rows | append {append_seconds:7.3f}s | full {full_seconds:7.3f}s | "
+          f"projected {projected_seconds:7.3f}s | filtered {filtered_seconds:7.3f}s ({len(filtered)} rows) | "
+          f"{disk_size(path) / 1024 / 1024:7.2f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prediction storage backends")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+
+    backends = [CsvPredictionStorageBackend(),
+                ParquetPredictionStorageBackend(args.compression, compaction_parts=64),
+                SqlitePredictionStorageBackend()]
+    for count in args.rows:
+        rows = build_rows(count)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as folder:
+                run(backend, rows, folder, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class ExecutorConfig(BaseSettings):
+    interactive_thread_workers: int = Field(default=4, env="INTERACTIVE_THREAD_WORKERS")
+    bulk_thread_workers: int = Field(default=2, env="BULK_THREAD_WORKERS")
+    process_workers: int = Field(default=2, env="PROCESS_WORKERS")
+    shadow_thread_workers: int = Field(default=1, env="SHADOW_THREAD_WORKERS")
+
+    class Config:
+        env_file = ".env"
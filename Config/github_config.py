@@ -1,5 +1,4 @@
-from pydantic import Field
-from pydantic.v1 import BaseSettings
+from pydantic.v1 import BaseSettings, Field
 
 
 class GitHubConfig(BaseSettings):
@@ -7,6 +6,15 @@ class GitHubConfig(BaseSettings):
     github_repo: str = Field(..., env="GITHUB_REPO")
     github_token: str = Field(..., env="GITHUB_TOKEN")
     github_branch: str = Field(default="main", env="GITHUB_BRANCH")
+    github_api_url: str = Field(default="https://api.github.com", env="GITHUB_API_URL")
+    github_http2: bool = Field(default=True, env="GITHUB_HTTP2")
+    github_max_connections: int = Field(default=10, env="GITHUB_MAX_CONNECTIONS")
+    github_max_keepalive_connections: int = Field(default=5, env="GITHUB_MAX_KEEPALIVE_CONNECTIONS")
+    github_keepalive_expiry_seconds: float = Field(default=30.0, env="GITHUB_KEEPALIVE_EXPIRY_SECONDS")
+    github_timeout_seconds: float = Field(default=30.0, env="GITHUB_TIMEOUT_SECONDS")
+    github_mirror_enabled: bool = Field(default=True, env="GITHUB_MIRROR_ENABLED")
+    github_conflict_retries: int = Field(default=2, env="GITHUB_CONFLICT_RETRIES")
+    github_bulk_commit_enabled: bool = Field(default=False, env="GITHUB_BULK_COMMIT_ENABLED")
 
     class Config:
         env_file = ".env"
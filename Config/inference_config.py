@@ -0,0 +1,23 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class InferenceConfig(BaseSettings):
+    compiled_inference_enabled: bool = Field(default=True, env="COMPILED_INFERENCE_ENABLED")
+    compiled_knn_algorithm: str = Field(default="auto", env="COMPILED_KNN_ALGORITHM")
+    compiled_inference_max_rows: int = Field(default=4_096, env="COMPILED_INFERENCE_MAX_ROWS")
+    grid_inference_enabled: bool = Field(default=False, env="GRID_INFERENCE_ENABLED")
+    grid_resolution: float = Field(default=0.1, env="GRID_RESOLUTION")
+    grid_max_cells: int = Field(default=2_000_000, env="GRID_MAX_CELLS")
+    file_chunk_size: int = Field(default=50_000, env="FILE_CHUNK_SIZE")
+    pipeline_queue_size: int = Field(default=4, env="PIPELINE_QUEUE_SIZE")
+    micro_batch_enabled: bool = Field(default=False, env="MICRO_BATCH_ENABLED")
+    micro_batch_window_ms: float = Field(default=2.0, env="MICRO_BATCH_WINDOW_MS")
+    micro_batch_max_items: int = Field(default=256, env="MICRO_BATCH_MAX_ITEMS")
+    prediction_cache_size: int = Field(default=10_000, env="PREDICTION_CACHE_SIZE")
+    prediction_cache_ttl_seconds: float = Field(default=3600, env="PREDICTION_CACHE_TTL_SECONDS")
+    prediction_cache_decimals: int = Field(default=1, env="PREDICTION_CACHE_DECIMALS")
+    shared_prediction_cache_enabled: bool = Field(default=False, env="SHARED_PREDICTION_CACHE_ENABLED")
+    shared_prediction_cache_ttl_seconds: int = Field(default=86_400, env="SHARED_PREDICTION_CACHE_TTL_SECONDS")
+
+    class Config:
+        env_file = ".env"
@@ -0,0 +1,10 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class LoggingConfig(BaseSettings):
+    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_queue_size: int = Field(default=10_000, env="LOG_QUEUE_SIZE")
+    log_payload_sample_every: int = Field(default=100, env="LOG_PAYLOAD_SAMPLE_EVERY")
+
+    class Config:
+        env_file = ".env"
@@ -0,0 +1,17 @@
+from typing import Optional
+from pydantic.v1 import BaseSettings, Field
+
+
+class ModelRegistryConfig(BaseSettings):
+    max_loaded_models: int = Field(default=2, env="MODEL_MAX_LOADED")
+    watch_enabled: bool = Field(default=False, env="MODEL_WATCH_ENABLED")
+    watch_interval_seconds: float = Field(default=5.0, env="MODEL_WATCH_INTERVAL_SECONDS")
+    admin_token: Optional[str] = Field(default=None, env="MODEL_ADMIN_TOKEN")
+    shadow_version: Optional[str] = Field(default=None, env="SHADOW_MODEL_VERSION")
+    shadow_sample_rate: float = Field(default=0.1, env="SHADOW_SAMPLE_RATE")
+    shadow_max_pending: int = Field(default=32, env="SHADOW_MAX_PENDING")
+    canary_version: Optional[str] = Field(default=None, env="CANARY_MODEL_VERSION")
+    canary_percent: float = Field(default=0.0, env="CANARY_PERCENT")
+
+    class Config:
+        env_file = ".env"
@@ -0,0 +1,14 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class StorageConfig(BaseSettings):
+    excel_compaction_interval_seconds: float = Field(default=300.0, env="EXCEL_COMPACTION_INTERVAL_SECONDS")
+    sharding_enabled: bool = Field(default=False, env="STORAGE_SHARDING_ENABLED")
+    shard_max_rows: int = Field(default=100_000, env="STORAGE_SHARD_MAX_ROWS")
+    storage_backend: str = Field(default="csv", env="STORAGE_BACKEND")
+    parquet_compression: str = Field(default="zstd", env="PARQUET_COMPRESSION")
+    parquet_compaction_parts: int = Field(default=64, env="PARQUET_COMPACTION_PARTS")
+    sqlite_busy_timeout_seconds: float = Field(default=5.0, env="SQLITE_BUSY_TIMEOUT_SECONDS")
+
+    class Config:
+        env_file = ".env"
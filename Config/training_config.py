@@ -0,0 +1,12 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class TrainingConfig(BaseSettings):
+    search_enabled: bool = Field(default=False, env="TRAINING_SEARCH_ENABLED")
+    cv_folds: int = Field(default=5, env="TRAINING_CV_FOLDS")
+    search_workers: int = Field(default=0, env="TRAINING_SEARCH_WORKERS")
+    search_accuracy_tolerance: float = Field(default=0.005, env="TRAINING_SEARCH_ACCURACY_TOLERANCE")
+    surrogate_model: str = Field(default="", env="TRAINING_SURROGATE_MODEL")
+
+    class Config:
+        env_file = ".env"
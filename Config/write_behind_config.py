@@ -0,0 +1,11 @@
+from pydantic.v1 import BaseSettings, Field
+
+
+class WriteBehindConfig(BaseSettings):
+    flush_interval_seconds: float = Field(default=5.0, env="WRITE_BEHIND_FLUSH_INTERVAL_SECONDS")
+    max_batch_rows: int = Field(default=5_000, env="WRITE_BEHIND_MAX_BATCH_ROWS")
+    max_pending_rows: int = Field(default=100_000, env="WRITE_BEHIND_MAX_PENDING_ROWS")
+    spool_path: str = Field(default="PredictionStorage/write_behind_spool.jsonl", env="WRITE_BEHIND_SPOOL_PATH")
+
+    class Config:
+        env_file = ".env"
@@ -0,0 +1,69 @@
+from typing import Dict
+from fastapi import APIRouter
+from Dtos.Response.service_response import ServiceResponse
+from Core.global_compute_executor import compute_executor
+from Core.global_prediction_cache import prediction_cache, shared_prediction_cache
+from Core.global_prediction_batcher import prediction_batcher
+from Core.global_model_experiments import model_experiments
+from Dtos.Response.metrics_response import WriteBehindQueueStats, ComputePoolStats, PredictionBatcherStats, \
+    PredictionCacheStats, SharedPredictionCacheStats, LogQueueStats, ModelExperimentStats
+from Core.global_prediction_storage import prediction_write_behind_queue
+from Services.logger_service import LoggerService
+
+router = APIRouter()
+
+
+@router.get("/write-behind", summary="Write-behind Queue Stats",
+            description="Backlog and flush statistics of the background GitHub persistence queue.",
+            response_model=ServiceResponse[WriteBehindQueueStats])
+async def get_write_behind_stats():
+    stats = WriteBehindQueueStats(**prediction_write_behind_queue.get_stats())
+    return ServiceResponse(success=True, message="Write-behind queue stats", data=stats)
+
+
+@router.get("/executors", summary="Compute Executor Stats",
+            description="Queue depth and latency of the thread and process pools used for CPU-bound work.",
+            response_model=ServiceResponse[Dict[str, ComputePoolStats]])
+async def get_executor_stats():
+    stats = {name: ComputePoolStats(**pool) for name, pool in compute_executor.get_stats().items()}
+    return ServiceResponse(success=True, message="Compute executor stats", data=stats)
+
+
+@router.get("/micro-batcher", summary="Micro-batcher Stats",
+            description="Batch sizes and queue waits of the /predict-single micro-batcher, for tuning its window.",
+            response_model=ServiceResponse[PredictionBatcherStats])
+async def get_micro_batcher_stats():
+    stats = PredictionBatcherStats(**prediction_batcher.get_stats())
+    return ServiceResponse(success=True, message="Micro-batcher stats", data=stats)
+
+
+@router.get("/prediction-cache", summary="Prediction Cache Stats",
+            description="Size, hit rate and evictions of the in-memory /predict-single cache.",
+            response_model=ServiceResponse[PredictionCacheStats])
+async def get_prediction_cache_stats():
+    stats = PredictionCacheStats(**prediction_cache.get_stats())
+    return ServiceResponse(success=True, message="Prediction cache stats", data=stats)
+
+
+@router.get("/shared-prediction-cache", summary="Shared Prediction Cache Stats",
+            description="Hit rate of the Redis prediction cache shared by all workers, as seen by this worker.",
+            response_model=ServiceResponse[SharedPredictionCacheStats])
+async def get_shared_prediction_cache_stats():
+    stats = SharedPredictionCacheStats(**shared_prediction_cache.get_stats())
+    return ServiceResponse(success=True, message="Shared prediction cache stats", data=stats)
+
+
+@router.get("/logging", summary="Logging Queue Stats",
+            description="Records waiting for the background log writer, and records dropped because its queue was full.",
+            response_model=ServiceResponse[Dict[str, LogQueueStats]])
+async def get_logging_stats():
+    stats = {log_file: LogQueueStats(**queue) for log_file, queue in LoggerService.get_stats().items()}
+    return ServiceResponse(success=True, message="Logging queue stats", data=stats)
+
+
+@router.get("/model-experiments", summary="Shadow and Canary Stats",
+            description="Agreement and latency of the shadow model against the served one, and the canary split.",
+            response_model=ServiceResponse[ModelExperimentStats])
+async def get_model_experiment_stats():
+    stats = ModelExperimentStats(**model_experiments.get_stats())
+    return ServiceResponse(success=True, message="Model experiment stats", data=stats)
@@ -0,0 +1,66 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from Config.model_registry_config import ModelRegistryConfig
+from Services.model_registry_service import ModelRegistryService
+from Dtos.Response.model_response import ModelInfoResponse
+from Dtos.Response.service_response import ServiceResponse
+from Dtos.Response.metrics_response import ModelExperimentStats
+from Dtos.Response.model_registry_response import ModelRegistryResponse
+
+registry_config = ModelRegistryConfig()
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    # Fails closed: without a configured token the admin API is disabled rather than open
+    if not registry_config.admin_token:
+        raise HTTPException(status_code=403, detail="Model admin API is disabled, set MODEL_ADMIN_TOKEN to enable it")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), registry_config.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+model_registry_service = ModelRegistryService()
+
+
+@router.get("", summary="Model Versions", description="Lists the stored model versions and which one is active.",
+            response_model=ServiceResponse[ModelRegistryResponse])
+async def get_models():
+    return await model_registry_service.get_models()
+
+
+@router.put("/shadow", summary="Set Shadow Model",
+            description="Also runs a version on a sample of prediction traffic, off the request path, and compares it "
+                        "with the served answer. Omit the version to stop.",
+            response_model=ServiceResponse[ModelExperimentStats])
+async def set_shadow_model(version: Optional[str] = None, sample_rate: Optional[float] = Query(None, ge=0, le=1)):
+    return await model_registry_service.set_shadow_model(version, sample_rate)
+
+
+@router.put("/canary", summary="Set Canary Model",
+            description="Serves a percentage of prediction traffic with a candidate version. Omit the version to stop.",
+            response_model=ServiceResponse[ModelExperimentStats])
+async def set_canary_model(version: Optional[str] = None, percent: float = Query(0.0, ge=0, le=100)):
+    return await model_registry_service.set_canary_model(version, percent)
+
+
+@router.post("/{version}/activate", summary="Activate Model Version",
+             description="Switches new requests to a stored model version without interrupting in-flight ones.",
+             response_model=ServiceResponse[ModelInfoResponse])
+async def activate_model(version: str):
+    return await model_registry_service.activate_model(version)
+
+
+@router.post("/reload", summary="Reload Model",
+             description="Loads (training if needed) the model for the current training data and activates it.",
+             response_model=ServiceResponse[ModelInfoResponse])
+async def reload_model():
+    return await model_registry_service.reload_model()
+
+
+@router.post("/search", summary="Search and Train Model",
+             description="Runs a cross-validated hyperparameter search on all CPU cores, persists the winner and "
+                         "activates it. The response lists every candidate's accuracy and fit/predict timings.",
+             response_model=ServiceResponse[ModelInfoResponse])
+async def search_model():
+    return await model_registry_service.reload_model(search=True)
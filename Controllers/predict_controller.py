@@ -1,8 +1,11 @@
 from starlette.responses import StreamingResponse
-from fastapi import APIRouter, UploadFile, Depends
+from typing import Optional
+from fastapi import APIRouter, UploadFile, Depends, Query
+from Enums.file_type_enum import FileExportType
 from Services.prediction_service import PredictionService
 from Dtos.Response.service_response import ServiceResponse
-from Dtos.Response.prediction_response import PredictionResponse, BatchPredictionResponse
+from Dtos.Response.prediction_response import PredictionResponse, BatchPredictionResponse, \
+    StoredPredictionShardsResponse, StoredPredictionsPageResponse, FastPredictionResponse
 from Dtos.Request.penguin_input_request import PenguinInputRequest, BatchInputRequest, DownloadPenguinPredictionsRequest
 
 router = APIRouter()
@@ -10,8 +13,13 @@ prediction_service = PredictionService()
 
 
 @router.post("/predict-single", response_model=ServiceResponse[PredictionResponse])
-async def predict_single_penguin(request: PenguinInputRequest):
-    return await prediction_service.predict_single(request)
+async def predict_single_penguin(request: PenguinInputRequest, exact: bool = False):
+    return await prediction_service.predict_single(request, exact)
+
+
+@router.post("/fast", response_model=ServiceResponse[FastPredictionResponse])
+async def predict_fast_penguin(request: PenguinInputRequest):
+    return await prediction_service.predict_fast(request)
 
 
 @router.post("/predict-batch", response_model=ServiceResponse[BatchPredictionResponse])
@@ -28,3 +36,24 @@ async def predict_from_file(file: UploadFile):
 @router.post("/download-predictions", response_model=None)
 async def download_predictions(request: DownloadPenguinPredictionsRequest = Depends()) -> StreamingResponse:
     return await prediction_service.download_penguin_predictions(request.file, request.file_type)
+
+
+@router.get("/stored-predictions/excel", response_model=None)
+async def download_stored_predictions_excel() -> StreamingResponse:
+    return await prediction_service.download_stored_predictions_excel()
+
+
+@router.get("/stored-predictions/export", response_model=None)
+async def export_stored_predictions(file_type: FileExportType = FileExportType.csv) -> StreamingResponse:
+    return await prediction_service.export_stored_predictions(file_type)
+
+
+@router.get("/stored-predictions", response_model=ServiceResponse[StoredPredictionsPageResponse])
+async def get_stored_predictions(page: int = Query(1, ge=1), page_size: int = Query(100, ge=1, le=1000),
+                                 prediction: Optional[str] = None, model_version: Optional[str] = None):
+    return await prediction_service.get_stored_predictions_page(page, page_size, prediction, model_version)
+
+
+@router.get("/stored-predictions/shards", response_model=ServiceResponse[StoredPredictionShardsResponse])
+async def get_stored_prediction_shards():
+    return prediction_service.get_stored_prediction_shards()
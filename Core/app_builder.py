@@ -3,8 +3,11 @@ from fastapi.openapi.docs import get_swagger_ui_html
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 from Core.startup_service import StartupService
-from Core.global_model_loader import model_loader
-from Controllers import predict_controller, model_info_controller
+from Core.global_compute_executor import compute_executor
+from Core.global_prediction_storage import prediction_write_behind_queue, prediction_storage_service, github_uploader
+from Core.global_model_artifact_watcher import model_artifact_watcher
+from Core.global_model_experiments import model_experiments
+from Controllers import predict_controller, model_info_controller, metrics_controller, model_admin_controller
 
 
 def create_app() -> FastAPI:
@@ -23,6 +26,8 @@ def create_app() -> FastAPI:
     # Register routers
     app.include_router(model_info_controller.router, prefix="/api/info", tags=["Overview"])
     app.include_router(predict_controller.router, prefix="/api/predict", tags=["Prediction"])
+    app.include_router(metrics_controller.router, prefix="/api/metrics", tags=["Metrics"])
+    app.include_router(model_admin_controller.router, prefix="/api/admin/models", tags=["Model Registry"])
 
     origins = [
         "http://localhost:4200",
@@ -65,14 +70,22 @@ def create_app() -> FastAPI:
     #         }
     #     )
 
-    # Trigger startup logic (like training model)
+    # Trigger startup logic (like loading or training the model)
     @app.on_event("startup")
     async def on_startup():
         startup_service = StartupService()
         await startup_service.run()
+        await prediction_write_behind_queue.start()
+        await model_artifact_watcher.start()
+        await model_experiments.start()
 
-    @app.on_event("startup")
-    async def load_model_on_startup():
-        await model_loader.load_model()
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await model_artifact_watcher.stop()
+        await model_experiments.drain()
+        await prediction_write_behind_queue.stop()
+        await prediction_storage_service.compact_github_excel(force=True)
+        await github_uploader.close()
+        compute_executor.shutdown()
 
     return app
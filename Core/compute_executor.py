@@ -0,0 +1,108 @@
+import time
+import asyncio
+import functools
+import multiprocessing
+from typing import Any, Callable, Dict, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from Config.executor_config import ExecutorConfig
+from Services.logger_service import LoggerService
+from Utility.latency_histogram import LatencyHistogram
+
+
+class ComputePool:
+    def __init__(self, name: str, kind: str, workers: int, factory: Callable[[], Executor]):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.factory = factory
+        self.executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.latency_ms = LatencyHistogram()
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = self.factory()
+        return self.executor
+
+    def get_stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_ms": self.latency_ms.snapshot()
+        }
+
+
+class ComputeExecutor:
+    # interactive: thread pool for small, latency-sensitive model calls (single predictions)
+    # bulk: thread pool for large GIL-releasing NumPy/sklearn work (batches, files, training)
+    # process: process pool for pandas/Excel work that holds the GIL; falls back to bulk when disabled
+    # shadow: thread pool for shadow-model evaluation, so it never queues ahead of served predictions
+    def __init__(self, config: Optional[ExecutorConfig] = None):
+        self.logger = LoggerService("compute_executor").get_logger()
+        self.config = config or ExecutorConfig()
+
+        self.pools = {
+            "interactive": ComputePool("interactive", "thread", self.config.interactive_thread_workers,
+                                       lambda: ThreadPoolExecutor(self.config.interactive_thread_workers,
+                                                                  thread_name_prefix="interactive")),
+            "bulk": ComputePool("bulk", "thread", self.config.bulk_thread_workers,
+                                lambda: ThreadPoolExecutor(self.config.bulk_thread_workers,
+                                                           thread_name_prefix="bulk")),
+            "shadow": ComputePool("shadow", "thread", self.config.shadow_thread_workers,
+                                  lambda: ThreadPoolExecutor(self.config.shadow_thread_workers,
+                                                             thread_name_prefix="shadow"))
+        }
+
+        if self.config.process_workers > 0:
+            # spawn avoids forking a process that already runs threads (uvicorn, the pools above)
+            self.pools["process"] = ComputePool(
+                "process", "process", self.config.process_workers,
+                lambda: ProcessPoolExecutor(self.config.process_workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            )
+
+    async def run(self, pool_name: str, fn: Callable, *args, **kwargs) -> Any:
+        pool = self.pools.get(pool_name) or self.pools["bulk"]
+        loop = asyncio.get_running_loop()
+
+        pool.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(pool.get_executor(), functools.partial(fn, *args, **kwargs))
+            pool.completed += 1
+            return result
+        except Exception:
+            pool.failed += 1
+            raise
+        finally:
+            pool.in_flight -= 1
+            pool.latency_ms.observe((time.perf_counter() - started) * 1000)
+
+    async def run_interactive(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.run("interactive", fn, *args, **kwargs)
+
+    async def run_bulk(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.run("bulk", fn, *args, **kwargs)
+
+    async def run_shadow(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.run("shadow", fn, *args, **kwargs)
+
+    async def run_process(self, fn: Callable, *args, **kwargs) -> Any:
+        # fn and its arguments must be picklable, i.e. module-level functions and plain data
+        return await self.run("process", fn, *args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            if pool.executor:
+                pool.executor.shutdown(wait=False, cancel_futures=True)
+                pool.executor = None
+        self.logger.info("Compute executor pools shut down")
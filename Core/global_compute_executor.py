@@ -0,0 +1,3 @@
+from Core.compute_executor import ComputeExecutor
+
+compute_executor = ComputeExecutor()
@@ -0,0 +1,4 @@
+from Core.global_model_loader import model_loader
+from Services.model_artifact_watcher import ModelArtifactWatcher
+
+model_artifact_watcher = ModelArtifactWatcher(model_loader)
@@ -0,0 +1,4 @@
+from Core.global_model_loader import model_loader
+from Services.model_experiment_service import ModelExperimentService
+
+model_experiments = ModelExperimentService(model_loader)
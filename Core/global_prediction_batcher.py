@@ -0,0 +1,4 @@
+from Core.global_model_loader import model_loader
+from Services.prediction_batcher import PredictionBatcher
+
+prediction_batcher = PredictionBatcher(model_loader.predict_proba)
@@ -0,0 +1,9 @@
+from Core.global_model_loader import model_loader
+from Services.prediction_cache import PredictionCache
+from Services.shared_prediction_cache import SharedPredictionCache
+
+prediction_cache = PredictionCache()
+model_loader.add_model_listener(prediction_cache.clear)
+
+# Redis keys carry the model artifact key, so a new model never reads the old model's entries
+shared_prediction_cache = SharedPredictionCache()
@@ -0,0 +1,10 @@
+from Services.github_uploader import GitHubUploader
+from Services.prediction_storage_service import PredictionStorageService
+from Services.prediction_write_behind_queue import PredictionWriteBehindQueue
+
+github_uploader = GitHubUploader()
+prediction_storage_service = PredictionStorageService(github_uploader)
+prediction_write_behind_queue = PredictionWriteBehindQueue(
+    prediction_storage_service.upload_prediction_to_github,
+    maintenance_handler=prediction_storage_service.compact_github_excel
+)
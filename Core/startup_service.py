@@ -1,11 +1,12 @@
 import os
-from Models.model_trainer import ModelTrainer
+from Core.global_model_loader import model_loader
 
 
 class StartupService:
     async def run(self):
-        trainer = ModelTrainer()
-        await trainer.train_model()
+        # Loads the persisted artifact when the training data and hyperparameters are unchanged,
+        # and only trains (then persists) the model when they are not
+        await model_loader.load_model()
 
     current_env = os.getenv("ENV", "prod")  # default to "prod"
     if current_env == "dev":
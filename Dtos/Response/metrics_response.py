@@ -0,0 +1,92 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class WriteBehindQueueStats(BaseModel):
+    pending_rows: int
+    max_pending_rows: int
+    pending_high_watermark: int
+    oldest_pending_seconds: float
+    enqueued_rows: int
+    rejected_rows: int
+    flushed_rows: int
+    flushes: int
+    failed_flushes: int
+    last_flush_rows: int
+    last_flush_seconds: float
+
+
+class LatencyHistogramStats(BaseModel):
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    buckets: Dict[str, int]
+
+
+class ComputePoolStats(BaseModel):
+    kind: str
+    workers: int
+    in_flight: int
+    queued: int
+    completed: int
+    failed: int
+    latency_ms: LatencyHistogramStats
+
+
+class PredictionBatcherStats(BaseModel):
+    enabled: bool
+    window_ms: float
+    max_items: int
+    pending: int
+    batches: int
+    items: int
+    failed_batches: int
+    batch_size: LatencyHistogramStats
+    queue_wait_ms: LatencyHistogramStats
+
+
+class PredictionCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class SharedPredictionCacheStats(BaseModel):
+    enabled: bool
+    hits: int
+    misses: int
+    hit_rate: float
+    errors: int
+
+
+class LogQueueStats(BaseModel):
+    queued: int
+    dropped: int
+
+
+class ModelExperimentStats(BaseModel):
+    shadow_version: Optional[str] = None
+    shadow_sample_rate: float
+    canary_version: Optional[str] = None
+    canary_percent: float
+    pending_shadow_requests: int
+    sampled_requests: int
+    skipped_requests: int
+    failed_requests: int
+    compared_rows: int
+    agreed_rows: int
+    canary_requests: int
+    primary_requests: int
+    agreement_rate: float
+    mean_max_probability_delta: float
+    primary_latency_ms: LatencyHistogramStats
+    shadow_latency_ms: LatencyHistogramStats
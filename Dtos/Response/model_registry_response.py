@@ -0,0 +1,15 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ModelVersionResponse(BaseModel):
+    version: str
+    active: bool
+    loaded: bool
+    in_flight: int
+    created_at: Optional[str] = None
+
+
+class ModelRegistryResponse(BaseModel):
+    active_version: Optional[str] = None
+    versions: List[ModelVersionResponse]
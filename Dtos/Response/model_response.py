@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
@@ -14,8 +14,29 @@ class TrainingInfo(BaseModel):
     label_mapping: Dict[int, str]
 
 
+class SearchCandidateResult(BaseModel):
+    n_neighbors: int
+    weights: str
+    metric: str
+    features: List[str]
+    mean_accuracy: float
+    std_accuracy: float
+    fit_ms: float
+    predict_ms: float
+    predict_us_per_row: float
+
+
+class SurrogateInfo(BaseModel):
+    kind: str
+    knn_agreement: float
+    test_accuracy: float
+
+
 class ModelInfoResponse(BaseModel):
     name: str
     description: str
     data_info: DataInfo
     training_info: TrainingInfo
+    model_version: Optional[str] = None
+    search_results: Optional[List[SearchCandidateResult]] = None
+    surrogate: Optional[SurrogateInfo] = None
@@ -1,11 +1,38 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 
 class PredictionResponse(BaseModel):
     prediction: str
     probabilities: Dict[str, float]
+    model_version: Optional[str] = None
+
+
+class FastPredictionResponse(BaseModel):
+    prediction: str
+    surrogate: str
+    model_version: Optional[str] = None
 
 
 class BatchPredictionResponse(BaseModel):
     results: List[PredictionResponse]
+    model_version: Optional[str] = None
+
+
+class PredictionShardResponse(BaseModel):
+    path: str
+    date: Optional[str] = None
+    rows: Optional[int] = None
+
+
+class StoredPredictionShardsResponse(BaseModel):
+    sharded: bool
+    total_rows: Optional[int] = None
+    shards: List[PredictionShardResponse]
+
+
+class StoredPredictionsPageResponse(BaseModel):
+    page: int
+    page_size: int
+    total_rows: int
+    rows: List[Dict[str, Any]]
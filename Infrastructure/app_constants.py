@@ -1,8 +1,15 @@
 class AppConstants:
-    model_version = "v1.0"
     prediction_storage_base = "penguin_predictions"
     base_folder = "PredictionStorage"
     github_csv_path = "Github_Prediction_Storage/predictions.csv"
     github_excel_path = "Github_Prediction_Storage/predictions.xlsx"
+    github_manifest_path = "Github_Prediction_Storage/manifest.json"
+    github_shard_prefix = "Github_Prediction_Storage/shards/predictions"
+    shard_folder = "shards"
     cache_expiry = 14400
     model_info_key = "model:info"
+    prediction_cache_key_prefix = "prediction"
+    training_data_path = "penguins.csv"
+    feature_columns = ["bill_length_mm", "flipper_length_mm"]
+    model_artifact_folder = "ModelArtifacts"
+    active_model_file = "active_model.txt"
@@ -0,0 +1,69 @@
+import numpy as np
+from typing import List, Iterable, Optional
+from Dtos.Request.penguin_input_request import PenguinInputRequest
+from Dtos.Response.prediction_response import PredictionResponse
+
+
+class BatchPredictionResult:
+    def __init__(self, features: np.ndarray, labels: np.ndarray, probabilities: np.ndarray, class_names: np.ndarray,
+                 model_version: Optional[str] = None):
+        self.features = features
+        self.labels = labels
+        self.probabilities = probabilities
+        self.class_names = class_names
+        self.model_version = model_version
+
+    def __len__(self):
+        return len(self.labels)
+
+    def to_responses(self) -> List[PredictionResponse]:
+        class_names = self.class_names.tolist()
+
+        # Values come straight from the model, so validation is skipped when building the response objects
+        return [
+            PredictionResponse.model_construct(prediction=label, probabilities=dict(zip(class_names, row)),
+                                               model_version=self.model_version)
+            for label, row in zip(self.labels.tolist(), self.probabilities.tolist())
+        ]
+
+    def to_rows(self) -> List[list]:
+        # Same columns, in the same order, as a flattened PredictionResponse: label, class probabilities, version
+        return [[label, *row, self.model_version] for label, row in zip(self.labels.tolist(),
+                                                                         self.probabilities.tolist())]
+
+
+class BatchPredictionEngine:
+    def __init__(self, loader, decimals: int = 2):
+        self.loader = loader
+        self.decimals = decimals
+
+    @staticmethod
+    def features_from_records(records: Iterable[PenguinInputRequest]) -> np.ndarray:
+        records = list(records)
+        flat = np.fromiter(
+            (value for record in records for value in (record.bill_length_mm, record.flipper_length_mm)),
+            dtype=float,
+            count=len(records) * 2
+        )
+        return flat.reshape(len(records), 2)
+
+    def predict(self, features: np.ndarray, exact: bool = False, model=None) -> BatchPredictionResult:
+        # model is a leased LoadedModel; without one the loader's active model is used
+        model = model or self.loader
+        features = np.asarray(features, dtype=float)
+
+        # One neighbour search: labels are the argmax of the probabilities, as in KNeighborsClassifier.predict
+        return self.build_result(features, model.predict_proba(features, exact=exact), model)
+
+    def build_result(self, features: np.ndarray, probas: np.ndarray, model=None) -> BatchPredictionResult:
+        model = model or self.loader
+        class_names = model.get_class_names()
+        labels = class_names[probas.argmax(axis=1)]
+
+        return BatchPredictionResult(
+            features=features,
+            labels=labels,
+            probabilities=np.round(probas, self.decimals),
+            class_names=class_names,
+            model_version=model.get_version()
+        )
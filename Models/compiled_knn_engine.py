@@ -0,0 +1,180 @@
+import sklearn
+import threading
+import numpy as np
+from typing import Dict, Optional
+from sklearn.neighbors import KDTree, BallTree
+from Services.logger_service import LoggerService
+
+
+class CompiledKnnEngine:
+    # The fitted StandardScaler + KNeighborsClassifier pipeline reduced to its arrays: scaling, the neighbour
+    # search and the vote are done directly, without sklearn's per-call validation and dispatch
+    supported_algorithms = ("auto", "kd_tree", "ball_tree", "brute")
+    # Private fitted state of KNeighborsClassifier; requirements.txt pins the scikit-learn releases it is known in
+    fitted_attributes = ("_y", "_fit_X", "_fit_method", "_tree", "classes_", "effective_metric_",
+                         "effective_metric_params_")
+
+    def __init__(self, pipeline, algorithm: str = "auto", brute_chunk_rows: int = 1_024,
+                 max_batch_rows: Optional[int] = None):
+        if algorithm not in self.supported_algorithms:
+            raise ValueError(f"Unsupported neighbour search algorithm: {algorithm}")
+
+        self.logger = LoggerService("compiled_knn_engine").get_logger()
+        self.pipeline = pipeline
+        # Above this many rows sklearn's own (chunked, C-level) query is as fast or faster, so it is used instead
+        self.max_batch_rows = max_batch_rows
+        steps = dict(pipeline.named_steps)
+        unknown = set(steps) - {"select", "scaler", "knn"}
+        if unknown:
+            raise ValueError(f"Cannot compile pipeline steps: {sorted(unknown)}")
+
+        knn = steps["knn"]
+        if getattr(knn, "outputs_2d_", False) or callable(knn.weights):
+            raise ValueError("Only single-output KNN with uniform or distance weights can be compiled")
+        try:
+            fitted = {name: getattr(knn, name) for name in self.fitted_attributes}
+        except AttributeError as ex:
+            raise ValueError(f"scikit-learn {sklearn.__version__} does not expose the fitted KNN state: {ex}")
+
+        self.columns = self.selected_columns(steps.get("select"))
+        scaler = steps.get("scaler")
+        self.mean = scaler.mean_ if scaler is not None and scaler.with_mean else None
+        self.scale = scaler.scale_ if scaler is not None and scaler.with_std else None
+
+        self.n_neighbors = knn.n_neighbors
+        self.weights = knn.weights
+        self.labels = np.asarray(fitted["_y"])
+        self.class_count = len(fitted["classes_"])
+        self.metric = fitted["effective_metric_"]
+        self.metric_params = fitted["effective_metric_params_"]
+
+        # "auto" reuses the tree sklearn already built, so neighbours (and their tie order) are the pipeline's own
+        self.algorithm = fitted["_fit_method"] if algorithm == "auto" else algorithm
+        self.tree = None
+        if self.algorithm in ("kd_tree", "ball_tree"):
+            if algorithm == "auto" and fitted["_tree"] is not None:
+                self.tree = fitted["_tree"]
+            else:
+                tree_type = KDTree if self.algorithm == "kd_tree" else BallTree
+                self.tree = tree_type(fitted["_fit_X"], leaf_size=knn.leaf_size, metric=self.metric,
+                                      **self.metric_params)
+        else:
+            self.prepare_brute(np.asarray(fitted["_fit_X"], dtype=float), brute_chunk_rows)
+
+    @staticmethod
+    def selected_columns(selector) -> Optional[np.ndarray]:
+        if selector is None:
+            return None
+        # The unfitted spec still says "passthrough"; the fitted transformers_ wrap it in a FunctionTransformer
+        (_, transformer, columns), = selector.transformers
+        if selector.remainder != "drop":
+            raise ValueError("Only column selection that drops the remainder can be compiled")
+        if transformer != "passthrough":
+            raise ValueError("Only passthrough column selection can be compiled")
+        return np.asarray(columns)
+
+    def prepare_brute(self, fit_X: np.ndarray, chunk_rows: int):
+        minkowski_p = {"euclidean": 2, "manhattan": 1}.get(self.metric, self.metric_params.get("p"))
+        if self.metric not in ("euclidean", "manhattan", "minkowski") or minkowski_p not in (1, 2):
+            raise ValueError(f"Brute force search supports euclidean and manhattan distances, not {self.metric}")
+
+        self.fit_X = fit_X
+        self.p = minkowski_p
+        self.chunk_rows = chunk_rows
+        # Difference and distance buffers are allocated once per thread and reused by every call
+        self.buffers = threading.local()
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        X = np.array(features, dtype=float)
+        if self.columns is not None:
+            X = X[:, self.columns]
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+    def brute_kneighbors(self, X: np.ndarray):
+        if getattr(self.buffers, "distances", None) is None:
+            self.buffers.differences = np.empty((self.chunk_rows, len(self.fit_X)))
+            self.buffers.distances = np.empty((self.chunk_rows, len(self.fit_X)))
+
+        k = self.n_neighbors
+        indices = np.empty((len(X), k), dtype=np.intp)
+        distances = np.empty((len(X), k))
+        for start in range(0, len(X), self.chunk_rows):
+            chunk = X[start:start + self.chunk_rows]
+            differences = self.buffers.differences[:len(chunk)]
+            block = self.buffers.distances[:len(chunk)]
+
+            # Plain differences summed feature by feature, like the trees do, rather than the |a|^2 - 2ab + |b|^2
+            # expansion whose rounding reorders near-ties
+            block.fill(0.0)
+            for column in range(X.shape[1]):
+                np.subtract(chunk[:, column, None], self.fit_X[None, :, column], out=differences)
+                if self.p == 2:
+                    np.square(differences, out=differences)
+                else:
+                    np.abs(differences, out=differences)
+                block += differences
+
+            nearest = np.argpartition(block, k - 1, axis=1)[:, :k] if k < block.shape[1] \
+                else np.tile(np.arange(block.shape[1]), (len(chunk), 1))
+            nearest_distances = np.take_along_axis(block, nearest, axis=1)
+            order = np.lexsort((nearest, nearest_distances), axis=1)
+            indices[start:start + len(chunk)] = np.take_along_axis(nearest, order, axis=1)
+            ordered = np.take_along_axis(nearest_distances, order, axis=1)
+            distances[start:start + len(chunk)] = np.sqrt(ordered) if self.p == 2 else ordered
+        return distances, indices
+
+    def kneighbors(self, X: np.ndarray):
+        if self.tree is not None:
+            return self.tree.query(X, k=self.n_neighbors)
+        return self.brute_kneighbors(X)
+
+    def predict_proba(self, features: np.ndarray, exact: bool = False) -> np.ndarray:
+        if self.max_batch_rows and len(features) > self.max_batch_rows:
+            return self.pipeline.predict_proba(features)
+        return self.compute_proba(features)
+
+    def compute_proba(self, features: np.ndarray) -> np.ndarray:
+        X = self.transform(features)
+        distances, indices = self.kneighbors(X)
+
+        # Same vote as KNeighborsClassifier.predict_proba, in the same order, so the floats match exactly
+        if self.weights == "distance":
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / distances
+            inf_mask = np.isinf(weights)
+            inf_row = np.any(inf_mask, axis=1)
+            weights[inf_row] = inf_mask[inf_row]
+        else:
+            weights = np.ones_like(indices)
+
+        labels = self.labels[indices]
+        rows = np.arange(len(X))
+        probas = np.zeros((len(X), self.class_count))
+        for i in range(labels.shape[1]):
+            probas[rows, labels[:, i]] += weights[:, i]
+        probas /= probas.sum(axis=1)[:, np.newaxis]
+        return probas
+
+    def verify_parity(self, pipeline, features: np.ndarray, sample_rows: int = 5_000, seed: int = 0) \
+            -> Dict[str, float]:
+        rng = np.random.default_rng(seed)
+        features = np.asarray(features, dtype=float)
+        mins, maxs = features.min(axis=0), features.max(axis=0)
+        span = maxs - mins
+        sampled = rng.uniform(mins - 0.1 * span, maxs + 0.1 * span, size=(sample_rows, features.shape[1]))
+        queries = np.vstack([features, np.round(sampled, 1)])
+
+        expected = pipeline.predict_proba(queries)
+        actual = self.compute_proba(queries)
+
+        parity = {
+            "label_agreement": float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))),
+            "max_probability_error": float(np.max(np.abs(expected - actual))),
+            "checked_rows": int(len(queries))
+        }
+        self.logger.info(f"Compiled KNN ({self.algorithm}) parity check against the pipeline: {parity}")
+        return parity
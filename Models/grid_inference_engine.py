@@ -0,0 +1,99 @@
+import numpy as np
+from decimal import Decimal
+from typing import Dict, Tuple
+from Services.logger_service import LoggerService
+
+
+class GridInferenceEngine:
+    def __init__(self, model, training_features: np.ndarray, resolution: float = 0.1, max_cells: int = 2_000_000,
+                 chunk_size: int = 50_000):
+        self.logger = LoggerService("grid_inference_engine").get_logger()
+        self.model = model
+        self.resolution = resolution
+        self.decimals = max(0, -Decimal(str(resolution)).normalize().as_tuple().exponent)
+
+        mins = training_features.min(axis=0)
+        maxs = training_features.max(axis=0)
+        self.lower = np.round(np.floor(mins / resolution) * resolution, self.decimals)
+        self.shape = tuple(int(n) + 1 for n in np.ceil((maxs - self.lower) / resolution))
+
+        cells = int(np.prod(self.shape))
+        if cells > max_cells:
+            raise ValueError(f"Grid of shape {self.shape} has {cells} cells, above the limit of {max_cells}")
+
+        # Axis values are rounded to the client precision so a grid point is bit-identical to the float a client
+        # sends (39.1 rather than 32.1 + 70 * 0.1), which keeps grid lookups identical to the exact pipeline
+        self.axes = [
+            np.round(self.lower[i] + np.arange(self.shape[i]) * resolution, self.decimals)
+            for i in range(len(self.shape))
+        ]
+
+        mesh = np.stack(np.meshgrid(*self.axes, indexing="ij"), axis=-1).reshape(-1, len(self.shape))
+        probas = np.vstack([
+            model.predict_proba(mesh[start:start + chunk_size])
+            for start in range(0, len(mesh), chunk_size)
+        ])
+        self.grid = probas.reshape(*self.shape, probas.shape[1])
+
+        self.logger.info(f"Inference grid built with shape {self.shape} at resolution {resolution} "
+                         f"({self.grid.nbytes / 1_000_000:.1f} MB)")
+
+    def lookup(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        features = np.asarray(features, dtype=float)
+        index = np.rint((features - self.lower) / self.resolution).astype(np.int64)
+
+        in_range = np.all((index >= 0) & (index < np.array(self.shape)), axis=1)
+        clipped = np.clip(index, 0, np.array(self.shape) - 1)
+
+        # Only exact grid points are served from the grid; anything in between falls back to the exact model
+        on_grid = in_range.copy()
+        for axis in range(features.shape[1]):
+            on_grid &= self.axes[axis][clipped[:, axis]] == features[:, axis]
+
+        hits = self.grid[tuple(clipped[on_grid].T)]
+        return hits, on_grid
+
+    def predict_proba(self, features: np.ndarray, exact: bool = False) -> np.ndarray:
+        features = np.asarray(features, dtype=float)
+        if exact:
+            return self.model.predict_proba(features)
+
+        hits, on_grid = self.lookup(features)
+        if on_grid.all():
+            return hits
+
+        probas = np.empty((len(features), self.grid.shape[-1]), dtype=self.grid.dtype)
+        probas[on_grid] = hits
+        probas[~on_grid] = self.model.predict_proba(features[~on_grid])
+        return probas
+
+    def verify_parity(self, pipeline, features: np.ndarray, sample_rows: int = 5_000, seed: int = 0) \
+            -> Dict[str, float]:
+        # Checked against the sklearn pipeline itself, not the model the grid was filled from, on grid points,
+        # points between them and arbitrary floats, both in and around the training range
+        rng = np.random.default_rng(seed)
+        features = np.asarray(features, dtype=float)
+        mins, maxs = features.min(axis=0), features.max(axis=0)
+        span = maxs - mins
+        on_grid = np.column_stack([axis[rng.integers(0, len(axis), sample_rows)] for axis in self.axes])
+        off_grid = rng.uniform(mins - 0.1 * span, maxs + 0.1 * span, size=(sample_rows, features.shape[1]))
+        queries = np.vstack([
+            features,
+            np.round(features, self.decimals),
+            on_grid,
+            np.round(off_grid, self.decimals),
+            np.round(off_grid, self.decimals + 1),
+            off_grid
+        ])
+
+        expected = pipeline.predict_proba(queries)
+        actual = self.predict_proba(queries)
+
+        parity = {
+            "label_agreement": float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))),
+            "max_probability_error": float(np.max(np.abs(expected - actual))),
+            "grid_hit_rate": float(np.mean(self.lookup(queries)[1])),
+            "checked_rows": int(len(queries))
+        }
+        self.logger.info(f"Grid parity check against the sklearn pipeline: {parity}")
+        return parity
@@ -0,0 +1,100 @@
+import os
+import time
+import tempfile
+import itertools
+import multiprocessing
+import joblib
+import numpy as np
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.model_selection import StratifiedKFold
+
+# Module-level and dependency-light so spawned search workers import it cheaply
+
+_shared_arrays: Dict[str, Dict[str, np.ndarray]] = {}
+
+
+def build_pipeline(hyperparameters: Dict[str, Any], feature_columns: List[str]) -> Pipeline:
+    # The served model always receives every feature column; a feature subset is selected inside the pipeline
+    steps = []
+    features = hyperparameters.get("features", feature_columns)
+    if list(features) != list(feature_columns):
+        indices = [feature_columns.index(feature) for feature in features]
+        steps.append(("select", ColumnTransformer([("features", "passthrough", indices)])))
+
+    steps.append(("scaler", StandardScaler()))
+    steps.append(("knn", KNeighborsClassifier(n_neighbors=hyperparameters["n_neighbors"],
+                                              weights=hyperparameters.get("weights", "uniform"),
+                                              metric=hyperparameters.get("metric", "minkowski"))))
+    return Pipeline(steps)
+
+
+def expand_search_space(search_space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = list(search_space)
+    return [dict(zip(names, values)) for values in itertools.product(*(search_space[name] for name in names))]
+
+
+def load_shared_arrays(path: str) -> Dict[str, np.ndarray]:
+    # Memory-mapped read-only, so every worker shares the same page-cache copy of the training data
+    if path not in _shared_arrays:
+        _shared_arrays[path] = joblib.load(path, mmap_mode="r")
+    return _shared_arrays[path]
+
+
+def evaluate_candidate(data_path: str, candidate: Dict[str, Any], feature_columns: List[str], folds: int,
+                       random_state: int) -> Dict[str, Any]:
+    data = load_shared_arrays(data_path)
+    X, y = data["X"], data["y"]
+    accuracies, fit_ms, predict_ms, rows = [], [], [], 0
+
+    for train_index, test_index in StratifiedKFold(folds, shuffle=True, random_state=random_state).split(X, y):
+        model = build_pipeline(candidate, feature_columns)
+
+        started = time.perf_counter()
+        model.fit(X[train_index], y[train_index])
+        fit_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        predicted = model.predict(X[test_index])
+        predict_ms.append((time.perf_counter() - started) * 1000)
+
+        accuracies.append(float(np.mean(predicted == y[test_index])))
+        rows += len(test_index)
+
+    return {
+        **candidate,
+        "mean_accuracy": round(float(np.mean(accuracies)), 4),
+        "std_accuracy": round(float(np.std(accuracies)), 4),
+        "fit_ms": round(float(np.mean(fit_ms)), 3),
+        "predict_ms": round(float(np.mean(predict_ms)), 3),
+        "predict_us_per_row": round(sum(predict_ms) * 1000 / rows, 3)
+    }
+
+
+def run_search(X: np.ndarray, y: np.ndarray, search_space: Dict[str, List[Any]], feature_columns: List[str],
+               folds: int = 5, random_state: int = 0, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    candidates = expand_search_space(search_space)
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+
+    handle, data_path = tempfile.mkstemp(suffix=".joblib")
+    os.close(handle)
+    try:
+        # The data is written once, uncompressed, and memory-mapped by the workers instead of pickled per task
+        joblib.dump({"X": np.ascontiguousarray(X, dtype=float), "y": np.asarray(y)}, data_path)
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(evaluate_candidate, data_path, candidate, feature_columns, folds, random_state)
+                       for candidate in candidates]
+            return [future.result() for future in futures]
+    finally:
+        os.remove(data_path)
+
+
+def select_candidate(results: List[Dict[str, Any]], tolerance: float = 0.0) -> Dict[str, Any]:
+    # Among candidates within tolerance of the best accuracy, the fastest to predict wins
+    best_accuracy = max(result["mean_accuracy"] for result in results)
+    contenders = [result for result in results if result["mean_accuracy"] >= best_accuracy - tolerance]
+    return min(contenders, key=lambda result: (result["predict_us_per_row"], -result["mean_accuracy"]))
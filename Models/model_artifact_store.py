@@ -0,0 +1,105 @@
+import os
+import glob
+import json
+import joblib
+import hashlib
+import sklearn
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+from Services.logger_service import LoggerService
+from Infrastructure.app_constants import AppConstants
+
+
+class ModelArtifactStore:
+    # Bump when the payload layout changes so stale artifacts are retrained instead of misread
+    artifact_format_version = 2
+    artifact_prefix = "penguins_knn_"
+    artifact_suffix = ".joblib"
+
+    def __init__(self, artifact_folder: Optional[str] = None):
+        self.logger = LoggerService("model_artifact_store").get_logger()
+        self.constants = AppConstants
+        self.artifact_folder = artifact_folder or self.constants.model_artifact_folder
+        os.makedirs(self.artifact_folder, exist_ok=True)
+
+    def compute_artifact_key(self, training_data_path: str, hyperparameters: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        with open(training_data_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+        # The sklearn version is part of the key because pickled estimators are not portable across releases
+        digest.update(json.dumps(hyperparameters, sort_keys=True).encode("utf-8"))
+        digest.update(f"sklearn={sklearn.__version__};format={self.artifact_format_version}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def artifact_path(self, artifact_key: str) -> str:
+        return os.path.join(self.artifact_folder, f"{self.artifact_prefix}{artifact_key}{self.artifact_suffix}")
+
+    def exists(self, artifact_key: str) -> bool:
+        return os.path.exists(self.artifact_path(artifact_key))
+
+    def active_key_path(self) -> str:
+        return os.path.join(self.artifact_folder, self.constants.active_model_file)
+
+    def list_artifacts(self) -> Dict[str, str]:
+        # Artifact key -> modification time, oldest first
+        paths = sorted(glob.glob(self.artifact_path("*")), key=os.path.getmtime)
+        return {
+            os.path.basename(path)[len(self.artifact_prefix):-len(self.artifact_suffix)]:
+                datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
+            for path in paths
+        }
+
+    def read_active_pointer(self) -> Tuple[Optional[str], Optional[str]]:
+        # The active version, and the key derived from the training data and hyperparameters when it was activated
+        try:
+            with open(self.active_key_path(), encoding="utf-8") as f:
+                lines = f.read().split()
+        except FileNotFoundError:
+            return None, None
+        version, basis_key = (lines + [None, None])[:2]
+        return version, basis_key
+
+    def read_active_key(self) -> Optional[str]:
+        return self.read_active_pointer()[0]
+
+    def write_active_key(self, artifact_key: str, basis_key: Optional[str] = None):
+        # Every worker watches this pointer, so activating a version here switches all of them
+        path = self.active_key_path()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(artifact_key if basis_key is None else f"{artifact_key}\n{basis_key}")
+        os.replace(temp_path, path)
+
+    def load(self, artifact_key: str) -> Optional[Dict[str, Any]]:
+        path = self.artifact_path(artifact_key)
+        if not os.path.exists(path):
+            self.logger.info(f"No model artifact found for key {artifact_key}")
+            return None
+
+        try:
+            # Uncompressed artifacts let joblib memory-map the numpy buffers instead of copying them
+            artifact = joblib.load(path, mmap_mode="r")
+            self.logger.info(f"Model artifact loaded from {path}")
+            return artifact
+        except Exception as e:
+            self.logger.warning(f"Could not load model artifact {path}, it will be rebuilt: {e}")
+            return None
+
+    def save(self, artifact_key: str, artifact: Dict[str, Any]) -> str:
+        path = self.artifact_path(artifact_key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        payload = {
+            **artifact,
+            "artifact_key": artifact_key,
+            "artifact_format_version": self.artifact_format_version,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+        # Write to a temp file and rename so concurrent workers never read a half-written artifact
+        joblib.dump(payload, temp_path)
+        os.replace(temp_path, path)
+        self.logger.info(f"Model artifact saved to {path}")
+        return path
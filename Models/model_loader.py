@@ -1,38 +1,293 @@
 import asyncio
+import numpy as np
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
 from Models.model_trainer import ModelTrainer
+from Config.inference_config import InferenceConfig
+from Config.model_registry_config import ModelRegistryConfig
+from Services.logger_service import LoggerService
+from Models.model_artifact_store import ModelArtifactStore
+from Models.grid_inference_engine import GridInferenceEngine
+from Models.compiled_knn_engine import CompiledKnnEngine
+from Infrastructure.app_constants import AppConstants
+from Core.global_compute_executor import compute_executor
 from Dtos.Response.model_response import ModelInfoResponse
 
 
+class ModelVersionUnavailableError(ValueError):
+    pass
+
+
+class LoadedModel:
+    # Everything one model version needs to serve predictions. Requests hold a reference to it for their whole
+    # duration, so a swap never mixes the estimator of one version with the labels of another
+    def __init__(self, version: str, model, label_encoder, info_response: ModelInfoResponse, training_features,
+                 created_at: Optional[str] = None, surrogate=None):
+        self.version = version
+        self.model = model
+        self.label_encoder = label_encoder
+        self.class_names = np.asarray(label_encoder.classes_)
+        self.info_response = info_response
+        self.training_features = training_features
+        self.created_at = created_at
+        self.surrogate = surrogate
+        self.compiled_engine = None
+        self.inference_engine = None
+        self.in_flight = 0
+
+    def predict_proba(self, features: np.ndarray, exact: bool = False) -> np.ndarray:
+        if self.inference_engine:
+            return self.inference_engine.predict_proba(features, exact=exact)
+        # The compiled engine returns the pipeline's probabilities bit for bit, so it also serves exact requests.
+        # It hands batches above COMPILED_INFERENCE_MAX_ROWS back to the pipeline
+        if self.compiled_engine:
+            return self.compiled_engine.predict_proba(features)
+        return self.model.predict_proba(features)
+
+    def get_class_names(self) -> np.ndarray:
+        return self.class_names
+
+    def get_version(self) -> str:
+        return self.version
+
+
 class ModelLoader:
     def __init__(self):
-        self.model = None
-        self.label_encoder = None
-        self.info_response = None
+        self.logger = LoggerService("model_loader").get_logger()
+        self.config = InferenceConfig()
+        self.registry_config = ModelRegistryConfig()
+        self.artifact_store = ModelArtifactStore()
+        self.model_listeners = []
+        # Loaded versions stay warm for fast switching; the active one is replaced by a single reference swap
+        self.models: Dict[str, LoadedModel] = {}
+        self.active: Optional[LoadedModel] = None
+        # Versions in use by shadow/canary evaluation are never unloaded
+        self.pinned = set()
         self._loading_lock = asyncio.Lock()
-        self._is_loaded = False
 
     async def load_model(self) -> ModelInfoResponse:
+        if self.active:
+            return self.active.info_response
+
+        async with self._loading_lock:
+            if not self.active:
+                # A version activated earlier (by any worker) wins over the one derived from the training data,
+                # unless the training data or hyperparameters have changed since it was activated
+                version, basis_key = await compute_executor.run_bulk(self.artifact_store.read_active_pointer)
+                current_key = await compute_executor.run_bulk(self.current_artifact_key)
+                loaded = None
+                if version and current_key in (basis_key, version):
+                    loaded = await self.load_version(version)
+                elif version:
+                    self.logger.warning(f"Training data or hyperparameters changed since {version} was activated, "
+                                        f"serving the model for the current data ({current_key}) instead")
+
+                if not loaded:
+                    loaded = await self.load_current()
+                    if version:
+                        await compute_executor.run_bulk(self.artifact_store.write_active_key, loaded.version,
+                                                        current_key)
+                self.swap(loaded)
+            return self.active.info_response
+
+    async def reload(self, search: Optional[bool] = None) -> ModelInfoResponse:
+        # Re-derives the version from the training data and hyperparameters, training it if it is new.
+        # search=True runs the cross-validated hyperparameter search and serves its winner
+        async with self._loading_lock:
+            self.swap(await self.load_current(search))
+            await self.persist_active()
+            return self.active.info_response
+
+    async def activate(self, version: str, persist: bool = True) -> ModelInfoResponse:
+        async with self._loading_lock:
+            if not self.active or self.active.version != version:
+                loaded = await self.load_version(version)
+                if not loaded:
+                    raise ModelVersionUnavailableError(f"Model version {version} is not available")
+                self.swap(loaded)
+            if persist:
+                await self.persist_active()
+            return self.active.info_response
+
+    async def persist_active(self):
+        # The pointer records which training data it was chosen for, so a later data change is not masked by it
+        current_key = await compute_executor.run_bulk(self.current_artifact_key)
+        await compute_executor.run_bulk(self.artifact_store.write_active_key, self.active.version, current_key)
+
+    def current_artifact_key(self, trainer: Optional[ModelTrainer] = None) -> str:
+        trainer = trainer or ModelTrainer()
+        return self.artifact_store.compute_artifact_key(AppConstants.training_data_path,
+                                                        trainer.get_artifact_parameters())
+
+    async def load_current(self, search: Optional[bool] = None) -> LoadedModel:
+        trainer = ModelTrainer(search=search)
+        artifact_key = await compute_executor.run_bulk(self.current_artifact_key, trainer)
+        loaded = await self.load_version(artifact_key)
+        if loaded:
+            return loaded
+
+        info_response = await trainer.train_model()
+        await compute_executor.run_bulk(self.artifact_store.save, artifact_key, {
+            "model": trainer.get_model(),
+            "label_encoder": trainer.get_label_encoder(),
+            "info": info_response.model_dump(),
+            "hyperparameters": trainer.get_hyperparameters(),
+            "training_features": trainer.get_training_features(),
+            "surrogate": trainer.get_surrogate()
+        })
+        print("Model trained and cached")
+        return await self.load_version(artifact_key)
+
+    async def load_version(self, version: str) -> Optional[LoadedModel]:
+        if version in self.models:
+            return self.models[version]
+
+        artifact = await compute_executor.run_bulk(self.artifact_store.load, version)
+        if not artifact:
+            return None
+
+        loaded = LoadedModel(version, artifact["model"], artifact["label_encoder"],
+                             ModelInfoResponse(**{**artifact["info"], "model_version": version}),
+                             artifact["training_features"], artifact.get("created_at"), artifact.get("surrogate"))
+        loaded.compiled_engine = await compute_executor.run_bulk(self.build_compiled_engine, loaded)
+        loaded.inference_engine = await compute_executor.run_bulk(self.build_inference_engine, loaded)
+        self.models[version] = loaded
+        print("Model loaded from artifact store")
+        return loaded
+
+    def swap(self, loaded: LoadedModel):
+        previous, self.active = self.active, loaded
+        if previous is loaded:
+            return
+
+        self.logger.info(f"Active model is now {loaded.version}" +
+                         (f" (was {previous.version}, {previous.in_flight} requests in flight)" if previous else ""))
+        self.evict_drained()
+        for listener in self.model_listeners:
+            listener(loaded.version)
+
+    def evict_drained(self):
+        # Inactive versions beyond the warm limit are dropped once no request holds them any more
+        inactive = [model for model in self.models.values()
+                    if model is not self.active and model.version not in self.pinned]
+        excess = len(self.models) - max(1, self.registry_config.max_loaded_models)
+        for model in inactive:
+            if excess <= 0:
+                break
+            if model.in_flight == 0:
+                del self.models[model.version]
+                excess -= 1
+                self.logger.info(f"Model {model.version} drained and unloaded")
+
+    async def pin(self, version: str) -> LoadedModel:
         async with self._loading_lock:
-            if self._is_loaded:
-                return self.info_response
+            loaded = await self.load_version(version)
+            if not loaded:
+                raise ModelVersionUnavailableError(f"Model version {version} is not available")
+            self.pinned.add(version)
+            return loaded
+
+    def unpin(self, version: str):
+        self.pinned.discard(version)
+        self.evict_drained()
+
+    @contextmanager
+    def lease(self, version: Optional[str] = None) -> Iterator[LoadedModel]:
+        model = self.models.get(version) if version else self.active
+        if model is None:
+            # An unpinned version can be evicted between choosing it and leasing it
+            raise ModelVersionUnavailableError(f"Model version {version} is not loaded" if version
+                                               else "No model is loaded")
+        model.in_flight += 1
+        try:
+            yield model
+        finally:
+            model.in_flight -= 1
+            if model is not self.active and model.in_flight == 0:
+                self.evict_drained()
+
+    def build_compiled_engine(self, loaded: LoadedModel):
+        if not self.config.compiled_inference_enabled:
+            return None
+
+        algorithms = [self.config.compiled_knn_algorithm]
+        if algorithms[0] != "auto":
+            algorithms.append("auto")
 
-            trainer = ModelTrainer()
-            self.info_response = await trainer.train_model()
-            self.model = trainer.get_model()
-            self.label_encoder = trainer.get_label_encoder()
-            self._is_loaded = True
+        for algorithm in algorithms:
+            try:
+                engine = CompiledKnnEngine(loaded.model, algorithm=algorithm,
+                                           max_batch_rows=self.config.compiled_inference_max_rows)
+                parity = engine.verify_parity(loaded.model, loaded.training_features)
+                # Anything short of identical probabilities (e.g. another backend ordering tied neighbours
+                # differently) means this backend is not used
+                if parity["max_probability_error"] == 0.0:
+                    return engine
+                self.logger.warning(f"Compiled KNN ({algorithm}) disagrees with the pipeline: {parity}")
+            except Exception as ex:
+                # Includes a scikit-learn release whose fitted KNN internals differ: the model still loads
+                self.logger.warning(f"Compiled KNN ({algorithm}) unavailable: {ex}")
 
-            print("Model trained and cached")
-            return self.info_response
+        self.logger.warning("Compiled inference disabled, falling back to the sklearn pipeline")
+        return None
+
+    def build_inference_engine(self, loaded: LoadedModel):
+        if not self.config.grid_inference_enabled:
+            return None
+
+        try:
+            # The grid is filled (and falls back) through the compiled engine when there is one
+            engine = GridInferenceEngine(loaded.compiled_engine or loaded.model, loaded.training_features,
+                                         resolution=self.config.grid_resolution, max_cells=self.config.grid_max_cells)
+            parity = engine.verify_parity(loaded.model, loaded.training_features)
+            if parity["label_agreement"] < 1.0 or parity["max_probability_error"] > 0.0:
+                self.logger.warning(f"Grid inference disabled, it disagrees with the sklearn pipeline: {parity}")
+                return None
+            return engine
+        except Exception as ex:
+            self.logger.warning(f"Grid inference disabled, falling back to the exact pipeline: {ex}")
+            return None
+
+    def add_model_listener(self, listener: Callable[[str], None]):
+        # Called with the new version (artifact key) whenever the active model changes, e.g. to drop derived caches
+        self.model_listeners.append(listener)
+
+    def get_versions(self) -> List[Dict]:
+        available = self.artifact_store.list_artifacts()
+        return [
+            {
+                "version": version,
+                "active": bool(self.active) and self.active.version == version,
+                "loaded": version in self.models,
+                "in_flight": self.models[version].in_flight if version in self.models else 0,
+                "created_at": created_at
+            }
+            for version, created_at in available.items()
+        ]
+
+    def predict_proba(self, features: np.ndarray, exact: bool = False) -> np.ndarray:
+        return self.active.predict_proba(features, exact=exact)
 
     def get_model(self):
-        return self.model
+        return self.active.model if self.active else None
 
     def get_label_encoder(self):
-        return self.label_encoder
+        return self.active.label_encoder if self.active else None
+
+    def get_class_names(self) -> np.ndarray:
+        return self.active.class_names if self.active else None
 
     def get_info_response(self):
-        return self.info_response
+        return self.active.info_response if self.active else None
+
+    def get_artifact_key(self):
+        return self.active.version if self.active else None
+
+    def get_version(self):
+        return self.get_artifact_key()
+
+    def get_inference_engine(self):
+        return self.active.inference_engine if self.active else None
 
     def is_loaded(self):
-        return self._is_loaded
+        return self.active is not None
@@ -1,45 +1,90 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from sklearn.pipeline import Pipeline
+from typing import Optional, Dict, Any, List
 from sklearn.metrics import accuracy_score
 from Services.logger_service import LoggerService
-from sklearn.neighbors import KNeighborsClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from Dtos.Response.model_response import ModelInfoResponse, TrainingInfo, DataInfo
+from Infrastructure.app_constants import AppConstants
+from Config.training_config import TrainingConfig
+from Core.global_compute_executor import compute_executor
+from sklearn.preprocessing import LabelEncoder
+from Models.surrogate_model import create_surrogate
+from Models.hyperparameter_search import build_pipeline, run_search, select_candidate
+from Dtos.Response.model_response import ModelInfoResponse, TrainingInfo, DataInfo, SearchCandidateResult, \
+    SurrogateInfo
 
 
 class ModelTrainer:
-    def __init__(self):
+    default_hyperparameters = {
+        "n_neighbors": 11,
+        "features": AppConstants.feature_columns,
+        "random_state": 0
+    }
+
+    # Features are limited to subsets of the request fields, since the served model only ever receives those
+    search_space = {
+        "n_neighbors": [1, 3, 5, 7, 9, 11, 15, 21],
+        "weights": ["uniform", "distance"],
+        "metric": ["euclidean", "manhattan"],
+        "features": [AppConstants.feature_columns] + [[feature] for feature in AppConstants.feature_columns]
+    }
+
+    def __init__(self, hyperparameters: Optional[Dict[str, Any]] = None, search: Optional[bool] = None):
         self.logger = LoggerService("training_logger").get_logger()
+        self.constants = AppConstants
+        self.config = TrainingConfig()
+        self.search = self.config.search_enabled if search is None else search
+        self.hyperparameters = {**self.default_hyperparameters, **(hyperparameters or {})}
+        self.search_results: Optional[List[Dict[str, Any]]] = None
+        self.surrogate_kind = self.config.surrogate_model
+        self.surrogate = None
+        self.surrogate_info = None
         self.label_encoder = LabelEncoder()
         self.model = None
+        self.training_features = None
         self.data_info = None
         self.training_info = None
 
     async def train_model(self) -> ModelInfoResponse:
-        raw_data = pd.read_csv('penguins.csv')
+        # Fitting and scoring are CPU-bound, so they run on the bulk pool instead of the event loop
+        return await compute_executor.run_bulk(self.fit)
+
+    def fit(self) -> ModelInfoResponse:
+        raw_data = pd.read_csv(self.constants.training_data_path)
         initial_rows = len(raw_data)
         data = raw_data.dropna()
         cleaned_rows = len(data)
         dropped_rows = initial_rows - cleaned_rows
 
-        X = data[["bill_length_mm", "flipper_length_mm"]]
+        X = data[self.constants.feature_columns]
+        self.training_features = X.to_numpy(dtype=float)
         self.label_encoder.fit(data["species"])
         y = self.label_encoder.transform(data["species"])
 
-        X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, random_state=0)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y,
+                                                            random_state=self.hyperparameters["random_state"])
 
-        clf = Pipeline([
-            ("scaler", StandardScaler()),
-            ("knn", KNeighborsClassifier(n_neighbors=11))
-        ])
+        if self.search:
+            # Cross-validated on the training split only, so the test accuracy below stays a held-out estimate
+            self.search_results = run_search(X_train.to_numpy(dtype=float), y_train, self.search_space,
+                                             self.constants.feature_columns, folds=self.config.cv_folds,
+                                             random_state=self.hyperparameters["random_state"],
+                                             workers=self.config.search_workers or None)
+            winner = select_candidate(self.search_results, self.config.search_accuracy_tolerance)
+            self.hyperparameters = {**self.hyperparameters, **{name: winner[name] for name in self.search_space}}
+            self.search_results.sort(key=lambda result: (-result["mean_accuracy"], result["predict_us_per_row"]))
+
+        clf = build_pipeline(self.hyperparameters, self.constants.feature_columns)
         clf.fit(X_train, y_train)
         self.model = clf
 
         train_accuracy = accuracy_score(y_train, clf.predict(X_train))
         test_accuracy = accuracy_score(y_test, clf.predict(X_test))
 
+        if self.surrogate_kind:
+            self.distil_surrogate(X_train.to_numpy(dtype=float), X_test.to_numpy(dtype=float), y_test)
+
         label_mapping = {i: species for i, species in enumerate(self.label_encoder.classes_)}
 
         self.data_info = DataInfo(
@@ -60,6 +105,7 @@ class ModelTrainer:
         Rows loaded      : {initial_rows}
         Rows after clean : {cleaned_rows}
         Rows dropped     : {dropped_rows}
+        Hyperparameters  : {self.hyperparameters}
         Train Accuracy   : {round(train_accuracy, 3)}
         Test Accuracy    : {round(test_accuracy, 3)}
         Label Mapping    : {label_mapping}
@@ -67,16 +113,54 @@ class ModelTrainer:
         """
         self.logger.info("Model training completed.\n")
         self.logger.info(summary.strip())
+        if self.search_results:
+            self.logger.info(f"Hyperparameter search evaluated {len(self.search_results)} candidates, best 5:\n" +
+                             "\n".join(str(result) for result in self.search_results[:5]))
 
         return ModelInfoResponse(
             name="Penguins Prediction",
             description="Predict penguin species based on bill length and flipper length.",
             data_info=self.data_info,
-            training_info=self.training_info
+            training_info=self.training_info,
+            search_results=[SearchCandidateResult(**result) for result in self.search_results]
+            if self.search_results else None,
+            surrogate=self.surrogate_info
+        )
+
+    def distil_surrogate(self, X_train, X_test, y_test):
+        # The surrogate learns the KNN's probabilities rather than the species labels, and is judged on how often
+        # it names the same species as the KNN on the held-out split
+        self.surrogate = create_surrogate(self.surrogate_kind).fit(X_train, self.model.predict_proba(X_train))
+        knn_labels = self.model.predict(X_test)
+
+        self.surrogate_info = SurrogateInfo(
+            kind=self.surrogate_kind,
+            knn_agreement=round(self.surrogate.agreement(X_test, knn_labels), 3),
+            test_accuracy=round(float(np.mean(self.surrogate.predict(X_test) == y_test)), 3)
         )
+        self.logger.info(f"Distilled {self.surrogate_kind} surrogate: {self.surrogate_info.model_dump()}")
 
     def get_model(self):
         return self.model
 
     def get_label_encoder(self):
         return self.label_encoder
+
+    def get_training_features(self):
+        return self.training_features
+
+    def get_surrogate(self):
+        return self.surrogate
+
+    def get_hyperparameters(self) -> Dict[str, Any]:
+        return self.hyperparameters
+
+    def get_artifact_parameters(self) -> Dict[str, Any]:
+        # A searched model is identified by its search space, since the winner is only known after training
+        parameters = self.hyperparameters
+        if self.search:
+            parameters = {**parameters, "search_space": self.search_space, "cv_folds": self.config.cv_folds,
+                          "search_accuracy_tolerance": self.config.search_accuracy_tolerance}
+        if self.surrogate_kind:
+            parameters = {**parameters, "surrogate_model": self.surrogate_kind}
+        return parameters
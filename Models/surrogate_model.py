@@ -0,0 +1,119 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict
+
+
+class SurrogateModel(ABC):
+    # A small parametric stand-in distilled from the KNN's probabilities. Evaluating it is a couple of NumPy
+    # products over the two features, with no neighbour scan, so it only answers the top label quickly
+    kind = None
+
+    @abstractmethod
+    def fit(self, features: np.ndarray, teacher_probas: np.ndarray) -> "SurrogateModel":
+        pass
+
+    @abstractmethod
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        pass
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.decision_function(np.asarray(features, dtype=float)).argmax(axis=1)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(np.asarray(features, dtype=float))
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def agreement(self, features: np.ndarray, teacher_labels: np.ndarray) -> float:
+        return float(np.mean(self.predict(features) == teacher_labels))
+
+
+class LogisticSurrogate(SurrogateModel):
+    # Multinomial logistic regression trained on the KNN's soft probabilities (cross-entropy distillation)
+    kind = "logistic"
+
+    def __init__(self, l2: float = 1e-3, learning_rate: float = 1.0, iterations: int = 2_000):
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.weights = None
+        self.bias = None
+
+    def fit(self, features: np.ndarray, teacher_probas: np.ndarray) -> "LogisticSurrogate":
+        X = np.asarray(features, dtype=float)
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = (X - mean) / scale
+
+        weights = np.zeros((X.shape[1], teacher_probas.shape[1]))
+        bias = np.zeros(teacher_probas.shape[1])
+        for _ in range(self.iterations):
+            logits = Z @ weights + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probas = np.exp(logits)
+            probas /= probas.sum(axis=1, keepdims=True)
+
+            error = (probas - teacher_probas) / len(Z)
+            weights -= self.learning_rate * (Z.T @ error + self.l2 * weights)
+            bias -= self.learning_rate * error.sum(axis=0)
+
+        # Standardisation is folded into the coefficients, so serving is one product and one addition
+        self.weights = weights / scale[:, None]
+        self.bias = bias - mean @ self.weights
+        return self
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.weights + self.bias
+
+
+class GaussianSurrogate(SurrogateModel):
+    # One Gaussian per class with its own covariance (quadratic discriminant), weighted by the KNN's probabilities
+    kind = "gaussian"
+
+    def __init__(self, regularization: float = 1e-6):
+        self.regularization = regularization
+        self.quadratic = None
+        self.linear = None
+        self.constant = None
+
+    def fit(self, features: np.ndarray, teacher_probas: np.ndarray) -> "GaussianSurrogate":
+        X = np.asarray(features, dtype=float)
+        class_weights = teacher_probas.sum(axis=0)
+        priors = class_weights / class_weights.sum()
+
+        quadratic, linear, constant = [], [], []
+        for c in range(teacher_probas.shape[1]):
+            weights = teacher_probas[:, c]
+            mean = weights @ X / class_weights[c]
+            centered = X - mean
+            covariance = (centered * weights[:, None]).T @ centered / class_weights[c]
+            covariance += self.regularization * np.trace(covariance) / len(covariance) * np.eye(len(covariance))
+
+            precision = np.linalg.inv(covariance)
+            _, log_determinant = np.linalg.slogdet(covariance)
+            quadratic.append(-0.5 * precision)
+            linear.append(precision @ mean)
+            constant.append(-0.5 * mean @ precision @ mean - 0.5 * log_determinant + np.log(priors[c]))
+
+        # log N(x | mean, covariance) + log prior expanded into x'Ax + b'x + c per class
+        self.quadratic = np.stack(quadratic)
+        self.linear = np.stack(linear, axis=1)
+        self.constant = np.array(constant)
+        return self
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        return np.einsum("ni,cij,nj->nc", features, self.quadratic, features) + features @ self.linear + self.constant
+
+
+surrogate_types: Dict[str, type] = {
+    LogisticSurrogate.kind: LogisticSurrogate,
+    GaussianSurrogate.kind: GaussianSurrogate
+}
+
+
+def create_surrogate(kind: str) -> SurrogateModel:
+    if kind not in surrogate_types:
+        raise ValueError(f"Unsupported surrogate model: {kind}")
+    return surrogate_types[kind]()
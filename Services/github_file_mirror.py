@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+
+
+class GitHubFileMirrorEntry:
+    def __init__(self, sha: Optional[str], etag: Optional[str] = None, rows: Optional[List[Dict]] = None,
+                 trusted: bool = False):
+        self.sha = sha
+        self.etag = etag
+        self.rows = rows
+        # trusted: this process wrote the current version, so it can be used without asking GitHub
+        self.trusted = trusted
+
+
+class GitHubFileMirror:
+    def __init__(self):
+        self.entries: Dict[str, GitHubFileMirrorEntry] = {}
+        self.local_hits = 0
+        self.not_modified = 0
+        self.downloads = 0
+        self.conflicts = 0
+
+    def get(self, path: str) -> Optional[GitHubFileMirrorEntry]:
+        return self.entries.get(path)
+
+    def remember_download(self, path: str, sha: Optional[str], etag: Optional[str], rows: Optional[List[Dict]]):
+        self.downloads += 1
+        self.entries[path] = GitHubFileMirrorEntry(sha, etag, rows)
+
+    def remember_upload(self, path: str, sha: Optional[str], rows: Optional[List[Dict]]):
+        # GitHub's ETag for the new version is unknown until it is fetched, but the SHA is enough:
+        # a stale SHA makes the next PUT fail with a conflict instead of overwriting someone else's change
+        self.entries[path] = GitHubFileMirrorEntry(sha, rows=rows, trusted=sha is not None)
+
+    def invalidate(self, path: str):
+        self.entries.pop(path, None)
+
+    def get_stats(self) -> Dict:
+        return {
+            "files": len(self.entries),
+            "local_hits": self.local_hits,
+            "not_modified": self.not_modified,
+            "downloads": self.downloads,
+            "conflicts": self.conflicts
+        }
@@ -1,11 +1,19 @@
 import io
 import csv
+import json
 import httpx
+import asyncio
+import importlib.util
 import base64
 import pandas as pd
 from Config.github_config import GitHubConfig
 from typing import Optional, Tuple, List, Dict
 from Services.logger_service import LoggerService
+from Services.github_file_mirror import GitHubFileMirror
+
+
+class GitHubConflictError(Exception):
+    pass
 
 
 class GitHubUploader:
@@ -15,7 +23,12 @@ class GitHubUploader:
         self.github_repo = config.github_repo
         self.github_token = config.github_token
         self.github_branch = config.github_branch
-        self.http_client = httpx.AsyncClient()
+        self.github_api_url = config.github_api_url.rstrip("/")
+        self.config = config
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.http_client_loop = None
+        self.mirror = GitHubFileMirror() if config.github_mirror_enabled else None
+        self.last_commit_sha: Optional[str] = None
         self.logger = LoggerService("github_uploader_service").get_logger()
 
         self.logger.info("GitHubUploader initialized with config:")
@@ -23,11 +36,41 @@ class GitHubUploader:
         self.logger.info(f"Repository: {self.github_repo}")
         self.logger.info(f"Branch: {self.github_branch}")
 
+    def get_http_client(self) -> httpx.AsyncClient:
+        # One pooled keep-alive client per event loop, shared by every request this uploader makes
+        loop = asyncio.get_running_loop()
+        if self.http_client is None or self.http_client.is_closed or self.http_client_loop is not loop:
+            http2 = self.config.github_http2 and importlib.util.find_spec("h2") is not None
+            if self.config.github_http2 and not http2:
+                self.logger.warning("GITHUB_HTTP2 is set but the h2 package is missing, using HTTP/1.1")
+
+            self.http_client = httpx.AsyncClient(
+                http2=http2,
+                timeout=self.config.github_timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=self.config.github_max_connections,
+                    max_keepalive_connections=self.config.github_max_keepalive_connections,
+                    keepalive_expiry=self.config.github_keepalive_expiry_seconds
+                )
+            )
+            self.http_client_loop = loop
+        return self.http_client
+
+    async def close(self):
+        if self.http_client and not self.http_client.is_closed:
+            await self.http_client.aclose()
+            self.logger.info("GitHub HTTP client closed.")
+        self.http_client = None
+        self.http_client_loop = None
+
     def build_url(self, path: str) -> str:
-        url = f"https://api.github.com/repos/{self.github_username}/{self.github_repo}/contents/{path}"
+        url = f"{self.github_api_url}/repos/{self.github_username}/{self.github_repo}/contents/{path}"
         self.logger.debug(f"URL built for path '{path}': {url}")
         return url
 
+    def build_git_url(self, path: str) -> str:
+        return f"{self.github_api_url}/repos/{self.github_username}/{self.github_repo}/git/{path}"
+
     def build_headers(self) -> dict:
         headers = {
             "Authorization": f"Bearer {self.github_token}",
@@ -55,15 +98,32 @@ class GitHubUploader:
         self.logger.debug(f"Payload built for '{path}': {str(payload)[:300]}...")
         return payload
 
+    def build_conditional_headers(self, path: str, require_rows: bool = False) -> dict:
+        headers = self.build_headers()
+        entry = self.mirror.get(path) if self.mirror else None
+        if entry and entry.etag and (entry.rows is not None or not require_rows):
+            headers["If-None-Match"] = entry.etag
+        return headers
+
     async def get_github_file_sha(self, path: str) -> Optional[str]:
+        entry = self.mirror.get(path) if self.mirror else None
+        if entry and entry.trusted:
+            self.mirror.local_hits += 1
+            return entry.sha
+
         url = self.build_url(path)
-        headers = self.build_headers()
+        headers = self.build_conditional_headers(path)
         self.logger.info(f"Checking existing SHA for: {path}")
-        response = await self.http_client.get(url, headers=headers)
-        self.logger.debug(f"SHA check response: {response.status_code} - {response.text}")
+        response = await self.get_http_client().get(url, headers=headers)
+        self.logger.debug(f"SHA check response: {response.status_code}")
 
-        if response.status_code == 200:
+        if response.status_code == 304 and entry:
+            self.mirror.not_modified += 1
+            return entry.sha
+        elif response.status_code == 200:
             sha = response.json().get("sha")
+            if self.mirror:
+                self.mirror.remember_download(path, sha, response.headers.get("ETag"), None)
             self.logger.info(f"Found existing SHA: {sha}")
             return sha
         elif response.status_code == 404:
@@ -73,8 +133,8 @@ class GitHubUploader:
             self.logger.error(f"Error fetching SHA: {response.text}")
             raise Exception(f"Failed to check file: {response.text}")
 
-    async def upload_file_to_github(self, path: str, content: str, is_binary: bool, sha: Optional[str]) \
-            -> Tuple[bool, str]:
+    async def upload_file_to_github(self, path: str, content: str, is_binary: bool, sha: Optional[str],
+                                    rows: Optional[List[Dict]] = None) -> Tuple[bool, str]:
 
         url = self.build_url(path)
         headers = self.build_headers()
@@ -82,63 +142,200 @@ class GitHubUploader:
         payload = self.build_payload(path, encoded_content, sha)
 
         self.logger.info(f"Uploading file to GitHub: {path} (URL: {url})")
-        response = await self.http_client.put(url, headers=headers, json=payload)
+        response = await self.get_http_client().put(url, headers=headers, json=payload)
 
         success = response.status_code in [200, 201]
         self.logger.info(f"Upload status: {response.status_code}")
         self.logger.debug(f"Response body: {response.text}")
+
+        if self.mirror:
+            if success:
+                self.mirror.remember_upload(path, response.json().get("content", {}).get("sha"), rows)
+            else:
+                self.mirror.invalidate(path)
+
+        # 409/422: the file changed since its SHA was read, so the caller has to re-fetch and merge
+        if response.status_code in [409, 422]:
+            if self.mirror:
+                self.mirror.conflicts += 1
+            raise GitHubConflictError(f"SHA conflict while updating {path}: {response.text}")
+
         return success, response.text
 
-    async def upload_to_github(self, path: str, content: str, is_binary: bool) -> bool:
+    async def upload_to_github(self, path: str, content: str, is_binary: bool, sha: Optional[str] = None,
+                               sha_known: bool = False, rows: Optional[List[Dict]] = None) -> bool:
+        # Callers that just fetched the file pass its SHA, which saves a second download of the contents
         self.logger.info(f"Starting upload process for: {path}")
         try:
-            sha = await self.get_github_file_sha(path)
-            success, response = await self.upload_file_to_github(path, content, is_binary, sha)
+            if not sha_known:
+                sha = await self.get_github_file_sha(path)
+            success, response = await self.upload_file_to_github(path, content, is_binary, sha, rows)
             if success:
                 self.logger.info(f"Upload successful: {path}")
             else:
                 self.logger.error(f"Upload failed: {response}")
             return success
+        except GitHubConflictError:
+            raise
         except Exception as ex:
             self.logger.exception(f"Exception during upload: {ex}")
             return False
 
+    async def commit_files(self, files: Dict[str, Tuple[str, bool]], message: str,
+                           expected_shas: Optional[Dict[str, Optional[str]]] = None,
+                           rows: Optional[Dict[str, List[Dict]]] = None) -> bool:
+        # Git Data API: blobs -> one tree -> one commit -> fast-forward the branch ref.
+        # files maps path -> (content, is_binary); expected_shas holds the blob SHAs the contents were merged from
+        self.logger.info(f"Committing {len(files)} file(s) to GitHub: {', '.join(files)}")
+        try:
+            paths = list(files)
+            (head_sha, base_tree), *blob_shas = await asyncio.gather(
+                self.get_branch_head(),
+                *(self.create_blob(content, is_binary) for content, is_binary in files.values())
+            )
+
+            # The merged files can only be stale if someone else committed since our own last commit
+            if expected_shas and head_sha != self.last_commit_sha:
+                await self.verify_file_shas(expected_shas, head_sha)
+
+            tree_sha = await self.create_git_object("trees", {
+                "base_tree": base_tree,
+                "tree": [{"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                         for path, sha in zip(paths, blob_shas)]
+            })
+            commit_sha = await self.create_git_object("commits", {
+                "message": message,
+                "tree": tree_sha,
+                "parents": [head_sha]
+            })
+
+            response = await self.get_http_client().patch(self.build_git_url(f"refs/heads/{self.github_branch}"),
+                                                          headers=self.build_headers(),
+                                                          json={"sha": commit_sha, "force": False})
+            if response.status_code in [409, 422]:
+                self.raise_conflict(paths, f"Branch {self.github_branch} moved while committing: {response.text}")
+            if response.status_code != 200:
+                self.logger.error(f"Failed to update branch ref: {response.text}")
+                return False
+
+            self.last_commit_sha = commit_sha
+            if self.mirror:
+                for path, sha in zip(paths, blob_shas):
+                    self.mirror.remember_upload(path, sha, (rows or {}).get(path))
+
+            self.logger.info(f"Commit {commit_sha} pushed to {self.github_branch}")
+            return True
+        except GitHubConflictError:
+            raise
+        except Exception as ex:
+            self.logger.exception(f"Exception during commit: {ex}")
+            return False
+
+    async def get_branch_head(self) -> Tuple[str, str]:
+        client = self.get_http_client()
+        headers = self.build_headers()
+
+        response = await client.get(self.build_git_url(f"ref/heads/{self.github_branch}"), headers=headers)
+        if response.status_code != 200:
+            raise Exception(f"Failed to read branch {self.github_branch}: {response.text}")
+        head_sha = response.json()["object"]["sha"]
+
+        response = await client.get(self.build_git_url(f"commits/{head_sha}"), headers=headers)
+        if response.status_code != 200:
+            raise Exception(f"Failed to read commit {head_sha}: {response.text}")
+        return head_sha, response.json()["tree"]["sha"]
+
+    async def create_blob(self, content: str, is_binary: bool) -> str:
+        return await self.create_git_object("blobs", {
+            "content": self.encode_content(content, is_binary),
+            "encoding": "base64"
+        })
+
+    async def create_git_object(self, kind: str, payload: dict) -> str:
+        response = await self.get_http_client().post(self.build_git_url(kind), headers=self.build_headers(),
+                                                     json=payload)
+        if response.status_code != 201:
+            raise Exception(f"Failed to create git {kind}: {response.text}")
+        return response.json()["sha"]
+
+    async def verify_file_shas(self, expected_shas: Dict[str, Optional[str]], head_sha: str):
+        # One directory listing per folder returns the current blob SHA of every file in it
+        folders = {path.rsplit("/", 1)[0] for path in expected_shas}
+        current = {}
+        for folder in folders:
+            response = await self.get_http_client().get(f"{self.build_url(folder)}?ref={head_sha}",
+                                                        headers=self.build_headers())
+            if response.status_code == 200:
+                current.update({entry["path"]: entry["sha"] for entry in response.json()})
+            elif response.status_code != 404:
+                raise Exception(f"Failed to list {folder}: {response.text}")
+
+        stale = [path for path, sha in expected_shas.items() if current.get(path) != sha]
+        if stale:
+            self.raise_conflict(stale, f"Files changed on {self.github_branch}: {', '.join(stale)}")
+
+    def raise_conflict(self, paths: List[str], message: str):
+        if self.mirror:
+            self.mirror.conflicts += 1
+            for path in paths:
+                self.mirror.invalidate(path)
+        raise GitHubConflictError(message)
+
     async def get_existing_github_file_content(self, path: str) -> List[Dict]:
-        print("getting existing github data")
+        try:
+            existing_rows, _ = await self.get_github_file(path)
+            return existing_rows
+        except Exception:
+            return []
+
+    async def get_github_json(self, path: str) -> Tuple[Optional[Dict], Optional[str]]:
+        documents, sha = await self.get_github_file(path)
+        return (documents[0] if documents else None), sha
+
+    async def get_github_file(self, path: str) -> Tuple[List[Dict], Optional[str]]:
+        # Returns the parsed rows together with the blob SHA needed to update the file
+        entry = self.mirror.get(path) if self.mirror else None
+        if entry and entry.trusted and entry.rows is not None:
+            self.mirror.local_hits += 1
+            return entry.rows, entry.sha
+
         try:
             url = self.build_url(path)
+            headers = self.build_conditional_headers(path, require_rows=True)
 
-            headers = self.build_headers()
-
-            async with httpx.AsyncClient() as client:
-                print("getting response")
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    print("got response")
-                    file_info = response.json()
-                    file_content = base64.b64decode(file_info["content"]).decode("utf-8")
-
-                    # Determine if the file is CSV or Excel by its path extension
-                    if path.endswith(".csv"):
-                        # Parse CSV content
-                        print("csv response")
-                        csv_reader = csv.DictReader(io.StringIO(file_content))
-                        existing_rows = [row for row in csv_reader]
-                    elif path.endswith(".xlsx"):
-                        # Parse Excel content
-                        print("excel response")
-                        excel_buffer = io.BytesIO(file_content.encode("utf-8"))
-                        df = pd.read_excel(excel_buffer)
-                        existing_rows = df.to_dict(orient="records")
-                    else:
-                        existing_rows = []
-
-                    return existing_rows
+            self.logger.info(f"Fetching existing GitHub file: {path}")
+            response = await self.get_http_client().get(url, headers=headers)
+
+            if response.status_code == 304 and entry and entry.rows is not None:
+                self.mirror.not_modified += 1
+                return entry.rows, entry.sha
+            elif response.status_code == 200:
+                file_info = response.json()
+                file_bytes = base64.b64decode(file_info["content"])
+
+                # Determine if the file is CSV or Excel by its path extension
+                if path.endswith(".csv"):
+                    csv_reader = csv.DictReader(io.StringIO(file_bytes.decode("utf-8")))
+                    existing_rows = [row for row in csv_reader]
+                elif path.endswith(".xlsx"):
+                    df = pd.read_excel(io.BytesIO(file_bytes))
+                    existing_rows = df.to_dict(orient="records")
+                elif path.endswith(".json"):
+                    existing_rows = [json.loads(file_bytes)]
                 else:
-                    self.logger.error(f"Failed to retrieve file from GitHub: {response.text}")
-                    return []
+                    existing_rows = []
+
+                if self.mirror:
+                    self.mirror.remember_download(path, file_info.get("sha"), response.headers.get("ETag"),
+                                                  existing_rows)
+                return existing_rows, file_info.get("sha")
+            elif response.status_code == 404:
+                self.logger.info(f"No existing file found for {path} (404)")
+                return [], None
+            else:
+                self.logger.error(f"Failed to retrieve file from GitHub: {response.text}")
+                raise Exception(f"Failed to retrieve file: {response.text}")
 
         except Exception as e:
             self.logger.error(f"Error retrieving GitHub file content: {e}")
-            return []
+            raise
@@ -1,21 +1,109 @@
 import os
+import json
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+from typing import Any, Callable, Dict
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from Config.logging_config import LoggingConfig
+
+
+class LazyPayload:
+    # Serialized only when the record is written, on the listener thread instead of the caller's
+    def __init__(self, build: Callable[[], Any]):
+        self.build = build
+        self.text = None
+
+    def __str__(self):
+        if self.text is None:
+            self.text = json.dumps(self.build(), indent=2, default=str)
+        return self.text
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if any(isinstance(arg, LazyPayload) for arg in (record.args or ())):
+            return record
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        # A full queue drops the record rather than stalling the event loop behind the disk
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class LoggerService:
+    config = LoggingConfig()
+    handlers: Dict[str, NonBlockingQueueHandler] = {}
+    listeners: Dict[str, QueueListener] = {}
+    payload_counts: Dict[str, int] = {}
+    lock = threading.Lock()
+
     def __init__(self, logger_name: str, log_file: str = "training_log.txt"):
         self.logger = logging.getLogger(logger_name)
-        self.logger.setLevel(logging.INFO)
+        self.logger.setLevel(self.config.log_level.upper())
 
-        if not self.logger.hasHandlers():
-            formatter = logging.Formatter('%(asctime)s — %(levelname)s — %(message)s')
+        if not self.logger.handlers:
+            self.logger.addHandler(self.get_queue_handler(log_file))
 
-            log_path = os.path.join(os.path.dirname(__file__), "..", log_file)
-            handler = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=3)
-            handler.setFormatter(formatter)
+    @classmethod
+    def get_queue_handler(cls, log_file: str) -> NonBlockingQueueHandler:
+        # Loggers only enqueue records; one listener thread per file formats and writes them
+        with cls.lock:
+            if log_file not in cls.handlers:
+                formatter = logging.Formatter('%(asctime)s — %(levelname)s — %(message)s')
 
-            self.logger.addHandler(handler)
+                log_path = os.path.join(os.path.dirname(__file__), "..", log_file)
+                file_handler = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=3)
+                file_handler.setFormatter(formatter)
+
+                log_queue = queue.Queue(cls.config.log_queue_size)
+                cls.handlers[log_file] = NonBlockingQueueHandler(log_queue)
+                cls.listeners[log_file] = QueueListener(log_queue, file_handler, respect_handler_level=True)
+                cls.listeners[log_file].start()
+            return cls.handlers[log_file]
+
+    @classmethod
+    def log_payload(cls, logger: logging.Logger, message: str, build: Callable[[], Any]):
+        # Payloads are DEBUG only and sampled per logger, so their size cannot dominate request latency
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        with cls.lock:
+            count = cls.payload_counts.get(logger.name, 0)
+            cls.payload_counts[logger.name] = count + 1
+        if count % max(1, cls.config.log_payload_sample_every) == 0:
+            logger.debug(f"{message}: %s", LazyPayload(build))
+
+    @classmethod
+    def flush(cls):
+        for handler in list(cls.handlers.values()):
+            handler.queue.join()
+
+    @classmethod
+    def shutdown(cls):
+        with cls.lock:
+            for listener in cls.listeners.values():
+                listener.stop()
+            cls.listeners.clear()
+            cls.handlers.clear()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict]:
+        return {
+            log_file: {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+            for log_file, handler in cls.handlers.items()
+        }
 
     def get_logger(self):
         return self.logger
+
+
+atexit.register(LoggerService.shutdown)
@@ -0,0 +1,65 @@
+import os
+import asyncio
+from typing import Optional
+from Models.model_loader import ModelLoader
+from Services.logger_service import LoggerService
+from Config.model_registry_config import ModelRegistryConfig
+
+
+class ModelArtifactWatcher:
+    # Polls the artifact folder's active-model pointer, so a version activated by an admin call on any worker
+    # (or written there by a deployment) is picked up by every worker without a restart
+    def __init__(self, loader: ModelLoader, config: Optional[ModelRegistryConfig] = None):
+        self.logger = LoggerService("model_artifact_watcher").get_logger()
+        self.loader = loader
+        self.config = config or ModelRegistryConfig()
+        self.last_modified = None
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def pointer_modified(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.loader.artifact_store.active_key_path())
+        except FileNotFoundError:
+            return None
+
+    async def check(self) -> bool:
+        modified = self.pointer_modified()
+        if modified is None or modified == self.last_modified:
+            return False
+        self.last_modified = modified
+
+        version = self.loader.artifact_store.read_active_key()
+        if not version or version == self.loader.get_version():
+            return False
+
+        try:
+            await self.loader.activate(version, persist=False)
+            self.logger.info(f"Model watcher activated version {version}")
+            return True
+        except Exception as ex:
+            self.logger.error(f"Model watcher could not activate version {version}: {ex}")
+            return False
+
+    async def run(self):
+        while not self._stopping:
+            await self.check()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.config.watch_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        if self._worker is None and self.config.watch_enabled:
+            self._stopping = False
+            self.last_modified = self.pointer_modified()
+            self._worker = asyncio.create_task(self.run())
+            self.logger.info("Model artifact watcher started")
+
+    async def stop(self):
+        if self._worker:
+            self._stopping = True
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
@@ -0,0 +1,142 @@
+import time
+import random
+import asyncio
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from Models.model_loader import ModelLoader, LoadedModel, ModelVersionUnavailableError
+from Services.logger_service import LoggerService
+from Utility.latency_histogram import LatencyHistogram
+from Config.model_registry_config import ModelRegistryConfig
+from Core.global_compute_executor import compute_executor
+
+
+class ModelExperimentService:
+    # shadow: a candidate version also predicts a sample of requests, off the request path, and is compared
+    # with the served answer. canary: a share of requests is served by the candidate version instead
+    def __init__(self, loader: ModelLoader, config: Optional[ModelRegistryConfig] = None):
+        self.logger = LoggerService("model_experiment_service").get_logger()
+        self.loader = loader
+        self.config = config or ModelRegistryConfig()
+        self.random = random.Random()
+        self.shadow_version = None
+        self.shadow_sample_rate = self.config.shadow_sample_rate
+        self.canary_version = None
+        self.canary_percent = 0.0
+        self._pending = set()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.shadow_latency_ms = LatencyHistogram()
+        self.primary_latency_ms = LatencyHistogram()
+        self.stats = {
+            "sampled_requests": 0,
+            "skipped_requests": 0,
+            "failed_requests": 0,
+            "compared_rows": 0,
+            "agreed_rows": 0,
+            "probability_delta_sum": 0.0,
+            "canary_requests": 0,
+            "primary_requests": 0
+        }
+
+    async def start(self):
+        # A missing candidate must not keep the primary model from serving
+        try:
+            if self.config.shadow_version:
+                await self.set_shadow(self.config.shadow_version, self.config.shadow_sample_rate)
+            if self.config.canary_version:
+                await self.set_canary(self.config.canary_version, self.config.canary_percent)
+        except Exception as ex:
+            self.logger.error(f"Model experiments not started: {ex}")
+
+    async def set_shadow(self, version: Optional[str], sample_rate: Optional[float] = None):
+        if version:
+            await self.loader.pin(version)
+        self.replace_pin(self.shadow_version, version, self.canary_version)
+        self.shadow_version = version
+        if sample_rate is not None:
+            self.shadow_sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.reset_stats()
+        self.logger.info(f"Shadow model set to {version} at a {self.shadow_sample_rate:.0%} sample rate")
+
+    async def set_canary(self, version: Optional[str], percent: float = 0.0):
+        if version:
+            await self.loader.pin(version)
+        self.replace_pin(self.canary_version, version, self.shadow_version)
+        self.canary_version = version
+        self.canary_percent = min(max(percent, 0.0), 100.0) if version else 0.0
+        self.logger.info(f"Canary model set to {version} for {self.canary_percent}% of requests")
+
+    def replace_pin(self, previous: Optional[str], current: Optional[str], other: Optional[str]):
+        if previous and previous not in (current, other):
+            self.loader.unpin(previous)
+
+    @contextmanager
+    def lease(self) -> Iterator[LoadedModel]:
+        # Routes a request to the canary version or the active one, and holds that version until it is done
+        version = None
+        if self.canary_version and self.random.random() * 100 < self.canary_percent:
+            version = self.canary_version
+        if version and version not in self.loader.models:
+            # The canary was stopped (and unloaded) after it was chosen; the request is served by the active model
+            self.logger.warning(f"Canary model {version} is no longer loaded, serving the active model")
+            version = None
+        self.stats["canary_requests" if version else "primary_requests"] += 1
+
+        with self.loader.lease(version) as model:
+            yield model
+
+    def observe(self, features: np.ndarray, primary_probas: np.ndarray, primary: LoadedModel,
+                primary_ms: Optional[float] = None):
+        shadow_version = self.shadow_version
+        if not shadow_version or shadow_version == primary.version:
+            return
+        if self.random.random() >= self.shadow_sample_rate:
+            return
+        if len(self._pending) >= self.config.shadow_max_pending:
+            # The shadow pool is behind; dropping samples keeps its backlog (and memory) bounded
+            self.stats["skipped_requests"] += 1
+            return
+
+        self.stats["sampled_requests"] += 1
+        if primary_ms is not None:
+            self.primary_latency_ms.observe(primary_ms)
+
+        task = asyncio.create_task(self.run_shadow(shadow_version, features, primary_probas))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def run_shadow(self, version: str, features: np.ndarray, primary_probas: np.ndarray):
+        try:
+            with self.loader.lease(version) as shadow:
+                started = time.perf_counter()
+                shadow_probas = await compute_executor.run_shadow(shadow.predict_proba, features)
+                self.shadow_latency_ms.observe((time.perf_counter() - started) * 1000)
+
+            primary_probas = np.atleast_2d(primary_probas)
+            self.stats["compared_rows"] += len(shadow_probas)
+            self.stats["agreed_rows"] += int((shadow_probas.argmax(axis=1) == primary_probas.argmax(axis=1)).sum())
+            self.stats["probability_delta_sum"] += float(np.abs(shadow_probas - primary_probas).max(axis=1).sum())
+        except Exception as ex:
+            self.stats["failed_requests"] += 1
+            self.logger.warning(f"Shadow prediction with {version} failed: {ex}")
+
+    async def drain(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        compared = self.stats["compared_rows"]
+        return {
+            "shadow_version": self.shadow_version,
+            "shadow_sample_rate": self.shadow_sample_rate,
+            "canary_version": self.canary_version,
+            "canary_percent": self.canary_percent,
+            "pending_shadow_requests": len(self._pending),
+            **{key: value for key, value in self.stats.items() if key != "probability_delta_sum"},
+            "agreement_rate": self.stats["agreed_rows"] / compared if compared else 0.0,
+            "mean_max_probability_delta": self.stats["probability_delta_sum"] / compared if compared else 0.0,
+            "primary_latency_ms": self.primary_latency_ms.snapshot(),
+            "shadow_latency_ms": self.shadow_latency_ms.snapshot()
+        }
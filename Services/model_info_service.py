@@ -1,4 +1,3 @@
-import json
 from Services.logger_service import LoggerService
 from Core.global_model_loader import model_loader
 from Dtos.Response.model_response import ModelInfoResponse
@@ -17,26 +16,28 @@ class ModelInfoService:
             # Get RedisService singleton instance
             redis_service = await RedisService.get_instance()
 
-            # Try to get cached model info
-            cached = await redis_service.read_from_cache(self.constants.model_info_key, compressed=True)
-            if cached:
-                self.logger.info("Model info retrieved from cache.")
-                return ServiceResponse(success=True, message="Loaded from cache", data=ModelInfoResponse(**cached))
-
             # Load model if not already loaded
             if not model_loader.is_loaded():
                 await model_loader.load_model()
 
+            # Cached per model version, so activating another version never serves the old version's info
+            cache_key = f"{self.constants.model_info_key}:{model_loader.get_version()}"
+            cached = await redis_service.read_from_cache(cache_key, compressed=True)
+            if cached:
+                self.logger.info("Model info retrieved from cache.")
+                return ServiceResponse(success=True, message="Loaded from cache", data=ModelInfoResponse(**cached))
+
             result = model_loader.get_info_response()
             if not result:
                 return ServiceResponse(success=False, message="Model info is not available", data=None)
 
             # Save to cache (convert result to dictionary before storing)
             model_info_dict = result.dict()
-            self.logger.info(f"Caching model info: {json.dumps(result.model_dump(), indent=2)} {model_info_dict}")
+            self.logger.info("Caching model info")
+            LoggerService.log_payload(self.logger, "Model info", result.model_dump)
 
             await redis_service.write_to_cache(
-                key=self.constants.model_info_key,
+                key=cache_key,
                 value=model_info_dict,
                 compress=True,
                 ex=self.constants.cache_expiry
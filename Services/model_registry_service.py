@@ -0,0 +1,66 @@
+from typing import Optional
+from fastapi import HTTPException
+from Services.logger_service import LoggerService
+from Core.global_model_loader import model_loader
+from Models.model_loader import ModelVersionUnavailableError
+from Core.global_compute_executor import compute_executor
+from Core.global_model_experiments import model_experiments
+from Dtos.Response.model_response import ModelInfoResponse
+from Dtos.Response.service_response import ServiceResponse
+from Dtos.Response.metrics_response import ModelExperimentStats
+from Dtos.Response.model_registry_response import ModelRegistryResponse, ModelVersionResponse
+
+
+class ModelRegistryService:
+    def __init__(self):
+        self.logger = LoggerService("model_registry_service").get_logger()
+
+    async def get_models(self) -> ServiceResponse[ModelRegistryResponse]:
+        versions = await compute_executor.run_bulk(model_loader.get_versions)
+        data = ModelRegistryResponse(active_version=model_loader.get_version(),
+                                     versions=[ModelVersionResponse(**version) for version in versions])
+        return ServiceResponse(success=True, message="Model versions", data=data)
+
+    async def activate_model(self, version: str) -> ServiceResponse[ModelInfoResponse]:
+        try:
+            # In-flight requests finish on the model they started with; new requests get this version
+            info = await model_loader.activate(version)
+            self.logger.info(f"Model version {version} activated")
+            return ServiceResponse(success=True, message=f"Model version {version} activated", data=info)
+        except ModelVersionUnavailableError as ex:
+            raise HTTPException(status_code=404, detail=str(ex))
+        except Exception as ex:
+            self.logger.error(f"Activating model version {version} failed: {ex}")
+            return ServiceResponse(success=False, message=str(ex), data=None)
+
+    async def reload_model(self, search: Optional[bool] = None) -> ServiceResponse[ModelInfoResponse]:
+        try:
+            info = await model_loader.reload(search)
+            self.logger.info(f"Model reloaded as version {info.model_version}")
+            return ServiceResponse(success=True, message=f"Model version {info.model_version} activated", data=info)
+        except Exception as ex:
+            self.logger.error(f"Model reload failed: {ex}")
+            return ServiceResponse(success=False, message=str(ex), data=None)
+
+    async def set_shadow_model(self, version: Optional[str], sample_rate: Optional[float]) \
+            -> ServiceResponse[ModelExperimentStats]:
+        try:
+            await model_experiments.set_shadow(version, sample_rate)
+            return ServiceResponse(success=True, message=f"Shadow model set to {version}",
+                                   data=ModelExperimentStats(**model_experiments.get_stats()))
+        except ModelVersionUnavailableError as ex:
+            raise HTTPException(status_code=404, detail=str(ex))
+        except Exception as ex:
+            self.logger.error(f"Setting shadow model {version} failed: {ex}")
+            return ServiceResponse(success=False, message=str(ex), data=None)
+
+    async def set_canary_model(self, version: Optional[str], percent: float) -> ServiceResponse[ModelExperimentStats]:
+        try:
+            await model_experiments.set_canary(version, percent)
+            return ServiceResponse(success=True, message=f"Canary model set to {version}",
+                                   data=ModelExperimentStats(**model_experiments.get_stats()))
+        except ModelVersionUnavailableError as ex:
+            raise HTTPException(status_code=404, detail=str(ex))
+        except Exception as ex:
+            self.logger.error(f"Setting canary model {version} failed: {ex}")
+            return ServiceResponse(success=False, message=str(ex), data=None)
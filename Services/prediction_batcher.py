@@ -0,0 +1,104 @@
+import time
+import asyncio
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from Config.inference_config import InferenceConfig
+from Services.logger_service import LoggerService
+from Utility.latency_histogram import LatencyHistogram
+from Core.global_compute_executor import compute_executor
+
+
+class PredictionBatcher:
+    batch_size_bounds = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1_024]
+
+    def __init__(self, predict_proba: Callable[[np.ndarray], np.ndarray], config: Optional[InferenceConfig] = None):
+        self.logger = LoggerService("prediction_batcher").get_logger()
+        self.predict_proba = predict_proba
+        self.config = config or InferenceConfig()
+        self.window_seconds = self.config.micro_batch_window_ms / 1000
+        self.max_items = max(1, self.config.micro_batch_max_items)
+
+        self._pending: List[Tuple[Tuple[float, float], asyncio.Future, float, Any]] = []
+        self._timer: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks, so running batches are held here until they finish
+        self._batch_tasks = set()
+
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.batch_size = LatencyHistogram(self.batch_size_bounds)
+        self.queue_wait_ms = LatencyHistogram()
+
+    async def submit(self, bill_length_mm: float, flipper_length_mm: float, model=None) -> np.ndarray:
+        # model is the caller's leased LoadedModel, so a swap while it waits does not change who scores it
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((bill_length_mm, flipper_length_mm), future, time.perf_counter(), model))
+
+        if len(self._pending) >= self.max_items:
+            self.dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self.dispatch_after_window())
+
+        return await future
+
+    async def dispatch_after_window(self):
+        await asyncio.sleep(self.window_seconds)
+        self._timer = None
+        self.dispatch()
+
+    def dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Requests leased on different versions (e.g. across a hot swap or with a canary) are scored separately
+        groups: Dict[int, list] = {}
+        for item in batch:
+            groups.setdefault(id(item[3]), []).append(item)
+        for group in groups.values():
+            task = asyncio.create_task(self.run_batch(group))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def run_batch(self, batch: List[Tuple[Tuple[float, float], asyncio.Future, float, Any]]):
+        dispatched = time.perf_counter()
+        for _, _, enqueued, _ in batch:
+            self.queue_wait_ms.observe((dispatched - enqueued) * 1000)
+        self.batch_size.observe(len(batch))
+
+        model = batch[0][3]
+        predict_proba = model.predict_proba if model is not None else self.predict_proba
+        features = np.array([features for features, _, _, _ in batch], dtype=float)
+        try:
+            probabilities = await compute_executor.run_interactive(predict_proba, features)
+        except Exception as ex:
+            self.failed_batches += 1
+            self.logger.error(f"Micro-batch of {len(batch)} predictions failed: {str(ex)}")
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(ex)
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        for row, (_, future, _, _) in zip(probabilities, batch):
+            # A caller that was cancelled while waiting no longer has anyone to receive its result
+            if not future.done():
+                future.set_result(row)
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.config.micro_batch_enabled,
+            "window_ms": self.config.micro_batch_window_ms,
+            "max_items": self.max_items,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_size.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
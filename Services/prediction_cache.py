@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from Config.inference_config import InferenceConfig
+from Dtos.Response.prediction_response import PredictionResponse
+
+
+class PredictionCache:
+    def __init__(self, config: Optional[InferenceConfig] = None):
+        self.config = config or InferenceConfig()
+        self.max_entries = self.config.prediction_cache_size
+        self.ttl_seconds = self.config.prediction_cache_ttl_seconds
+        self.decimals = self.config.prediction_cache_decimals
+        self._entries: "OrderedDict[Tuple, Tuple[PredictionResponse, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def make_key(self, model_version: Hashable, bill_length_mm: float, flipper_length_mm: float) -> Optional[Tuple]:
+        # Only inputs already at the cache precision are cached, so a hit always returns the exact model output
+        key = (model_version, round(bill_length_mm, self.decimals), round(flipper_length_mm, self.decimals))
+        if key[1] != bill_length_mm or key[2] != flipper_length_mm:
+            return None
+        return key
+
+    def get(self, key: Optional[Tuple]) -> Optional[PredictionResponse]:
+        if key is None:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        prediction, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return prediction
+
+    def put(self, key: Optional[Tuple], prediction: PredictionResponse):
+        if key is None or not self.enabled():
+            return
+
+        self._entries[key] = (prediction, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, *_):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,103 @@
+import os
+import hashlib
+import aiofiles
+import numpy as np
+from typing import Awaitable, Callable, Dict, List, Iterable
+from Services.logger_service import LoggerService
+
+EXCLUDED_FINGERPRINT_FIELDS = ("prediction_timestamp",)
+
+
+def normalize_value(value) -> str:
+    # Numbers are canonicalised so 181, "181.0" and 181.0 read back from a CSV produce the same fingerprint
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def fingerprint_row(row: Dict) -> int:
+    canonical = "\x1f".join(
+        f"{key}={normalize_value(row[key])}"
+        for key in sorted(row)
+        if key not in EXCLUDED_FINGERPRINT_FIELDS
+    )
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class PredictionFingerprintIndex:
+    def __init__(self, index_path: str, source_path: str, merge_threshold: int = 10_000):
+        self.logger = LoggerService("prediction_fingerprint_index").get_logger()
+        self.index_path = index_path
+        self.source_path = source_path
+        self.merge_threshold = merge_threshold
+
+        # Sorted uint64 array for the bulk of history plus a small set for recent appends, merged periodically
+        self._base = np.empty(0, dtype=np.uint64)
+        self._recent = set()
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._base) + len(self._recent)
+
+    async def ensure_loaded(self, read_source_rows: Callable[[], Awaitable[List[Dict]]]):
+        if self._loaded:
+            return
+
+        if self.is_index_current():
+            async with aiofiles.open(self.index_path, mode="rb") as f:
+                self._base = np.unique(np.frombuffer(await f.read(), dtype="<u8").astype(np.uint64))
+            self.logger.info(f"Loaded {len(self._base)} prediction fingerprints from {self.index_path}")
+        else:
+            rows = await read_source_rows()
+            fingerprints = np.array([fingerprint_row(row) for row in rows], dtype=np.uint64)
+            self._base = np.unique(fingerprints)
+            await self.write_index(self._base)
+            self.logger.info(f"Rebuilt prediction fingerprint index with {len(self._base)} entries")
+
+        self._loaded = True
+
+    def is_index_current(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        if not os.path.exists(self.source_path):
+            return True
+        # The index is appended after the source, so an older index means the source changed behind our back
+        return os.path.getmtime(self.index_path) >= os.path.getmtime(self.source_path)
+
+    def contains(self, fingerprint: int) -> bool:
+        if fingerprint in self._recent:
+            return True
+        position = np.searchsorted(self._base, np.uint64(fingerprint))
+        return position < len(self._base) and self._base[position] == fingerprint
+
+    def filter_new(self, rows: Iterable[Dict]) -> List[Dict]:
+        seen = set()
+        new_rows = []
+        for row in rows:
+            fingerprint = fingerprint_row(row)
+            if fingerprint in seen or self.contains(fingerprint):
+                continue
+            seen.add(fingerprint)
+            new_rows.append(row)
+        return new_rows
+
+    async def add(self, rows: Iterable[Dict]):
+        fingerprints = [fingerprint_row(row) for row in rows]
+        if not fingerprints:
+            return
+
+        self._recent.update(fingerprints)
+        async with aiofiles.open(self.index_path, mode="ab") as f:
+            await f.write(np.array(fingerprints, dtype="<u8").tobytes())
+
+        if len(self._recent) >= max(self.merge_threshold, len(self._base) // 10):
+            self._base = np.union1d(self._base, np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent)))
+            self._recent.clear()
+
+    async def write_index(self, fingerprints: np.ndarray):
+        temp_path = f"{self.index_path}.tmp"
+        async with aiofiles.open(temp_path, mode="wb") as f:
+            await f.write(fingerprints.astype("<u8").tobytes())
+        os.replace(temp_path, self.index_path)
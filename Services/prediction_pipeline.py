@@ -0,0 +1,93 @@
+import time
+import asyncio
+from fastapi import UploadFile
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+from Utility.file_parser import FileParser
+from Core.global_compute_executor import compute_executor
+from Core.global_model_experiments import model_experiments
+from Services.logger_service import LoggerService
+from Models.batch_prediction_engine import BatchPredictionEngine
+from Services.prediction_storage_service import PredictionStorageService
+
+_END = object()
+
+
+class PredictionPipeline:
+    def __init__(self, batch_engine: BatchPredictionEngine, prediction_saver: PredictionStorageService,
+                 queue_rows: Callable[[List[Dict]], Awaitable], queue_size: int = 4, chunk_size: int = 50_000):
+        self.logger = LoggerService("prediction_pipeline").get_logger()
+        self.batch_engine = batch_engine
+        self.prediction_saver = prediction_saver
+        self.queue_rows = queue_rows
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+
+    async def run(self, file: UploadFile) -> AsyncIterator[List[list]]:
+        # parse -> predict -> export run as overlapping stages; bounded queues keep at most a few chunks in flight
+        await self.prediction_saver.ensure_model_loaded()
+        parsed = asyncio.Queue(maxsize=self.queue_size)
+        predicted = asyncio.Queue(maxsize=self.queue_size)
+        stage_seconds = {"parse": 0.0, "predict": 0.0}
+        started = time.perf_counter()
+
+        # The whole file is predicted by one model version, even if another is activated midway. It is chosen like
+        # every other prediction endpoint's, so canary routing and shadow evaluation cover exports too
+        with model_experiments.lease() as model:
+            tasks = [
+                asyncio.create_task(self.parse_stage(file, parsed, stage_seconds)),
+                asyncio.create_task(self.predict_stage(parsed, predicted, stage_seconds, model))
+            ]
+
+            exported = 0
+            try:
+                while (item := await predicted.get()) is not _END:
+                    if isinstance(item, Exception):
+                        raise item
+                    exported += len(item)
+                    yield item
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                file.file.close()
+                self.logger.info(f"Pipeline exported {exported} rows from {file.filename} in "
+                                 f"{time.perf_counter() - started:.3f}s (parse {stage_seconds['parse']:.3f}s, "
+                                 f"predict {stage_seconds['predict']:.3f}s)")
+
+    async def parse_stage(self, file: UploadFile, parsed: asyncio.Queue, stage_seconds: Dict[str, float]):
+        try:
+            chunks = FileParser.iter_penguin_feature_chunks(file, self.chunk_size)
+            while True:
+                started = time.perf_counter()
+                features = await anext(chunks, None)
+                stage_seconds["parse"] += time.perf_counter() - started
+                if features is None:
+                    break
+                await parsed.put(features)
+            await parsed.put(_END)
+        except Exception as ex:
+            await parsed.put(ex)
+
+    async def predict_stage(self, parsed: asyncio.Queue, predicted: asyncio.Queue, stage_seconds: Dict[str, float],
+                            model=None):
+        try:
+            while (item := await parsed.get()) is not _END:
+                if isinstance(item, Exception):
+                    raise item
+
+                started = time.perf_counter()
+                prediction_result, storage_rows, export_rows = await compute_executor.run_bulk(self.predict_chunk,
+                                                                                                item, model)
+                stage_seconds["predict"] += time.perf_counter() - started
+                model_experiments.observe(item, prediction_result.probabilities, model)
+
+                await self.queue_rows(storage_rows)
+                await predicted.put(export_rows)
+            await predicted.put(_END)
+        except Exception as ex:
+            await predicted.put(ex)
+
+    def predict_chunk(self, features, model=None):
+        prediction_result = self.batch_engine.predict(features, model=model)
+        storage_rows = self.prediction_saver.build_result_rows(prediction_result)
+        return prediction_result, storage_rows, prediction_result.to_rows()
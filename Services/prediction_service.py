@@ -1,4 +1,5 @@
-import json
+import io
+import time
 import numpy as np
 from Utility.file_parser import FileParser
 from fastapi import UploadFile, HTTPException
@@ -6,19 +7,38 @@ from Enums.file_type_enum import FileExportType
 from Utility.file_converter import FileConverter
 from starlette.responses import StreamingResponse
 from Core.global_model_loader import model_loader
+from Models.model_loader import LoadedModel
+from Core.global_compute_executor import compute_executor
+from Core.global_prediction_cache import prediction_cache, shared_prediction_cache
+from Core.global_prediction_batcher import prediction_batcher
+from Core.global_model_experiments import model_experiments
 from Services.logger_service import LoggerService
+from Config.inference_config import InferenceConfig
+from Services.prediction_pipeline import PredictionPipeline
+from Models.batch_prediction_engine import BatchPredictionEngine
 from Dtos.Response.service_response import ServiceResponse
-from Services.prediction_storage_service import PredictionStorageService
+from Core.global_prediction_storage import prediction_storage_service, prediction_write_behind_queue
 from Dtos.Request.penguin_input_request import PenguinInputRequest, BatchInputRequest
-from Dtos.Response.prediction_response import PredictionResponse, BatchPredictionResponse
+from Dtos.Response.prediction_response import PredictionResponse, BatchPredictionResponse, \
+    StoredPredictionShardsResponse, PredictionShardResponse, StoredPredictionsPageResponse, FastPredictionResponse
 
 
 class PredictionService:
     def __init__(self):
         self.logger = LoggerService("prediction_service").get_logger()
-        self.prediction_saver = PredictionStorageService()
+        self.prediction_saver = prediction_storage_service
+        self.prediction_queue = prediction_write_behind_queue
+        self.batch_engine = BatchPredictionEngine(model_loader)
+        self.config = InferenceConfig()
+        self.prediction_cache = prediction_cache
+        self.shared_prediction_cache = shared_prediction_cache
+        self.model_experiments = model_experiments
+        self.pipeline = PredictionPipeline(self.batch_engine, self.prediction_saver, self.queue_github_rows,
+                                           queue_size=self.config.pipeline_queue_size,
+                                           chunk_size=self.config.file_chunk_size)
 
-    async def predict_single(self, request: PenguinInputRequest) -> ServiceResponse[PredictionResponse]:
+    async def predict_single(self, request: PenguinInputRequest, exact: bool = False) \
+            -> ServiceResponse[PredictionResponse]:
         try:
             if not model_loader.is_loaded():
                 result = await model_loader.load_model()
@@ -27,19 +47,36 @@ class PredictionService:
                     self.logger.error(f"Failed to load model: {message}")
                     return ServiceResponse(success=False, message=message, data=None)
 
-            model = model_loader.get_model()
-            encoder = model_loader.get_label_encoder()
+            # The leased model (active or canary) stays loaded until this request is done, even if another
+            # version is activated
+            with self.model_experiments.lease() as model:
+                cache_key = None
+                if self.prediction_cache.enabled() and not exact:
+                    cache_key = self.prediction_cache.make_key(model.version, request.bill_length_mm,
+                                                               request.flipper_length_mm)
+                    cached = self.prediction_cache.get(cache_key)
+                    if cached:
+                        # The same input was predicted and queued for storage already, so its row would be a duplicate
+                        return ServiceResponse(success=True, message="Prediction completed successfully", data=cached)
 
-            features = np.array([[request.bill_length_mm, request.flipper_length_mm]])
-            pred = model.predict(features)[0]
-            proba = model.predict_proba(features)[0]
-            class_labels = encoder.inverse_transform(np.arange(len(proba)))
-            probabilities = {label: float(prob) for label, prob in zip(class_labels, proba)}
+                features = np.array([[request.bill_length_mm, request.flipper_length_mm]])
+                started = time.perf_counter()
+                if self.config.micro_batch_enabled and not exact:
+                    proba = await prediction_batcher.submit(request.bill_length_mm, request.flipper_length_mm,
+                                                            model)
+                else:
+                    proba = (await compute_executor.run_interactive(model.predict_proba, features, exact))[0]
+                self.model_experiments.observe(features, proba, model, (time.perf_counter() - started) * 1000)
 
-            prediction_data = PredictionResponse(
-                prediction=encoder.inverse_transform([pred])[0],
-                probabilities=probabilities
-            )
+                class_labels = model.class_names.tolist()
+                probabilities = {label: float(prob) for label, prob in zip(class_labels, proba)}
+
+                # The KNN prediction is the argmax of its probabilities, so a second neighbour search is not needed
+                prediction_data = PredictionResponse(
+                    prediction=class_labels[int(np.argmax(proba))],
+                    probabilities=probabilities,
+                    model_version=model.version
+                )
 
             # local_prediction_save_success = await self.prediction_saver.save_single_prediction(request,
             # prediction_data)
@@ -48,22 +85,19 @@ class PredictionService:
             # else:
             #     self.logger.warning("Local prediction result was not saved (possibly duplicate or write failure).")
 
-            github_prediction_save_success = await self.prediction_saver.save_single_prediction_to_github(request,
-                                                                                prediction_data)
-            if github_prediction_save_success:
-                self.logger.info("Github prediction result saved successfully.")
-            else:
-                self.logger.warning("Github prediction result was not saved (possibly duplicate or write failure).")
+            rows = await self.prediction_saver.prepare_rows([request], [prediction_data])
+            if await self.queue_github_rows(rows):
+                self.prediction_cache.put(cache_key, prediction_data)
 
-            self.logger.info(
-                f"\nSingle model predicted successfully: {json.dumps(prediction_data.model_dump(), indent=2)}")
+            self.logger.info(f"Single model predicted successfully: {prediction_data.prediction}")
+            LoggerService.log_payload(self.logger, "Single prediction", prediction_data.model_dump)
             return ServiceResponse(success=True, message="Prediction completed successfully", data=prediction_data)
 
         except Exception as ex:
             self.logger.error(f"Single prediction failed: {str(ex)}")
             return ServiceResponse(success=False, message="Prediction error occurred", data=None)
 
-    async def predict_batch(self, request: BatchInputRequest) -> ServiceResponse[BatchPredictionResponse]:
+    async def predict_fast(self, request: PenguinInputRequest) -> ServiceResponse[FastPredictionResponse]:
         try:
             if not model_loader.is_loaded():
                 result = await model_loader.load_model()
@@ -72,30 +106,40 @@ class PredictionService:
                     self.logger.error(f"Failed to load model: {message}")
                     return ServiceResponse(success=False, message=message, data=None)
 
-            model = model_loader.get_model()
-            encoder = model_loader.get_label_encoder()
+            with model_loader.lease() as model:
+                if model.surrogate is None:
+                    return ServiceResponse(success=False, message="Fast predictions need a model trained with "
+                                                                  "TRAINING_SURROGATE_MODEL set", data=None)
 
-            features = np.array([
-                [record.bill_length_mm, record.flipper_length_mm]
-                for record in request.records
-            ])
+                # A few microseconds of NumPy, so it runs inline rather than paying for a thread pool hop.
+                # Only the label is returned, and these predictions are not stored
+                features = np.array([[request.bill_length_mm, request.flipper_length_mm]])
+                label = model.class_names[model.surrogate.predict(features)[0]]
+                prediction_data = FastPredictionResponse(prediction=label, surrogate=model.surrogate.kind,
+                                                         model_version=model.version)
 
-            preds = model.predict(features)
-            probas = model.predict_proba(features)
+            return ServiceResponse(success=True, message="Prediction completed successfully", data=prediction_data)
 
-            class_labels = encoder.inverse_transform(np.arange(probas.shape[1]))
+        except Exception as ex:
+            self.logger.error(f"Fast prediction failed: {str(ex)}")
+            return ServiceResponse(success=False, message="Prediction error occurred", data=None)
 
-            results = []
-            for pred, proba in zip(preds, probas):
-                prediction_label = encoder.inverse_transform([pred])[0]
-                probabilities = {
-                    label: round(float(p), 2) for label, p in zip(class_labels, proba)
-                }
+    async def predict_batch(self, request: BatchInputRequest) -> ServiceResponse[BatchPredictionResponse]:
+        try:
+            if not model_loader.is_loaded():
+                result = await model_loader.load_model()
+                if not result:
+                    message = result.message if result else "Unknown model load failure"
+                    self.logger.error(f"Failed to load model: {message}")
+                    return ServiceResponse(success=False, message=message, data=None)
 
-                results.append(PredictionResponse(
-                    prediction=prediction_label,
-                    probabilities=probabilities
-                ))
+            features = BatchPredictionEngine.features_from_records(request.records)
+            with self.model_experiments.lease() as model:
+                started = time.perf_counter()
+                prediction_result = await self.predict_features(features, model)
+                self.model_experiments.observe(features, prediction_result.probabilities, model,
+                                               (time.perf_counter() - started) * 1000)
+            results = prediction_result.to_responses()
 
             # local_prediction_save_success = await self.prediction_saver.save_batch_prediction(request.records,
             # results)
@@ -104,50 +148,133 @@ class PredictionService:
             # else:
             #     self.logger.warning("Local prediction result was not saved (possibly duplicate or write failure).")
 
-            github_prediction_save_success = await self.prediction_saver.save_batch_prediction_to_github(
-                request.records, results)
-            if github_prediction_save_success:
-                self.logger.info("Github prediction result saved successfully.")
-            else:
-                self.logger.warning("Github prediction result was not saved (possibly duplicate or write failure).")
+            rows = await self.prediction_saver.prepare_result_rows(prediction_result)
+            await self.queue_github_rows(rows)
 
-            predictions_json = json.dumps([prediction.dict() for prediction in results], indent=2)
-            self.logger.info(f"\nBatch model predicted successfully: {predictions_json}")
+            self.logger.info(f"Batch model predicted successfully: {len(results)} rows")
+            LoggerService.log_payload(self.logger, "Batch predictions",
+                                      lambda: [prediction.model_dump() for prediction in results])
             return ServiceResponse(success=True, message="Batch prediction successful",
-                                   data=BatchPredictionResponse(results=results))
+                                   data=BatchPredictionResponse(results=results,
+                                                                model_version=prediction_result.model_version))
 
         except Exception as ex:
             self.logger.error(f"Batch prediction failed: {str(ex)}")
             return ServiceResponse(success=False, message="Batch prediction error occurred", data=None)
 
+    async def predict_features(self, features: np.ndarray, model: LoadedModel):
+        if not self.shared_prediction_cache.enabled():
+            return await compute_executor.run_bulk(self.batch_engine.predict, features, False, model)
+
+        # Rows already predicted by any worker come from Redis; only the misses reach the model
+        async def compute(missing):
+            return await compute_executor.run_bulk(model.predict_proba, missing)
+
+        probas = await self.shared_prediction_cache.predict_proba(model.version, features, len(model.class_names),
+                                                                  compute)
+        return self.batch_engine.build_result(features, probas, model)
+
+    async def queue_github_rows(self, rows) -> bool:
+        # Persistence happens in the write-behind worker, off the request path
+        if await self.prediction_queue.enqueue(rows):
+            self.logger.info("Github prediction result queued for upload.")
+            return True
+
+        self.logger.warning("Github prediction result was not queued (write-behind queue is full).")
+        return False
+
     async def predict_from_file(self, file: UploadFile) -> ServiceResponse[BatchPredictionResponse]:
         try:
-            records = await FileParser.parse_penguin_file(file)
-            if not records:
-                return ServiceResponse(success=False, message="No valid data found in the file", data=None)
+            if not model_loader.is_loaded():
+                await model_loader.load_model()
 
-            request = BatchInputRequest(records=records)
-            response = await self.predict_batch(request)
+            # Each parsed chunk goes straight to the model as a NumPy array, without per-row request objects
+            results = []
+            with self.model_experiments.lease() as model:
+                async for features in FileParser.iter_penguin_feature_chunks(file, self.config.file_chunk_size):
+                    prediction_result = await compute_executor.run_bulk(self.batch_engine.predict, features, False,
+                                                                        model)
+                    self.model_experiments.observe(features, prediction_result.probabilities, model)
+                    rows = await self.prediction_saver.prepare_result_rows(prediction_result)
+                    await self.queue_github_rows(rows)
+                    results.extend(prediction_result.to_responses())
 
-            if response.success:
-                predictions_json = json.dumps([prediction.dict() for prediction in response.data.results], indent=2)
-                self.logger.info(f"Predictions from file: {predictions_json}")
+            if not results:
+                return ServiceResponse(success=False, message="No valid data found in the file", data=None)
 
-            return response
+            self.logger.info(f"Predicted {len(results)} rows from file: {file.filename}")
+            return ServiceResponse(success=True, message="Batch prediction successful",
+                                   data=BatchPredictionResponse(results=results, model_version=model.version))
 
         except Exception as ex:
             self.logger.error(f"File prediction failed: {str(ex)}")
             return ServiceResponse(success=False, message=str(ex), data=None)
 
     async def download_penguin_predictions(self, file: UploadFile, file_type: FileExportType) -> StreamingResponse:
-        response = await self.predict_from_file(file)
+        if not model_loader.is_loaded():
+            await model_loader.load_model()
+
+        row_blocks = self.pipeline.run(await FileParser.detach_upload(file))
+
+        # Pull the first block before streaming starts, so parse errors still become a 400 response
+        try:
+            first_block = await anext(row_blocks)
+        except StopAsyncIteration:
+            first_block = None
+        except Exception as ex:
+            self.logger.error(f"Prediction export failed: {ex}")
+            raise HTTPException(status_code=400, detail=str(ex))
+
+        if not first_block:
+            raise HTTPException(status_code=400, detail="No valid data found in the file")
+
+        async def all_blocks():
+            yield first_block
+            async for block in row_blocks:
+                yield block
+
+        self.logger.info(f"Streaming predictions for {file.filename} as {file_type.value.upper()}")
+        headers = ["prediction", *model_loader.get_class_names().tolist(), "model_version"]
+        return FileConverter.stream(headers, all_blocks(), file_type, "Penguin Prediction")
+
+    async def download_stored_predictions_excel(self) -> StreamingResponse:
+        try:
+            content = await self.prediction_saver.get_predictions_excel()
+        except ValueError as ex:
+            raise HTTPException(status_code=404, detail=str(ex))
+
+        return StreamingResponse(
+            io.BytesIO(content),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": "attachment; filename=penguin_predictions.xlsx"}
+        )
+
+    async def export_stored_predictions(self, file_type: FileExportType) -> StreamingResponse:
+        if not self.prediction_saver.stored_data_paths():
+            raise HTTPException(status_code=404, detail="No stored predictions to export")
 
-        if not response.success or not response.data:
-            self.logger.error(f"Prediction export failed: {response.message}")
-            raise HTTPException(status_code=400, detail=response.message)
+        # Rows are streamed shard by shard and chunk by chunk instead of being merged up front
+        await self.prediction_saver.ensure_model_loaded()
+        headers = self.prediction_saver.csv_headers()
+        row_blocks = self.prediction_saver.iter_stored_rows(self.config.file_chunk_size)
+        return FileConverter.stream(headers, row_blocks, file_type, "Stored Predictions")
 
-        predictions = response.data.results
-        count = len(predictions)
-        self.logger.info(f"Exporting {count} predictions to {file_type.value.upper()} format")
+    async def get_stored_predictions_page(self, page: int, page_size: int, prediction: str = None,
+                                          model_version: str = None) -> ServiceResponse[StoredPredictionsPageResponse]:
+        filters = [(name, "==", value) for name, value in
+                   (("prediction", prediction), ("model_version", model_version)) if value is not None]
+        total_rows, rows = await self.prediction_saver.get_stored_predictions_page(page, page_size, filters)
+        data = StoredPredictionsPageResponse(page=page, page_size=page_size, total_rows=total_rows, rows=rows)
+        return ServiceResponse(success=True, message="Stored predictions", data=data)
 
-        return FileConverter.convert(predictions, file_type, "Penguin Prediction")
+    def get_stored_prediction_shards(self) -> ServiceResponse[StoredPredictionShardsResponse]:
+        manifest = self.prediction_saver.local_manifest
+        if manifest:
+            shards = [PredictionShardResponse(path=shard["path"], date=shard["date"], rows=shard["rows"])
+                      for shard in manifest.shards]
+            data = StoredPredictionShardsResponse(sharded=True, total_rows=manifest.total_rows(), shards=shards)
+        else:
+            # The single legacy file has no manifest, so its row count is not known without reading it
+            shards = [PredictionShardResponse(path=path) for path in self.prediction_saver.stored_data_paths()]
+            data = StoredPredictionShardsResponse(sharded=False, shards=shards)
+        return ServiceResponse(success=True, message="Stored prediction shards", data=data)
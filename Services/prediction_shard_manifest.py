@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+class PredictionShardManifest:
+    format_version = 1
+
+    def __init__(self, prefix: str, max_rows: int, shards: Optional[List[Dict]] = None, extension: str = ".csv"):
+        self.prefix = prefix
+        self.max_rows = max_rows
+        self.extension = extension
+        self.shards: List[Dict] = shards or []
+
+    @classmethod
+    def from_dict(cls, document: Optional[Dict], prefix: str, max_rows: int, extension: str = ".csv") \
+            -> "PredictionShardManifest":
+        return cls(prefix, max_rows, list((document or {}).get("shards", [])), extension)
+
+    @classmethod
+    def from_json(cls, content: Optional[bytes], prefix: str, max_rows: int, extension: str = ".csv") \
+            -> "PredictionShardManifest":
+        return cls.from_dict(json.loads(content) if content else None, prefix, max_rows, extension)
+
+    def to_dict(self) -> Dict:
+        return {"version": self.format_version, "shards": self.shards}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def shard_path(self, date: str, sequence: int) -> str:
+        return f"{self.prefix}_{date}_{sequence:03d}{self.extension}"
+
+    def active_shard(self, date: Optional[str] = None) -> Tuple[Dict, bool]:
+        # Shards are partitioned by UTC day and rolled over early once they reach max_rows
+        date = date or self.today()
+        current = self.shards[-1] if self.shards else None
+        if current and current["date"] == date and current["rows"] < self.max_rows:
+            return current, False
+
+        sequence = current["sequence"] + 1 if current and current["date"] == date else 1
+        shard = {"path": self.shard_path(date, sequence), "date": date, "sequence": sequence, "rows": 0}
+        self.shards.append(shard)
+        return shard, True
+
+    def set_rows(self, path: str, rows: int):
+        for shard in self.shards:
+            if shard["path"] == path:
+                shard["rows"] = rows
+
+    def paths(self) -> List[str]:
+        return [shard["path"] for shard in self.shards]
+
+    def total_rows(self) -> int:
+        return sum(shard["rows"] for shard in self.shards)
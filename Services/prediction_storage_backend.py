@@ -0,0 +1,338 @@
+import io
+import os
+import re
+import csv
+import glob
+import time
+import sqlite3
+import aiofiles
+import pandas as pd
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from Config.storage_config import StorageConfig
+from Core.global_compute_executor import compute_executor
+
+# Filters use the pyarrow/pandas tuple form, e.g. [("prediction", "==", "Adelie"), ("bill_length_mm", ">", 40)]
+Filters = Optional[Sequence[Tuple[str, str, object]]]
+
+STRING_COLUMNS = ("prediction", "model_version")
+TIMESTAMP_COLUMN = "prediction_timestamp"
+
+
+def apply_filters(df: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    operations = {
+        "==": lambda column, value: column == value,
+        "!=": lambda column, value: column != value,
+        "<": lambda column, value: column < value,
+        "<=": lambda column, value: column <= value,
+        ">": lambda column, value: column > value,
+        ">=": lambda column, value: column >= value,
+        "in": lambda column, value: column.isin(value)
+    }
+    for name, operator, value in filters or []:
+        df = df[operations[operator](df[name], value)]
+    return df
+
+
+class PredictionStorageBackend(ABC):
+    name: str
+    extension: str
+    # Backends that reject duplicate rows themselves make the fingerprint index unnecessary
+    deduplicates = False
+
+    @abstractmethod
+    async def append(self, path: str, rows: List[Dict], headers: List[str]) -> int:
+        pass
+
+    @abstractmethod
+    def read_frame(self, paths: List[str], columns: Optional[List[str]] = None, filters: Filters = None) \
+            -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def iter_frames(self, path: str, columns: Optional[List[str]] = None, chunk_size: int = 50_000) \
+            -> Iterator[pd.DataFrame]:
+        pass
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def data_version(self, path: str) -> Tuple:
+        # Changes whenever any process writes to the stored file, so derived artifacts can be keyed on it
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+
+    def read_page(self, paths: List[str], offset: int, limit: int, filters: Filters = None) \
+            -> Tuple[int, pd.DataFrame]:
+        df = self.read_frame(paths, filters=filters)
+        return len(df), df.iloc[offset:offset + limit]
+
+
+class CsvPredictionStorageBackend(PredictionStorageBackend):
+    name = "csv"
+    extension = ".csv"
+
+    async def append(self, path: str, rows: List[Dict], headers: List[str]) -> int:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=headers)
+        if not os.path.exists(path):
+            writer.writeheader()
+        writer.writerows(rows)
+
+        async with aiofiles.open(path, mode="a", encoding="utf-8") as f:
+            await f.write(buffer.getvalue())
+        return len(rows)
+
+    def read_frame(self, paths: List[str], columns: Optional[List[str]] = None, filters: Filters = None) \
+            -> pd.DataFrame:
+        # CSV has no statistics to skip data with, so every row is parsed and filtered afterwards
+        frames = [pd.read_csv(path, usecols=columns) for path in paths]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return apply_filters(df, filters)
+
+    def iter_frames(self, path: str, columns: Optional[List[str]] = None, chunk_size: int = 50_000) \
+            -> Iterator[pd.DataFrame]:
+        with pd.read_csv(path, usecols=columns, chunksize=chunk_size) as chunks:
+            yield from chunks
+
+
+class ParquetPredictionStorageBackend(PredictionStorageBackend):
+    name = "parquet"
+    extension = ".parquet"
+
+    # A Parquet "file" here is a directory of immutable part files: each save writes one typed, compressed
+    # part. Compaction is tiered: once compaction_parts parts share a level they are merged into one part of the
+    # next level, so each row is rewritten about log(rows) times in total instead of once per compaction
+    part_pattern = re.compile(r"part-(\d+)(?:-L(\d+))?\.parquet$")
+
+    def __init__(self, compression: str = "zstd", compaction_parts: int = 64):
+        self.compression = compression
+        self.compaction_parts = compaction_parts
+
+    @staticmethod
+    def schema(headers: List[str]):
+        import pyarrow as pa
+
+        return pa.schema([
+            (header, pa.string() if header in STRING_COLUMNS
+             else pa.timestamp("s") if header == TIMESTAMP_COLUMN
+             else pa.float64())
+            for header in headers
+        ])
+
+    @staticmethod
+    def part_paths(path: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+
+    @classmethod
+    def part_name(cls, part: str) -> Tuple[int, int]:
+        # (creation time in ns, level); parts written before levels existed count as level 0
+        match = cls.part_pattern.search(os.path.basename(part))
+        return int(match.group(1)), int(match.group(2) or 0)
+
+    def data_version(self, path: str) -> Tuple:
+        # Parts are immutable and uniquely named, so the part list identifies the stored rows
+        return (path, *map(os.path.basename, self.part_paths(path)))
+
+    async def append(self, path: str, rows: List[Dict], headers: List[str]) -> int:
+        await compute_executor.run_bulk(self.write_part, path, rows, headers)
+        return len(rows)
+
+    def write_part(self, path: str, rows: List[Dict], headers: List[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(rows, columns=headers)
+        if TIMESTAMP_COLUMN in df:
+            df[TIMESTAMP_COLUMN] = pd.to_datetime(df[TIMESTAMP_COLUMN])
+        table = pa.Table.from_pandas(df, schema=self.schema(headers), preserve_index=False)
+
+        os.makedirs(path, exist_ok=True)
+        self.write_table_atomically(table, os.path.join(path, f"part-{time.time_ns():020d}-L0.parquet"))
+        self.compact(path)
+
+    def compact(self, path: str):
+        import pyarrow.parquet as pq
+
+        level = 0
+        while True:
+            parts = [part for part in self.part_paths(path) if self.part_name(part)[1] == level]
+            if len(parts) < max(2, self.compaction_parts):
+                return
+
+            # Older parts always sit at higher levels, so naming the merged part after its oldest member keeps
+            # the name order (and the row order of reads) chronological
+            first_written = self.part_name(parts[0])[0]
+            merged = os.path.join(path, f"part-{first_written:020d}-L{level + 1}.parquet")
+            self.write_table_atomically(pq.read_table(parts), merged)
+            for part in parts:
+                os.remove(part)
+            level += 1
+
+    def write_table_atomically(self, table, part_path: str):
+        import pyarrow.parquet as pq
+
+        temp_path = f"{part_path}.tmp"
+        pq.write_table(table, temp_path, compression=self.compression)
+        os.replace(temp_path, part_path)
+
+    def read_frame(self, paths: List[str], columns: Optional[List[str]] = None, filters: Filters = None) \
+            -> pd.DataFrame:
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        parts = [part for path in paths for part in self.part_paths(path)]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+
+        # Only the projected columns are decoded, and row groups whose statistics rule out the filter are skipped
+        dataset = ds.dataset(parts, format="parquet")
+        expression = pq.filters_to_expression(list(filters)) if filters else None
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def iter_frames(self, path: str, columns: Optional[List[str]] = None, chunk_size: int = 50_000) \
+            -> Iterator[pd.DataFrame]:
+        import pyarrow.dataset as ds
+
+        parts = self.part_paths(path)
+        if not parts:
+            return
+        for batch in ds.dataset(parts, format="parquet").to_batches(columns=columns, batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+class SqlitePredictionStorageBackend(PredictionStorageBackend):
+    name = "sqlite"
+    extension = ".sqlite"
+    deduplicates = True
+    table = "predictions"
+    operators = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    # WAL lets exports and page reads run while a save is writing. A UNIQUE index over every column except the
+    # timestamp makes INSERT OR IGNORE drop duplicates with one B-tree lookup per row, at any history size
+    def __init__(self, busy_timeout_seconds: float = 5.0):
+        self.busy_timeout_seconds = busy_timeout_seconds
+
+    @staticmethod
+    def quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def connect(self, path: str) -> sqlite3.Connection:
+        # Connections are short-lived and may be used from another executor thread than the one that opened them
+        connection = sqlite3.connect(path, timeout=self.busy_timeout_seconds, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def ensure_table(self, connection: sqlite3.Connection, headers: List[str]):
+        columns = ", ".join(
+            f"{self.quote(header)} {'TEXT' if header in STRING_COLUMNS or header == TIMESTAMP_COLUMN else 'REAL'}"
+            for header in headers
+        )
+        unique = ", ".join(self.quote(header) for header in headers if header != TIMESTAMP_COLUMN)
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id INTEGER PRIMARY KEY, {columns})")
+        connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {self.table}_unique ON {self.table} ({unique})")
+
+    def table_columns(self, connection: sqlite3.Connection) -> List[str]:
+        info = connection.execute(f"PRAGMA table_info({self.table})").fetchall()
+        return [column[1] for column in info if column[1] != "id"]
+
+    def data_version(self, path: str) -> Tuple:
+        # Committed rows can sit in the write-ahead log until a checkpoint, so its state counts too
+        wal_path = f"{path}-wal"
+        wal = super().data_version(wal_path) if os.path.exists(wal_path) else None
+        return super().data_version(path), wal
+
+    async def append(self, path: str, rows: List[Dict], headers: List[str]) -> int:
+        return await compute_executor.run_bulk(self.insert_rows, path, rows, headers)
+
+    def insert_rows(self, path: str, rows: List[Dict], headers: List[str]) -> int:
+        connection = self.connect(path)
+        try:
+            with connection:
+                self.ensure_table(connection, headers)
+                before = connection.total_changes
+                connection.executemany(
+                    f"INSERT OR IGNORE INTO {self.table} ({', '.join(map(self.quote, headers))}) "
+                    f"VALUES ({', '.join('?' * len(headers))})",
+                    ([row.get(header) for header in headers] for row in rows)
+                )
+                return connection.total_changes - before
+        finally:
+            connection.close()
+
+    def build_query(self, connection: sqlite3.Connection, columns: Optional[List[str]], filters: Filters,
+                    select: Optional[str] = None) -> Tuple[str, list]:
+        known = self.table_columns(connection)
+        selected = select or ", ".join(self.quote(column) for column in (columns or known) if column in known)
+        clauses, parameters = [], []
+
+        for name, operator, value in filters or []:
+            if name not in known:
+                raise ValueError(f"Unknown column: {name}")
+            if operator == "in":
+                clauses.append(f"{self.quote(name)} IN ({', '.join('?' * len(value))})")
+                parameters.extend(value)
+            else:
+                clauses.append(f"{self.quote(name)} {self.operators[operator]} ?")
+                parameters.append(value)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return f"SELECT {selected} FROM {self.table}{where}", parameters
+
+    def read_frame(self, paths: List[str], columns: Optional[List[str]] = None, filters: Filters = None) \
+            -> pd.DataFrame:
+        frames = []
+        for path in paths:
+            connection = self.connect(path)
+            try:
+                query, parameters = self.build_query(connection, columns, filters)
+                frames.append(pd.read_sql_query(f"{query} ORDER BY id", connection, params=parameters))
+            finally:
+                connection.close()
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def iter_frames(self, path: str, columns: Optional[List[str]] = None, chunk_size: int = 50_000) \
+            -> Iterator[pd.DataFrame]:
+        connection = self.connect(path)
+        try:
+            query, parameters = self.build_query(connection, columns, None)
+            yield from pd.read_sql_query(f"{query} ORDER BY id", connection, params=parameters,
+                                         chunksize=chunk_size)
+        finally:
+            connection.close()
+
+    def read_page(self, paths: List[str], offset: int, limit: int, filters: Filters = None) \
+            -> Tuple[int, pd.DataFrame]:
+        # Each file answers COUNT and LIMIT/OFFSET itself, so a page never loads the rows before it
+        total, frames = 0, []
+        for path in paths:
+            connection = self.connect(path)
+            try:
+                count_query, parameters = self.build_query(connection, None, filters, select="COUNT(*)")
+                count = connection.execute(count_query, parameters).fetchone()[0]
+                start = max(0, offset - total)
+                take = limit - sum(len(frame) for frame in frames)
+                if take > 0 and start < count:
+                    query, parameters = self.build_query(connection, None, filters)
+                    frames.append(pd.read_sql_query(f"{query} ORDER BY id LIMIT ? OFFSET ?", connection,
+                                                    params=[*parameters, take, start]))
+                total += count
+            finally:
+                connection.close()
+        return total, pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def create_storage_backend(config: StorageConfig) -> PredictionStorageBackend:
+    if config.storage_backend == "sqlite":
+        return SqlitePredictionStorageBackend(config.sqlite_busy_timeout_seconds)
+    if config.storage_backend == "parquet":
+        try:
+            import pyarrow
+        except ImportError:
+            raise ValueError("STORAGE_BACKEND=parquet requires pyarrow, install it with "
+                             "'pip install -r requirements-parquet.txt'")
+        return ParquetPredictionStorageBackend(config.parquet_compression, config.parquet_compaction_parts)
+    if config.storage_backend == "csv":
+        return CsvPredictionStorageBackend()
+    raise ValueError(f"Unsupported storage backend: {config.storage_backend}")
@@ -1,17 +1,27 @@
 import io
 import json
 import os
+import asyncio
 import csv
 import base64
 import aiofiles
+import time
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Optional, AsyncIterator, Tuple
 from Services.logger_service import LoggerService
 from Core.global_model_loader import model_loader
-from Services.github_uploader import GitHubUploader
+from Services.github_uploader import GitHubUploader, GitHubConflictError
+from Models.batch_prediction_engine import BatchPredictionResult
+from Services.prediction_fingerprint_index import PredictionFingerprintIndex
+from Services.prediction_shard_manifest import PredictionShardManifest
 from Infrastructure.app_constants import AppConstants
+from Config.storage_config import StorageConfig
+from Utility.excel_snapshot_cache import ExcelSnapshotCache
+from Core.global_compute_executor import compute_executor
+from Utility.excel_builder import build_excel_from_files, build_excel_from_rows
+from Services.prediction_storage_backend import create_storage_backend
 from Dtos.Response.prediction_response import PredictionResponse
 from Dtos.Request.penguin_input_request import PenguinInputRequest
 
@@ -19,16 +29,43 @@ load_dotenv()
 
 
 class PredictionStorageService:
-    def __init__(self):
+    def __init__(self, github_uploader: Optional[GitHubUploader] = None):
         self.logger = LoggerService("prediction_storage_service").get_logger()
         self.encoder = None
         self.class_labels = []
         self.constants = AppConstants
+        self.config = StorageConfig()
         self.storage_folder = self.constants.base_folder
         os.makedirs(self.storage_folder, exist_ok=True)
         self.csv_path = os.path.join(self.storage_folder, f"{self.constants.prediction_storage_base}.csv")
+
+        # CSV or Parquet; CSV and XLSX downloads are produced from whichever backend stores the rows
+        self.backend = create_storage_backend(self.config)
+        self.data_path = os.path.join(self.storage_folder,
+                                      f"{self.constants.prediction_storage_base}{self.backend.extension}")
         self.excel_path = os.path.join(self.storage_folder, f"{self.constants.prediction_storage_base}.xlsx")
-        self.github_uploader = GitHubUploader()
+        self.index_path = os.path.join(self.storage_folder, f"{self.constants.prediction_storage_base}.idx")
+        self.manifest_path = os.path.join(self.storage_folder, f"{self.constants.prediction_storage_base}_manifest.json")
+
+        # With sharding, predictions go to date/size-bounded shard files listed in a small manifest
+        self.local_manifest = self.load_local_manifest() if self.config.sharding_enabled else None
+        index_source = self.manifest_path if self.local_manifest else self.data_path
+        self.fingerprint_index = PredictionFingerprintIndex(self.index_path, index_source)
+        self.github_uploader = github_uploader or GitHubUploader()
+
+        # Excel is a derived artifact. The local workbook is keyed on the stored files themselves, so rows saved by
+        # another worker make it stale too; GitHub generations count this process's uploads
+        self.local_excel_cache = ExcelSnapshotCache()
+        self.excel_file_version = None
+        self.github_generation = 0
+        self.github_rows = None
+        self.github_row_keys = None
+        self.github_excel_target = self.constants.github_excel_path
+        self.github_manifest: Optional[PredictionShardManifest] = None
+        self.github_manifest_dirty = False
+        self.github_excel_cache = ExcelSnapshotCache()
+        self.github_excel_generation = 0
+        self.last_github_compaction = None
 
     async def ensure_model_loaded(self):
         if not model_loader.is_loaded():
@@ -53,6 +90,32 @@ class PredictionStorageService:
         rows = self.build_rows(batch_features, batch_predictions)
         return await self.save_predictions(rows)
 
+    async def prepare_rows(self, features_list: List[PenguinInputRequest],
+                           predictions_list: List[PredictionResponse]) -> List[Dict[str, Union[str, float]]]:
+        await self.ensure_model_loaded()
+        return self.build_rows(features_list, predictions_list)
+
+    async def prepare_result_rows(self, result: BatchPredictionResult) -> List[Dict[str, Union[str, float]]]:
+        await self.ensure_model_loaded()
+        return self.build_result_rows(result)
+
+    def build_result_rows(self, result: BatchPredictionResult) -> List[Dict[str, Union[str, float]]]:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        class_names = result.class_names.tolist()
+
+        return [
+            {
+                "bill_length_mm": bill_length_mm,
+                "flipper_length_mm": flipper_length_mm,
+                "prediction": label,
+                **dict(zip(class_names, probabilities)),
+                "model_version": result.model_version,
+                "prediction_timestamp": timestamp
+            }
+            for (bill_length_mm, flipper_length_mm), label, probabilities
+            in zip(result.features.tolist(), result.labels.tolist(), result.probabilities.tolist())
+        ]
+
     def build_rows(self, features_list: List[PenguinInputRequest], predictions_list: List[PredictionResponse]) \
             -> List[Dict[str, Union[str, float]]]:
         print("entered build rows")
@@ -66,7 +129,7 @@ class PredictionStorageService:
                 "flipper_length_mm": features.flipper_length_mm,
                 "prediction": prediction.prediction,
                 **{label: round(prediction.probabilities.get(label, 0.0), 2) for label in self.class_labels},
-                "model_version": self.constants.model_version,
+                "model_version": prediction.model_version or model_loader.get_version(),
                 "prediction_timestamp": timestamp
             }
             rows.append(row)
@@ -75,65 +138,134 @@ class PredictionStorageService:
         return rows
 
     async def save_predictions(self, rows: List[Dict]) -> bool:
-        existing_rows = await self.read_existing_rows()
-
-        normalized_existing = [normalize_row(r) for r in existing_rows]
-        normalized_new = [normalize_row(r) for r in rows]
-
-        new_rows = [rows[i] for i, r in enumerate(normalized_new) if r not in normalized_existing]
+        # A deduplicating backend (SQLite) rejects duplicates through its unique index. Shards are separate
+        # databases, so sharded storage still checks the history-wide fingerprint index first
+        use_index = not self.backend.deduplicates or self.local_manifest is not None
+        new_rows = rows
+        if use_index:
+            # The history is only read once, to build the index when it is missing or stale
+            await self.fingerprint_index.ensure_loaded(self.read_existing_rows)
+            new_rows = self.fingerprint_index.filter_new(rows)
 
         if not new_rows:
             self.logger.info("No new predictions to append. All entries are duplicates.")
             return False
 
-        await self.append_to_csv(new_rows)
-        await self.write_to_excel()
-        self.logger.info(f"Saved {len(new_rows)} new predictions.")
-        return True
+        shard = self.local_active_shard()
+        appended = await self.append_rows(new_rows, shard["path"] if shard else self.data_path)
+        if not appended:
+            if appended == 0:
+                self.logger.info("No new predictions to append. All entries are duplicates.")
+            return False
 
-    async def read_existing_rows(self) -> List[Dict]:
-        if not os.path.exists(self.csv_path):
-            return []
+        if shard:
+            # Written before the index, so the index stays newer than its source and is not rebuilt on restart
+            shard["rows"] += appended
+            await self.write_local_manifest()
 
-        try:
-            df = pd.read_csv(self.csv_path)
-            return df[self.csv_headers()].to_dict(orient='records')
-        except Exception as e:
-            self.logger.warning(f"Could not read existing rows: {e}")
-            return []
+        if use_index:
+            await self.fingerprint_index.add(new_rows)
+        self.logger.info(f"Saved {appended} new predictions.")
+        return True
 
-    async def append_to_csv(self, rows: List[Dict]):
-        file_exists = os.path.exists(self.csv_path)
-        buffer = None
+    async def read_existing_rows(self) -> List[Dict]:
+        rows = []
+        for path in self.stored_data_paths():
+            try:
+                df = await compute_executor.run_bulk(self.backend.read_frame, [path], self.csv_headers())
+                rows.extend(df.to_dict(orient='records'))
+            except Exception as e:
+                self.logger.warning(f"Could not read existing rows from {path}: {e}")
+        return rows
 
+    def load_local_manifest(self) -> PredictionShardManifest:
+        prefix = os.path.join(self.storage_folder, self.constants.shard_folder, self.constants.prediction_storage_base)
+        content = None
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, mode="rb") as f:
+                content = f.read()
+        return PredictionShardManifest.from_json(content, prefix, self.config.shard_max_rows, self.backend.extension)
+
+    async def write_local_manifest(self):
+        temp_path = f"{self.manifest_path}.tmp"
+        async with aiofiles.open(temp_path, mode="w", encoding="utf-8") as f:
+            await f.write(self.local_manifest.to_json())
+        os.replace(temp_path, self.manifest_path)
+
+    def local_active_shard(self) -> Optional[Dict]:
+        if not self.local_manifest:
+            return None
+
+        shard, created = self.local_manifest.active_shard()
+        if created:
+            os.makedirs(os.path.dirname(shard["path"]), exist_ok=True)
+            self.logger.info(f"Starting local prediction shard {shard['path']}")
+        return shard
+
+    def stored_data_paths(self) -> List[str]:
+        paths = self.local_manifest.paths() if self.local_manifest else [self.data_path]
+        return [path for path in paths if self.backend.exists(path)]
+
+    def stored_data_version(self) -> Tuple:
+        return tuple(self.backend.data_version(path) for path in self.stored_data_paths())
+
+    async def iter_stored_rows(self, chunk_size: int = 50_000) -> AsyncIterator[List[list]]:
+        # Shards are read one chunk at a time, so exports never hold the whole history in memory
+        headers = self.csv_headers()
+        for path in self.stored_data_paths():
+            frames = self.backend.iter_frames(path, chunk_size=chunk_size)
+            try:
+                while (chunk := await compute_executor.run_bulk(next, frames, None)) is not None:
+                    chunk = chunk.reindex(columns=headers)
+                    for column in chunk.select_dtypes(include="datetime").columns:
+                        chunk[column] = chunk[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+                    yield chunk.astype(object).where(chunk.notna(), None).values.tolist()
+            finally:
+                frames.close()
+
+    async def query_predictions(self, columns: Optional[List[str]] = None, filters=None) -> pd.DataFrame:
+        # Analytics read path: Parquet pushes the projection and filters down, CSV filters after parsing
+        return await compute_executor.run_bulk(self.backend.read_frame, self.stored_data_paths(), columns, filters)
+
+    async def append_rows(self, rows: List[Dict], path: Optional[str] = None) -> Optional[int]:
+        path = path or self.data_path
         try:
-            buffer = io.StringIO()
-            writer = csv.DictWriter(buffer, fieldnames=self.csv_headers())
-
-            if not file_exists:
-                writer.writeheader()
-
-            for row in rows:
-                writer.writerow(row)
-
-            # Write the buffered content to file asynchronously
-            async with aiofiles.open(self.csv_path, mode='a', encoding='utf-8') as f:
-                await f.write(buffer.getvalue())
-
-            self.logger.info(f"Successfully appended {len(rows)} rows to {self.csv_path}")
+            appended = await self.backend.append(path, rows, self.csv_headers())
+            self.logger.info(f"Successfully appended {appended} rows to {path}")
+            return appended
         except Exception as e:
-            self.logger.error(f"Failed to append to CSV file {self.csv_path}: {e}")
-        finally:
-            if buffer:
-                buffer.close()
-                self.logger.debug("CSV buffer closed successfully.")
+            self.logger.error(f"Failed to append to {self.backend.name} storage {path}: {e}")
+            return None
+
+    async def get_stored_predictions_page(self, page: int, page_size: int, filters=None) -> Tuple[int, List[Dict]]:
+        total, df = await compute_executor.run_bulk(self.backend.read_page, self.stored_data_paths(),
+                                                    (page - 1) * page_size, page_size, filters)
+        return total, df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+    async def get_predictions_excel(self) -> bytes:
+        version = await compute_executor.run_bulk(self.stored_data_version)
+        if not version:
+            raise ValueError("No stored predictions to export")
+        return await self.local_excel_cache.get(version, self.build_local_excel)
+
+    async def build_local_excel(self) -> bytes:
+        # Workbook serialisation holds the GIL, so it runs in the process pool, whose working directory may differ
+        paths = [os.path.abspath(path) for path in self.stored_data_paths()]
+        content = await compute_executor.run_process(build_excel_from_files, self.backend, paths)
+        self.logger.info(f"Excel snapshot built from {len(paths)} stored file(s).")
+        return content
 
     async def write_to_excel(self):
+        version = await compute_executor.run_bulk(self.stored_data_version)
+        if self.excel_file_version == version and os.path.exists(self.excel_path):
+            return
+
         try:
-            df = pd.read_csv(self.csv_path)
-            df.insert(0, 'id', range(1, len(df) + 1))
-            df.to_excel(self.excel_path, index=False)
-            self.logger.info(f"Excel file successfully written to {self.excel_path} with total rows now {len(df)}.")
+            content = await self.get_predictions_excel()
+            async with aiofiles.open(self.excel_path, mode='wb') as f:
+                await f.write(content)
+            self.excel_file_version = version
+            self.logger.info(f"Excel file successfully written to {self.excel_path}.")
         except Exception as e:
             self.logger.error(f"Failed to write Excel file: {e}")
 
@@ -162,49 +294,234 @@ class PredictionStorageService:
     async def upload_prediction_to_github(self, rows: List[Dict]) -> bool:
         self.logger.info("Preparing prediction data for GitHub upload")
 
-        # Fetch existing data
+        retries = self.github_uploader.config.github_conflict_retries
+        for attempt in range(retries + 1):
+            try:
+                return await self.merge_and_upload_to_github(rows)
+            except GitHubConflictError as ex:
+                # Another writer changed the CSV: the mirror entry is dropped, so the next attempt re-fetches it
+                self.logger.warning(f"{ex} (attempt {attempt + 1} of {retries + 1})")
+
+        self.logger.error("Giving up on the CSV upload after repeated SHA conflicts.")
+        return False
+
+    async def merge_and_upload_to_github(self, rows: List[Dict]) -> bool:
+        try:
+            csv_path = await self.resolve_github_csv_path()
+        except Exception as ex:
+            self.logger.error(f"Failed to load the GitHub shard manifest: {ex}")
+            return False
+        excel_path = self.github_excel_path_for(csv_path)
+
+        if self.github_uploader.config.github_bulk_commit_enabled:
+            return await self.commit_to_github(rows, csv_path, excel_path)
+
+        # Fetch existing data; when the Excel file is due as well, its SHA is looked up in parallel
         self.logger.info("Fetching existing data from GitHub repository")
-        existing_rows_csv = await self.github_uploader.get_existing_github_file_content(self.constants.github_csv_path)
-        existing_rows_excel = await self.github_uploader.get_existing_github_file_content(
-            self.constants.github_excel_path)
+        compact_excel = self.is_excel_compaction_due()
+        lookups = [self.github_uploader.get_github_file(csv_path)]
+        if compact_excel:
+            lookups.append(self.github_uploader.get_github_file_sha(excel_path))
 
-        # Deduplicate and merge
-        self.logger.info("Deduplicating and merging prediction data")
-        merged_rows_csv = deduplicate_rows(existing_rows_csv, rows, self.logger, "CSV")
-        merged_rows_excel = deduplicate_rows(existing_rows_excel, rows, self.logger, "Excel")
+        try:
+            results = await asyncio.gather(*lookups)
+        except Exception as ex:
+            self.logger.error(f"Failed to fetch existing GitHub prediction files: {ex}")
+            return False
+        existing_rows_csv, csv_sha = results[0]
+
+        merged_rows_csv = self.merge_github_rows(existing_rows_csv, rows)
 
         # Prepare contents
-        self.logger.info("Preparing CSV and Excel contents for upload")
+        self.logger.info("Preparing CSV content for upload")
         csv_content = self.prepare_csv_content(merged_rows_csv)
-        excel_content = self.prepare_excel_content(merged_rows_excel)
 
-        # Upload CSV
-        self.logger.info("Uploading CSV prediction file to GitHub")
-        csv_uploaded = await self.github_uploader.upload_to_github(
-            path=self.constants.github_csv_path,
+        # Upload CSV, and the Excel file built from the same rows when compaction is due, concurrently
+        self.logger.info(f"Uploading CSV prediction file to GitHub: {csv_path}")
+        uploads = [self.github_uploader.upload_to_github(
+            path=csv_path,
             content=csv_content,
-            is_binary=False
-        )
+            is_binary=False,
+            sha=csv_sha,
+            sha_known=True,
+            rows=merged_rows_csv
+        )]
+        if compact_excel:
+            uploads.append(self.upload_github_excel(self.github_generation + 1, merged_rows_csv, excel_path,
+                                                    results[1]))
+
+        csv_uploaded, *excel_uploaded = await asyncio.gather(*uploads, return_exceptions=True)
+        if isinstance(csv_uploaded, Exception):
+            self.github_row_keys = None
+            raise csv_uploaded
+
+        # Otherwise the Excel file is derived from the CSV and refreshed separately by compact_github_excel
+        self.record_github_upload(csv_uploaded, merged_rows_csv, csv_path,
+                                  bool(excel_uploaded) and excel_uploaded[0] is True)
+
+        # The manifest only changes when a shard is added, and it is published after the shard exists
+        if csv_uploaded and self.github_manifest_dirty:
+            await self.publish_github_manifest()
+        return csv_uploaded
+
+    async def commit_to_github(self, rows: List[Dict], csv_path: str, excel_path: str) -> bool:
+        # Bulk mode: the CSV, and the Excel file when compaction is due, land in one Git Data API commit
+        self.logger.info("Fetching existing data from GitHub repository")
+        try:
+            existing_rows_csv, csv_sha = await self.github_uploader.get_github_file(csv_path)
+        except Exception as ex:
+            self.logger.error(f"Failed to fetch existing GitHub prediction files: {ex}")
+            return False
+
+        merged_rows_csv = self.merge_github_rows(existing_rows_csv, rows)
+        files = {csv_path: (self.prepare_csv_content(merged_rows_csv), False)}
+
+        generation = self.github_generation + 1
+        compact_excel = self.is_excel_compaction_due()
+        if compact_excel:
+            async def build():
+                return await self.prepare_excel_content(merged_rows_csv)
+
+            files[excel_path] = (await self.github_excel_cache.get(generation, build), True)
+
+        manifest_included = self.github_manifest_dirty
+        if manifest_included:
+            self.github_manifest.set_rows(csv_path, len(merged_rows_csv))
+            files[self.constants.github_manifest_path] = (self.github_manifest.to_json(), False)
+
+        self.logger.info(f"Committing {len(files)} prediction file(s) to GitHub (generation {generation})")
+        try:
+            committed = await self.github_uploader.commit_files(
+                files,
+                message=f"Update prediction files ({len(rows)} new rows)",
+                expected_shas={csv_path: csv_sha},
+                rows={csv_path: merged_rows_csv}
+            )
+        except GitHubConflictError:
+            self.github_row_keys = None
+            raise
+
+        self.record_github_upload(committed, merged_rows_csv, csv_path, compact_excel)
+        if committed and manifest_included:
+            self.github_manifest_dirty = False
+        return committed
+
+    async def resolve_github_csv_path(self) -> str:
+        if not self.config.sharding_enabled:
+            return self.constants.github_csv_path
+
+        if self.github_manifest is None:
+            document, _ = await self.github_uploader.get_github_json(self.constants.github_manifest_path)
+            self.github_manifest = PredictionShardManifest.from_dict(document, self.constants.github_shard_prefix,
+                                                                     self.config.shard_max_rows)
+
+        # Only the active shard is read and rewritten, so a flush costs the same after months of history
+        shard, created = self.github_manifest.active_shard()
+        if created:
+            self.logger.info(f"Starting GitHub prediction shard {shard['path']}")
+            self.github_manifest_dirty = True
+        return shard["path"]
+
+    def github_excel_path_for(self, csv_path: str) -> str:
+        if csv_path == self.constants.github_csv_path:
+            return self.constants.github_excel_path
+        return f"{os.path.splitext(csv_path)[0]}.xlsx"
+
+    async def publish_github_manifest(self) -> bool:
+        content = self.github_manifest.to_json()
+        try:
+            published = await self.github_uploader.upload_to_github(self.constants.github_manifest_path, content,
+                                                                    is_binary=False,
+                                                                    rows=[self.github_manifest.to_dict()])
+        except GitHubConflictError:
+            # Shards are append-only and the manifest is ours, so the latest version simply replaces it
+            published = await self.github_uploader.upload_to_github(self.constants.github_manifest_path, content,
+                                                                    is_binary=False)
+
+        if published:
+            self.github_manifest_dirty = False
+        else:
+            self.logger.warning("Failed to publish the GitHub shard manifest, retrying on the next flush.")
+        return published
 
+    def merge_github_rows(self, existing_rows_csv: List[Dict], rows: List[Dict]) -> List[Dict]:
+        # Deduplicate and merge; keys of rows that came from our own mirror are reused instead of recomputed
+        self.logger.info("Deduplicating and merging prediction data")
+        if existing_rows_csv is not self.github_rows or self.github_row_keys is None:
+            self.github_row_keys = {json.dumps(normalize_row(row), sort_keys=True) for row in existing_rows_csv}
+        return deduplicate_rows(existing_rows_csv, rows, self.logger, "CSV", self.github_row_keys)
+
+    def record_github_upload(self, csv_uploaded: bool, merged_rows_csv: List[Dict], csv_path: str,
+                             excel_uploaded: bool):
         if csv_uploaded:
             self.logger.info("CSV prediction file uploaded successfully.")
+            self.github_rows = merged_rows_csv
+            self.github_excel_target = self.github_excel_path_for(csv_path)
+            self.github_generation += 1
+            if self.github_manifest is not None:
+                self.github_manifest.set_rows(csv_path, len(merged_rows_csv))
+            if excel_uploaded:
+                self.github_excel_generation = self.github_generation
+                self.last_github_compaction = time.monotonic()
         else:
+            # The keys already include the rows that were not uploaded
+            self.github_row_keys = None
             self.logger.error("Failed to upload CSV prediction file.")
 
-        # Upload Excel
-        self.logger.info("Uploading Excel prediction file to GitHub")
-        excel_uploaded = await self.github_uploader.upload_to_github(
-            path=self.constants.github_excel_path,
-            content=excel_content,
-            is_binary=True
-        )
+    def is_excel_compaction_due(self) -> bool:
+        interval = self.config.excel_compaction_interval_seconds
+        return self.last_github_compaction is None or time.monotonic() - self.last_github_compaction >= interval
+
+    async def upload_github_excel(self, generation: int, rows: List[Dict], excel_path: str, sha: Optional[str] = None,
+                                  sha_known: bool = True) -> bool:
+        async def build():
+            return await self.prepare_excel_content(rows)
+
+        excel_content = await self.github_excel_cache.get(generation, build)
+
+        self.logger.info(f"Uploading Excel prediction file to GitHub (generation {generation})")
+        try:
+            excel_uploaded = await self.send_github_excel(excel_path, excel_content, sha, sha_known)
+        except GitHubConflictError as ex:
+            # The workbook is derived from the CSV, so it simply replaces whatever version is there now
+            self.logger.warning(f"{ex}, retrying with the current SHA")
+            excel_uploaded = await self.send_github_excel(excel_path, excel_content)
 
         if excel_uploaded:
             self.logger.info("Excel prediction file uploaded successfully.")
         else:
             self.logger.error("Failed to upload Excel prediction file.")
+        return excel_uploaded
 
-        return csv_uploaded and excel_uploaded
+    async def send_github_excel(self, excel_path: str, excel_content: str, sha: Optional[str] = None,
+                                sha_known: bool = False) -> bool:
+        if self.github_uploader.config.github_bulk_commit_enabled:
+            return await self.github_uploader.commit_files({excel_path: (excel_content, True)},
+                                                           message="Refresh prediction workbook")
+
+        return await self.github_uploader.upload_to_github(
+            path=excel_path,
+            content=excel_content,
+            is_binary=True,
+            sha=sha,
+            sha_known=sha_known
+        )
+
+    async def compact_github_excel(self, force: bool = False) -> bool:
+        if self.github_rows is None or self.github_excel_generation == self.github_generation:
+            return True
+
+        if not force and not self.is_excel_compaction_due():
+            return True
+
+        generation = self.github_generation
+        excel_uploaded = await self.upload_github_excel(generation, self.github_rows, self.github_excel_target,
+                                                        sha_known=False)
+        if excel_uploaded:
+            self.github_excel_generation = generation
+            self.last_github_compaction = time.monotonic()
+
+        return excel_uploaded
 
     def prepare_csv_content(self, rows: List[Dict]) -> str:
         headers = self.csv_headers()
@@ -228,7 +545,7 @@ class PredictionStorageService:
 
         return csv_content
 
-    def prepare_excel_content(self, rows: List[Dict]) -> str:
+    async def prepare_excel_content(self, rows: List[Dict]) -> str:
         headers = self.csv_headers()
 
         # Normalize and filter rows
@@ -242,11 +559,8 @@ class PredictionStorageService:
         ]
 
         # Generate Excel content from filtered rows
-        df = pd.DataFrame(filtered_rows, columns=headers)
-        excel_buffer = io.BytesIO()
-        df.to_excel(excel_buffer, index=False)
-        excel_buffer.seek(0)
-        encoded_content = base64.b64encode(excel_buffer.read()).decode("utf-8")
+        excel_content = await compute_executor.run_process(build_excel_from_rows, filtered_rows, headers)
+        encoded_content = base64.b64encode(excel_content).decode("utf-8")
 
         return encoded_content
 
@@ -276,11 +590,14 @@ def normalize_row(row: Dict) -> Dict:
     }
 
 
-def deduplicate_rows(existing: List[Dict], new: List[Dict], logger, label: str) -> List[Dict]:
-    existing_normalized = {
-        json.dumps(normalize_row(row), sort_keys=True)
-        for row in existing
-    }
+def deduplicate_rows(existing: List[Dict], new: List[Dict], logger, label: str,
+                     existing_normalized: Optional[set] = None) -> List[Dict]:
+    # existing_normalized, when given, holds the keys of the existing rows and is extended with the new ones
+    if existing_normalized is None:
+        existing_normalized = {
+            json.dumps(normalize_row(row), sort_keys=True)
+            for row in existing
+        }
 
     unique_new = []
     duplicate_count = 0
@@ -289,6 +606,7 @@ def deduplicate_rows(existing: List[Dict], new: List[Dict], logger, label: str)
         normalized = json.dumps(normalize_row(row), sort_keys=True)
         if normalized not in existing_normalized:
             unique_new.append(row)
+            existing_normalized.add(normalized)
         else:
             duplicate_count += 1
 
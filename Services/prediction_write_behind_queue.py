@@ -0,0 +1,239 @@
+import os
+import glob
+import json
+import time
+import uuid
+import asyncio
+import aiofiles
+from typing import Awaitable, Callable, Dict, List, Optional
+from Services.logger_service import LoggerService
+from Config.write_behind_config import WriteBehindConfig
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def lock_file(handle, blocking: bool = True) -> bool:
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class PredictionWriteBehindQueue:
+    def __init__(self, flush_handler: Callable[[List[Dict]], Awaitable[bool]],
+                 config: Optional[WriteBehindConfig] = None,
+                 maintenance_handler: Optional[Callable[[], Awaitable]] = None):
+        self.logger = LoggerService("prediction_write_behind_queue").get_logger()
+        self.config = config or WriteBehindConfig()
+        self.flush_handler = flush_handler
+        self.maintenance_handler = maintenance_handler
+        # Every worker process appends to and rewrites only its own spool file, held under an exclusive lock for
+        # as long as the queue lives; the configured path is just the stem the per-process files are named after
+        self.shared_spool_path = self.config.spool_path
+        spool_root, spool_ext = os.path.splitext(self.shared_spool_path)
+        self.spool_pattern = f"{glob.escape(spool_root)}.*{spool_ext}"
+        self.spool_path = f"{spool_root}.{os.getpid()}-{uuid.uuid4().hex[:8]}{spool_ext}"
+        self.adoption_lock_path = f"{spool_root}.lock"
+        self._owner_lock = None
+
+        self._buffer: List[Dict] = []
+        self._oldest_pending_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._spool_lock = asyncio.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats = {
+            "enqueued_rows": 0,
+            "rejected_rows": 0,
+            "flushed_rows": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "pending_high_watermark": 0,
+            "last_flush_rows": 0,
+            "last_flush_seconds": 0.0
+        }
+
+        self.restore_spool()
+
+    def restore_spool(self):
+        os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+        self._owner_lock = open(f"{self.spool_path}.lock", "w")
+        lock_file(self._owner_lock)
+
+        # Adopting is serialised across workers, so an orphaned spool is taken over by exactly one of them
+        with open(self.adoption_lock_path, "a") as adoption_lock:
+            lock_file(adoption_lock)
+            # A crashed worker can leave its lock file behind without a spool, so both are looked for
+            candidates = glob.glob(self.spool_pattern) + glob.glob(f"{self.spool_pattern}.lock")
+            spools = {path[:-len(".lock")] if path.endswith(".lock") else path for path in candidates}
+            if os.path.exists(self.shared_spool_path):
+                spools.add(self.shared_spool_path)
+            for path in sorted(spools - {self.spool_path}):
+                if not path.endswith(".tmp"):
+                    self.adopt_spool(path)
+
+        if self._buffer:
+            self._oldest_pending_at = time.monotonic()
+
+    def adopt_spool(self, path: str):
+        owner_lock_path = f"{path}.lock"
+        owner_lock = open(owner_lock_path, "a") if os.path.exists(owner_lock_path) else None
+        try:
+            # A spool whose owner still holds its lock belongs to a live worker and is left alone
+            if owner_lock and not lock_file(owner_lock, blocking=False):
+                return
+            rows = []
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                # Copied into this worker's spool before the orphan is removed, so a crash here duplicates, never loses
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(row) + "\n" for row in rows))
+                self._buffer.extend(rows)
+                os.remove(path)
+            if owner_lock:
+                os.remove(owner_lock_path)
+            if rows:
+                self.logger.info(f"Restored {len(rows)} pending predictions from {path}")
+        except Exception as e:
+            self.logger.error(f"Failed to restore write-behind spool {path}: {e}")
+        finally:
+            if owner_lock:
+                owner_lock.close()
+
+    def release_spool(self):
+        # Leftover rows stay in this worker's spool; once the lock is gone the next worker to start adopts them
+        if self._owner_lock:
+            if not self._buffer:
+                with open(self.adoption_lock_path, "a") as adoption_lock:
+                    lock_file(adoption_lock)
+                    for path in (self.spool_path, f"{self.spool_path}.lock"):
+                        if os.path.exists(path):
+                            os.remove(path)
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    async def enqueue(self, rows: List[Dict]) -> bool:
+        if not rows:
+            return True
+
+        if len(self._buffer) + len(rows) > self.config.max_pending_rows:
+            self.stats["rejected_rows"] += len(rows)
+            self.logger.warning(f"Write-behind queue full ({len(self._buffer)} pending), rejected {len(rows)} rows")
+            return False
+
+        async with self._spool_lock:
+            # Spool first, so a row that is accepted survives a restart before it is flushed
+            os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+            async with aiofiles.open(self.spool_path, mode="a", encoding="utf-8") as f:
+                await f.write("".join(json.dumps(row) + "\n" for row in rows))
+
+            if not self._buffer:
+                self._oldest_pending_at = time.monotonic()
+            self._buffer.extend(rows)
+
+        self.stats["enqueued_rows"] += len(rows)
+        self.stats["pending_high_watermark"] = max(self.stats["pending_high_watermark"], len(self._buffer))
+
+        if len(self._buffer) >= self.config.max_batch_rows:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> bool:
+        async with self._flush_lock:
+            if not self._buffer:
+                return True
+
+            batch = self._buffer[:self.config.max_batch_rows]
+            started = time.perf_counter()
+
+            try:
+                success = await self.flush_handler(batch)
+            except Exception as ex:
+                self.logger.exception(f"Write-behind flush raised: {ex}")
+                success = False
+
+            self.stats["last_flush_seconds"] = round(time.perf_counter() - started, 4)
+
+            if not success:
+                # Rows stay queued (and spooled) and are retried on the next window
+                self.stats["failed_flushes"] += 1
+                self.logger.error(f"Write-behind flush of {len(batch)} rows failed, will retry")
+                return False
+
+            async with self._spool_lock:
+                del self._buffer[:len(batch)]
+                await self.rewrite_spool()
+                self._oldest_pending_at = time.monotonic() if self._buffer else None
+
+            self.stats["flushes"] += 1
+            self.stats["flushed_rows"] += len(batch)
+            self.stats["last_flush_rows"] = len(batch)
+            self.logger.info(f"Write-behind flushed {len(batch)} rows in {self.stats['last_flush_seconds']}s")
+
+            if len(self._buffer) >= self.config.max_batch_rows:
+                self._wakeup.set()
+            return True
+
+    async def rewrite_spool(self):
+        temp_path = f"{self.spool_path}.tmp"
+        async with aiofiles.open(temp_path, mode="w", encoding="utf-8") as f:
+            await f.write("".join(json.dumps(row) + "\n" for row in self._buffer))
+        os.replace(temp_path, self.spool_path)
+
+    async def run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.config.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            await self.run_maintenance()
+
+    async def run_maintenance(self):
+        if not self.maintenance_handler:
+            return
+        try:
+            await self.maintenance_handler()
+        except Exception as ex:
+            self.logger.exception(f"Write-behind maintenance raised: {ex}")
+
+    async def start(self):
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self.run())
+            self.logger.info("Write-behind worker started")
+
+    async def stop(self):
+        if self._worker:
+            # Let an in-progress window finish instead of cancelling it half-uploaded
+            self._stopping = True
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+
+        # Final best-effort flush; anything left over stays in the spool for the next start
+        while self._buffer and await self.flush():
+            pass
+        self.release_spool()
+        self.logger.info("Write-behind worker stopped")
+
+    def get_stats(self) -> Dict:
+        oldest_age = time.monotonic() - self._oldest_pending_at if self._oldest_pending_at else 0.0
+        return {
+            **self.stats,
+            "pending_rows": len(self._buffer),
+            "max_pending_rows": self.config.max_pending_rows,
+            "oldest_pending_seconds": round(oldest_age, 3)
+        }
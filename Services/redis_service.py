@@ -2,7 +2,7 @@ import asyncio
 import os
 import json
 import gzip
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 from redis.asyncio import Redis
@@ -13,8 +13,8 @@ class RedisService:
     _instance = None
     _lock = asyncio.Lock()
 
-    def __init__(self):
-        self.redis = None
+    def __init__(self, redis: Optional[Redis] = None):
+        self.redis = redis
         self.logger = LoggerService("prediction_service").get_logger()
 
     @classmethod
@@ -66,6 +66,30 @@ class RedisService:
             self.logger.error(f"Failed to read from cache ({key}): {e}")
             raise
 
+    async def read_many_raw(self, keys: List[str]) -> List[Optional[bytes]]:
+        # One MGET round trip for the whole batch; missing keys come back as None
+        if not keys:
+            return []
+
+        try:
+            return await self.redis.mget(keys)
+        except Exception as e:
+            self.logger.error(f"Failed to read {len(keys)} keys from cache: {e}")
+            raise
+
+    async def write_many_raw(self, items: Dict[str, bytes], *, ex: int | None = None):
+        if not items:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, data in items.items():
+                    pipe.set(key, data, ex=ex)
+                await pipe.execute()
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(items)} keys to cache: {e}")
+            raise
+
     async def delete(self, key: str):
         try:
             await self.redis.delete(key)
@@ -0,0 +1,85 @@
+import numpy as np
+from typing import Awaitable, Callable, Dict, List, Optional
+from Config.inference_config import InferenceConfig
+from Services.redis_service import RedisService
+from Services.logger_service import LoggerService
+from Utility.prediction_codec import PredictionCodec
+from Infrastructure.app_constants import AppConstants
+
+
+class SharedPredictionCache:
+    def __init__(self, config: Optional[InferenceConfig] = None, redis_service: Optional[RedisService] = None):
+        self.logger = LoggerService("shared_prediction_cache").get_logger()
+        self.config = config or InferenceConfig()
+        self.redis_service = redis_service
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def enabled(self) -> bool:
+        return self.config.shared_prediction_cache_enabled
+
+    async def get_redis(self) -> RedisService:
+        if self.redis_service is None:
+            self.redis_service = await RedisService.get_instance()
+        return self.redis_service
+
+    @staticmethod
+    def make_keys(model_version: str, features: np.ndarray) -> List[str]:
+        # repr keeps the exact float, so a hit is always the model output for exactly these inputs
+        return [f"{AppConstants.prediction_cache_key_prefix}:{model_version}:{bill!r}:{flipper!r}"
+                for bill, flipper in features.tolist()]
+
+    async def predict_proba(self, model_version: str, features: np.ndarray, class_count: int,
+                            compute: Callable[[np.ndarray], Awaitable[np.ndarray]]) -> np.ndarray:
+        if not self.enabled() or not len(features):
+            return await compute(features)
+
+        # Repeated rows inside a batch share one key and one model evaluation
+        unique_features, inverse = np.unique(features, axis=0, return_inverse=True)
+        keys = self.make_keys(model_version, unique_features)
+
+        try:
+            redis_service = await self.get_redis()
+            blobs = await redis_service.read_many_raw(keys)
+        except Exception as ex:
+            self.errors += 1
+            self.logger.warning(f"Shared prediction cache unavailable, computing all rows: {ex}")
+            return await compute(features)
+
+        probabilities = np.empty((len(unique_features), class_count), dtype=float)
+        missing = []
+        for index, blob in enumerate(blobs):
+            row = PredictionCodec.decode_probabilities(blob, class_count)
+            if row is None:
+                missing.append(index)
+            else:
+                probabilities[index] = row
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = await compute(unique_features[missing])
+            probabilities[missing] = computed
+            await self.store(redis_service, [keys[index] for index in missing], computed)
+
+        return probabilities[inverse.reshape(-1)]
+
+    async def store(self, redis_service: RedisService, keys: List[str], probabilities: np.ndarray):
+        try:
+            await redis_service.write_many_raw(dict(zip(keys, PredictionCodec.encode_probabilities(probabilities))),
+                                               ex=self.config.shared_prediction_cache_ttl_seconds)
+        except Exception as ex:
+            self.errors += 1
+            self.logger.warning(f"Failed to store {len(keys)} predictions in the shared cache: {ex}")
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors
+        }
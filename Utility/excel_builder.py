@@ -0,0 +1,25 @@
+import io
+import pandas as pd
+from typing import Dict, List, Union
+from Services.prediction_storage_backend import PredictionStorageBackend
+
+# Module-level and dependency-light so the process pool can import and pickle these cheaply
+
+
+def build_excel_from_files(backend: PredictionStorageBackend, paths: Union[str, List[str]],
+                           add_id_column: bool = True) -> bytes:
+    # The backend reads its own on-disk format, so the workbook looks the same whichever one stores the rows
+    paths = [paths] if isinstance(paths, str) else paths
+    df = backend.read_frame(paths)
+    if add_id_column:
+        df.insert(0, 'id', range(1, len(df) + 1))
+    excel_buffer = io.BytesIO()
+    df.to_excel(excel_buffer, index=False)
+    return excel_buffer.getvalue()
+
+
+def build_excel_from_rows(rows: List[Dict], headers: List[str]) -> bytes:
+    df = pd.DataFrame(rows, columns=headers)
+    excel_buffer = io.BytesIO()
+    df.to_excel(excel_buffer, index=False)
+    return excel_buffer.getvalue()
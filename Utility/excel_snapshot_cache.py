@@ -0,0 +1,25 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional, Union
+
+
+class ExcelSnapshotCache:
+    def __init__(self):
+        self.generation: Optional[Hashable] = None
+        self.content: Optional[Union[bytes, str]] = None
+        self.builds = 0
+        self.hits = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, generation: Hashable, build: Callable[[], Awaitable[Union[bytes, str]]]) -> Union[bytes, str]:
+        async with self._lock:
+            if self.content is not None and self.generation == generation:
+                self.hits += 1
+                return self.content
+
+            self.content = await build()
+            self.generation = generation
+            self.builds += 1
+            return self.content
+
+    def is_current(self, generation: Hashable) -> bool:
+        return self.content is not None and self.generation == generation
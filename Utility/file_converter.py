@@ -1,105 +1,93 @@
 import io
+import os
 import csv
-import pandas as pd
-from typing import List, Any
+import tempfile
+import aiofiles
 from datetime import datetime
+from typing import List, AsyncIterator
 from Enums.file_type_enum import FileExportType
 from starlette.responses import StreamingResponse
+from Core.global_compute_executor import compute_executor
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 
 class FileConverter:
+    file_read_size = 64 * 1024
 
     @staticmethod
-    def convert(data: List[Any], export_format: FileExportType, title: str = "export") -> StreamingResponse:
-        if not data:
-            raise ValueError("No data to export")
-
+    def stream(headers: List[str], row_blocks: AsyncIterator[List[list]], export_format: FileExportType,
+               title: str = "export") -> StreamingResponse:
         timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
         filename = f"{title}_{timestamp}"
 
         if export_format == FileExportType.csv:
-            return FileConverter._to_csv(data, filename)
+            return FileConverter._to_csv(headers, row_blocks, filename)
         elif export_format == FileExportType.excel:
-            return FileConverter._to_excel(data, filename)
+            return FileConverter._to_excel(headers, row_blocks, filename)
         else:
             raise ValueError("Unsupported export format")
 
     @staticmethod
-    def _to_csv(data_list: List[Any], filename: str) -> StreamingResponse:
-        if not data_list:
-            raise ValueError("No data to export")
-
-        # Flatten data
-        flattened = []
-        for item in data_list:
-            row = {}
-            for key, value in item.dict().items():
-                if isinstance(value, dict):
-                    row.update({k: v for k, v in value.items()})
-                else:
-                    row[key] = value
-            flattened.append(row)
-
-        headers = flattened[0].keys()
-
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(flattened)
-
-        # Add metadata as a comment at the top
-        metadata = {
-            "record_count": len(data_list),
-            "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        metadata_lines = [f"# {key}: {value}" for key, value in metadata.items()]
-        metadata_str = "\n".join(metadata_lines) + "\n"
-
-        final_output = io.BytesIO()
-        final_output.write(metadata_str.encode())
-        final_output.write(output.getvalue().encode())
-        final_output.seek(0)
+    def _to_csv(headers: List[str], row_blocks: AsyncIterator[List[list]], filename: str) -> StreamingResponse:
+        async def generate():
+            # Rows are sent as they are produced, before the total is known, so the CSV has no record_count comment;
+            # the XLSX export records it on its Metadata sheet
+            yield f"# exported_at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n".encode()
+            yield FileConverter.format_csv_rows([headers])
+
+            async for rows in row_blocks:
+                yield await compute_executor.run_bulk(FileConverter.format_csv_rows, rows)
 
         return StreamingResponse(
-            final_output,
+            generate(),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
     @staticmethod
-    def _to_excel(data_list: List[Any], filename: str) -> StreamingResponse:
-        if not data_list:
-            raise ValueError("No data to export")
-
-        # Extract records
-        export_data = []
-        for item in data_list:
-            row = {}
-            for key, value in item.dict().items():
-                if isinstance(value, dict):
-                    row.update({k: v for k, v in value.items()})
-                else:
-                    row[key] = value
-            export_data.append(row)
-
-        df = pd.DataFrame(export_data)
-
-        # Create metadata
-        metadata = {
-            "record_count": len(data_list),
-            "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        metadata_df = pd.DataFrame([metadata])
-
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df.to_excel(writer, index=False, sheet_name="Predictions")
-            metadata_df.to_excel(writer, index=False, sheet_name="Metadata")
-
-        output.seek(0)
+    def format_csv_rows(rows: List[list]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def write_sheet_rows(sheet, first_row: int, rows: List[list]):
+        for offset, row in enumerate(rows):
+            sheet.write_row(first_row + offset, 0, row)
+
+    @staticmethod
+    def _to_excel(headers: List[str], row_blocks: AsyncIterator[List[list]], filename: str) -> StreamingResponse:
+        async def generate():
+            import xlsxwriter
+
+            # constant_memory flushes each row to disk as it is written, so the workbook never sits in memory
+            handle, path = tempfile.mkstemp(suffix=".xlsx")
+            os.close(handle)
+
+            try:
+                workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+                sheet = workbook.add_worksheet("Predictions")
+                sheet.write_row(0, 0, headers)
+
+                record_count = 0
+                async for rows in row_blocks:
+                    await compute_executor.run_bulk(FileConverter.write_sheet_rows, sheet, record_count + 1, rows)
+                    record_count += len(rows)
+
+                metadata = workbook.add_worksheet("Metadata")
+                metadata.write_row(0, 0, ["record_count", "exported_at"])
+                metadata.write_row(1, 0, [record_count, datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+                workbook.close()
+
+                async with aiofiles.open(path, mode="rb") as f:
+                    while block := await f.read(FileConverter.file_read_size):
+                        yield block
+            finally:
+                os.remove(path)
 
         return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            generate(),
+            media_type=EXCEL_MEDIA_TYPE,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
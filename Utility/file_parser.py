@@ -1,45 +1,111 @@
-import io
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
-from typing import List
 from fastapi import UploadFile
+from typing import AsyncIterator, Iterator
 from Services.logger_service import LoggerService
-from Dtos.Request.penguin_input_request import PenguinInputRequest
+from Infrastructure.app_constants import AppConstants
+from Core.global_compute_executor import compute_executor
 
 
 class FileParser:
     logger = LoggerService("FileParser").get_logger()
+    required_columns = AppConstants.feature_columns
+    default_chunk_size = 50_000
 
     @staticmethod
-    async def parse_penguin_file(file: UploadFile) -> List[PenguinInputRequest]:
-        try:
-            FileParser.logger.info(f"Starting to parse file: {file.filename}")
-
-            contents = await file.read()
-            df = None
-
-            if file.filename.endswith(".csv"):
-                df = pd.read_csv(io.BytesIO(contents))
-            elif file.filename.endswith((".xls", ".xlsx")):
-                df = pd.read_excel(io.BytesIO(contents))
-            else:
-                raise ValueError("Unsupported file type. Only CSV and Excel files are allowed.")
-
-            # Log the number of rows in the file
-            FileParser.logger.info(f"Loaded file: {file.filename} with {len(df)} rows.")
-
-            # Check if required columns are present
-            required_columns = {"bill_length_mm", "flipper_length_mm"}
-            if not required_columns.issubset(df.columns):
-                raise ValueError(f"Missing required columns: {required_columns - set(df.columns)}")
-
-            return [
-                PenguinInputRequest(
-                    bill_length_mm=row["bill_length_mm"],
-                    flipper_length_mm=row["flipper_length_mm"]
-                )
-                for _, row in df.iterrows()
-            ]
+    async def iter_penguin_feature_chunks(file: UploadFile, chunk_size: int = default_chunk_size) \
+            -> AsyncIterator[np.ndarray]:
+        FileParser.logger.info(f"Starting to stream file: {file.filename}")
+        rows_read = 0
 
+        frames = FileParser.iter_frames(file, chunk_size)
+        try:
+            # Reading and validating a chunk is blocking pandas work, so it runs off the event loop
+            while (chunk := await compute_executor.run_bulk(next, frames, None)) is not None:
+                features = await compute_executor.run_bulk(FileParser.validate_chunk, chunk, rows_read)
+                if not len(features):
+                    continue
+                rows_read += len(features)
+                yield features
         except Exception as ex:
-            FileParser.logger.error(f"File parsing failed for {file.filename}: {str(ex)}")
-            raise ValueError("Failed to parse input file.")
+            FileParser.logger.error(f"File parsing failed for {file.filename} after {rows_read} rows: {str(ex)}")
+            raise ValueError(f"Failed to parse input file. {ex}")
+        finally:
+            frames.close()
+
+        FileParser.logger.info(f"Streamed file: {file.filename} with {rows_read} rows.")
+
+    @staticmethod
+    async def detach_upload(file: UploadFile) -> UploadFile:
+        # FastAPI closes request uploads when the handler returns, before a streaming response body runs,
+        # so streamed exports read from a copy they own (spooled to disk above 1 MB). Uploads can be hundreds
+        # of MB, so the copy runs on the bulk pool rather than the event loop
+        copy = await compute_executor.run_bulk(FileParser.copy_upload, file.file)
+        return UploadFile(file=copy, filename=file.filename)
+
+    @staticmethod
+    def copy_upload(source) -> tempfile.SpooledTemporaryFile:
+        copy = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        source.seek(0)
+        shutil.copyfileobj(source, copy, 1024 * 1024)
+        copy.seek(0)
+        return copy
+
+    @staticmethod
+    def iter_frames(file: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+        # UploadFile spools large uploads to disk, so reading from file.file never holds the whole upload in memory
+        file.file.seek(0)
+
+        if file.filename.endswith(".csv"):
+            reader = pd.read_csv(file.file, usecols=lambda column: column in FileParser.required_columns,
+                                 chunksize=chunk_size)
+            with reader:
+                yield from reader
+        elif file.filename.endswith(".xlsx"):
+            yield from FileParser.iter_xlsx_frames(file.file, chunk_size)
+        elif file.filename.endswith(".xls"):
+            # Legacy .xls has no streaming reader, so it is loaded whole
+            yield pd.read_excel(file.file, usecols=lambda column: column in FileParser.required_columns)
+        else:
+            raise ValueError("Unsupported file type. Only CSV and Excel files are allowed.")
+
+    @staticmethod
+    def iter_xlsx_frames(source, chunk_size: int) -> Iterator[pd.DataFrame]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+            positions = [header.index(column) for column in FileParser.required_columns if column in header]
+            columns = [header[position] for position in positions]
+
+            batch = []
+            for row in rows:
+                batch.append([row[position] if position < len(row) else None for position in positions])
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame(batch, columns=columns)
+                    batch = []
+
+            if batch or not columns:
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def validate_chunk(df: pd.DataFrame, row_offset: int) -> np.ndarray:
+        missing = [column for column in FileParser.required_columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {set(missing)}")
+
+        features = df[FileParser.required_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+        invalid = np.flatnonzero(~np.isfinite(features).all(axis=1))
+        if len(invalid):
+            # Report spreadsheet row numbers: one for the header plus one because rows are 1-based
+            row_numbers = (invalid[:5] + row_offset + 2).tolist()
+            raise ValueError(f"{len(invalid)} rows have missing or non-numeric values (e.g. rows {row_numbers})")
+
+        return features
@@ -0,0 +1,43 @@
+import bisect
+from typing import Dict, List, Optional
+
+
+class LatencyHistogram:
+    default_bounds = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000]
+
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = bounds or self.default_bounds
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, fraction: float) -> float:
+        # Bucket upper bound that covers the requested fraction of observations
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + [self.maximum], self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.maximum, 3),
+            "buckets": {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+                       | {"le_inf": self.counts[-1]}
+        }
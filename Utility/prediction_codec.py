@@ -0,0 +1,19 @@
+import numpy as np
+from typing import List, Optional
+
+# Probabilities are stored as raw little-endian float64, one value per class in class_names order.
+# The class names themselves are not stored: keys carry the model artifact key, which fixes the class order.
+PROBABILITY_DTYPE = np.dtype("<f8")
+
+
+class PredictionCodec:
+    @staticmethod
+    def encode_probabilities(probabilities: np.ndarray) -> List[bytes]:
+        rows = np.ascontiguousarray(probabilities, dtype=PROBABILITY_DTYPE)
+        return [row.tobytes() for row in rows]
+
+    @staticmethod
+    def decode_probabilities(blob: Optional[bytes], class_count: int) -> Optional[np.ndarray]:
+        if blob is None or len(blob) != class_count * PROBABILITY_DTYPE.itemsize:
+            return None
+        return np.frombuffer(blob, dtype=PROBABILITY_DTYPE)
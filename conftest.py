@@ -0,0 +1,180 @@
+import json
+import base64
+import hashlib
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GitHubApiStub:
+    """Minimal local stand-in for the GitHub contents and Git Data APIs used by GitHubUploader."""
+
+    def __init__(self):
+        self.files = {}
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {"initial": {"tree": self.store_tree({}), "parent": None}}
+        self.head = "initial"
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.build_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @staticmethod
+    def blob_sha(content: bytes) -> str:
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+    @staticmethod
+    def object_sha(kind: str, value) -> str:
+        return hashlib.sha1(f"{kind} {json.dumps(value, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+    def store_tree(self, entries: dict) -> str:
+        sha = self.object_sha("tree", entries)
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def store_commit(self, tree: str, parent: str) -> str:
+        sha = self.object_sha("commit", [tree, parent, len(self.commits)])
+        self.commits[sha] = {"tree": tree, "parent": parent}
+        return sha
+
+    def write_file(self, path: str, content: bytes):
+        # Commits a file directly on the branch, the way another writer would
+        self.blobs[self.blob_sha(content)] = content
+        self.files[path] = content
+        tree = self.store_tree({name: self.blob_sha(data) for name, data in self.files.items()})
+        self.head = self.store_commit(tree, self.head)
+
+    def count(self, method: str, fragment: str = "") -> int:
+        return sum(1 for m, path in self.requests if m == method and fragment in path)
+
+    def build_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status: int, body=None, headers=None):
+                payload = json.dumps(body or {}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def file_path(self):
+                return self.path.split("/contents/", 1)[1].split("?", 1)[0]
+
+            def git_path(self):
+                return self.path.split("/git/", 1)[1].split("?", 1)[0]
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append(("GET", self.path))
+                    if "/git/" in self.path:
+                        return self.get_git_object(self.git_path())
+
+                    path = self.file_path()
+                    if path not in stub.files:
+                        listing = [{"name": name.rsplit("/", 1)[-1], "path": name, "type": "file",
+                                    "sha": stub.blob_sha(content)}
+                                   for name, content in stub.files.items() if name.startswith(f"{path}/")]
+                        if listing:
+                            return self.reply(200, listing)
+                        return self.reply(404, {"message": "Not Found"})
+
+                    content = stub.files[path]
+                    etag = f'"{stub.blob_sha(content)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    return self.reply(200, {
+                        "path": path,
+                        "sha": stub.blob_sha(content),
+                        "encoding": "base64",
+                        "content": base64.b64encode(content).decode("utf-8")
+                    }, headers={"ETag": etag})
+
+            def get_git_object(self, path: str):
+                if path.startswith("ref/heads/"):
+                    return self.reply(200, {"ref": f"refs/heads/{path[10:]}", "object": {"sha": stub.head}})
+                if path.startswith("commits/") and path[8:] in stub.commits:
+                    return self.reply(200, {"sha": path[8:], "tree": {"sha": stub.commits[path[8:]]["tree"]}})
+                return self.reply(404, {"message": "Not Found"})
+
+            def do_POST(self):
+                with stub.lock:
+                    stub.requests.append(("POST", self.path))
+                    path = self.git_path()
+                    body = self.read_json()
+
+                    if path == "blobs":
+                        content = base64.b64decode(body["content"]) if body.get("encoding") == "base64" \
+                            else body["content"].encode("utf-8")
+                        sha = stub.blob_sha(content)
+                        stub.blobs[sha] = content
+                        return self.reply(201, {"sha": sha})
+                    if path == "trees":
+                        entries = dict(stub.trees[body["base_tree"]])
+                        entries.update({entry["path"]: entry["sha"] for entry in body["tree"]})
+                        return self.reply(201, {"sha": stub.store_tree(entries)})
+                    if path == "commits":
+                        sha = stub.store_commit(body["tree"], body["parents"][0])
+                        return self.reply(201, {"sha": sha})
+                    return self.reply(404, {"message": "Not Found"})
+
+            def do_PATCH(self):
+                with stub.lock:
+                    stub.requests.append(("PATCH", self.path))
+                    body = self.read_json()
+                    commit = stub.commits.get(body["sha"])
+                    if commit is None or commit["parent"] != stub.head:
+                        return self.reply(422, {"message": "Update is not a fast forward"})
+
+                    stub.head = body["sha"]
+                    stub.files = {name: stub.blobs[sha] for name, sha in stub.trees[commit["tree"]].items()}
+                    return self.reply(200, {"object": {"sha": stub.head}})
+
+            def do_PUT(self):
+                with stub.lock:
+                    stub.requests.append(("PUT", self.path))
+                    path = self.file_path()
+                    body = self.read_json()
+                    current = stub.files.get(path)
+                    if current is not None and body.get("sha") != stub.blob_sha(current):
+                        return self.reply(409, {"message": "sha does not match"})
+                    content = base64.b64decode(body["content"])
+                    stub.write_file(path, content)
+                    return self.reply(201 if current is None else 200,
+                                      {"content": {"path": path, "sha": stub.blob_sha(content)}})
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def github_api_stub(monkeypatch):
+    stub = GitHubApiStub()
+    stub.start()
+    monkeypatch.setenv("GITHUB_API_URL", stub.url)
+    monkeypatch.setenv("GITHUB_USERNAME", "penguin-user")
+    monkeypatch.setenv("GITHUB_REPO", "penguin-repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    monkeypatch.setenv("GITHUB_BRANCH", "main")
+    yield stub
+    stub.stop()
@@ -0,0 +1,44 @@
+import asyncio
+import numpy as np
+import pytest
+from Models.model_trainer import ModelTrainer
+from Models.model_loader import LoadedModel
+from Models.compiled_knn_engine import CompiledKnnEngine
+from Models.batch_prediction_engine import BatchPredictionEngine
+
+
+def build_model() -> LoadedModel:
+    trainer = ModelTrainer()
+    asyncio.run(trainer.train_model())
+    loaded = LoadedModel("v-test", trainer.get_model(), trainer.get_label_encoder(), None,
+                         trainer.get_training_features())
+    loaded.compiled_engine = CompiledKnnEngine(loaded.model)
+    return loaded
+
+
+def test_batch_matches_pipeline_probabilities():
+    model = build_model()
+    engine = BatchPredictionEngine(None)
+    # Grid points, off-grid values, a duplicate and points far outside the training ranges
+    features = np.array([[39.1, 181.0], [45.25, 200.3], [50.0, 222.0], [39.1, 181.0], [10.0, 100.0],
+                         [70.0, 260.0], [46.5, 195.0]])
+
+    result = engine.predict(features, model=model)
+    expected = model.model.predict_proba(features)
+
+    np.testing.assert_array_equal(result.labels, model.class_names[expected.argmax(axis=1)])
+    np.testing.assert_array_equal(result.probabilities, np.round(expected, 2))
+    assert result.model_version == "v-test"
+    assert [response.prediction for response in result.to_responses()] == result.labels.tolist()
+
+
+def test_rows_with_nan_are_rejected_like_the_pipeline():
+    model = build_model()
+    engine = BatchPredictionEngine(None)
+    features = np.array([[39.1, 181.0], [np.nan, 200.0], [50.0, 222.0]])
+
+    with pytest.raises(ValueError):
+        model.model.predict_proba(features)
+    # The whole batch fails instead of labelling the NaN row
+    with pytest.raises(ValueError):
+        engine.predict(features, model=model)
@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from Models.model_loader import ModelLoader
+from Models.hyperparameter_search import build_pipeline
+from Models.compiled_knn_engine import CompiledKnnEngine
+from Infrastructure.app_constants import AppConstants
+
+
+def build_data(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(32, 60, 300), rng.uniform(170, 232, 300)]).round(1)
+    y = (X[:, 0] > 45).astype(int) + (X[:, 1] > 205).astype(int)
+    queries = np.vstack([X, np.column_stack([rng.uniform(25, 70, 2_000), rng.uniform(160, 245, 2_000)]).round(1)])
+    return X, y, queries
+
+
+def test_compiled_engine_is_identical_to_pipeline():
+    X, y, queries = build_data()
+    for hyperparameters in [{"n_neighbors": 5},
+                            {"n_neighbors": 9, "weights": "distance", "metric": "manhattan"},
+                            {"n_neighbors": 3, "weights": "distance", "features": ["flipper_length_mm"]}]:
+        pipeline = build_pipeline(hyperparameters, AppConstants.feature_columns).fit(X, y)
+        engine = CompiledKnnEngine(pipeline)
+
+        np.testing.assert_array_equal(engine.predict_proba(queries), pipeline.predict_proba(queries))
+        assert engine.verify_parity(pipeline, X, sample_rows=500)["max_probability_error"] == 0.0
+
+
+def test_alternative_backends_agree_with_pipeline_neighbours():
+    X, y, queries = build_data(seed=1)
+    pipeline = build_pipeline({"n_neighbors": 5, "weights": "distance"}, AppConstants.feature_columns).fit(X, y)
+    expected = pipeline.predict_proba(queries)
+
+    for algorithm in ("kd_tree", "ball_tree", "brute"):
+        engine = CompiledKnnEngine(pipeline, algorithm=algorithm, brute_chunk_rows=256)
+        np.testing.assert_allclose(engine.predict_proba(queries), expected, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(engine.predict_proba(queries[:1]), expected[:1], rtol=0, atol=1e-12)
+
+
+def test_large_batches_are_handed_back_to_the_pipeline():
+    X, y, queries = build_data(seed=2)
+    pipeline = build_pipeline({"n_neighbors": 5}, AppConstants.feature_columns).fit(X, y)
+    engine = CompiledKnnEngine(pipeline, max_batch_rows=64)
+    compiled_calls = []
+    compute_proba = engine.compute_proba
+    engine.compute_proba = lambda features: compiled_calls.append(len(features)) or compute_proba(features)
+
+    np.testing.assert_array_equal(engine.predict_proba(queries[:64]), pipeline.predict_proba(queries[:64]))
+    np.testing.assert_array_equal(engine.predict_proba(queries), pipeline.predict_proba(queries))
+
+    assert compiled_calls == [64]
+
+
+def test_missing_sklearn_internals_fall_back_to_the_pipeline():
+    X, y, queries = build_data(seed=3)
+    pipeline = build_pipeline({"n_neighbors": 5}, AppConstants.feature_columns).fit(X, y)
+    del pipeline.named_steps["knn"]._fit_method
+
+    with pytest.raises(ValueError, match="fitted KNN state"):
+        CompiledKnnEngine(pipeline)
+    assert ModelLoader().build_compiled_engine(SimpleNamespace(model=pipeline, training_features=X)) is None
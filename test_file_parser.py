@@ -0,0 +1,61 @@
+import io
+import asyncio
+import pytest
+import numpy as np
+from openpyxl import Workbook
+from fastapi import UploadFile
+from Utility.file_parser import FileParser
+
+
+def csv_upload(text: str, filename: str = "penguins.csv") -> UploadFile:
+    return UploadFile(file=io.BytesIO(text.encode("utf-8")), filename=filename)
+
+
+def xlsx_upload(rows) -> UploadFile:
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return UploadFile(file=buffer, filename="penguins.xlsx")
+
+
+def collect(upload: UploadFile, chunk_size: int):
+    async def scenario():
+        return [chunk async for chunk in FileParser.iter_penguin_feature_chunks(upload, chunk_size)]
+    return asyncio.run(scenario())
+
+
+def test_csv_is_streamed_in_chunks_with_unused_columns_dropped():
+    lines = ["species,bill_length_mm,island,flipper_length_mm"]
+    lines += [f"Adelie,{30 + index / 10},Torgersen,{180 + index}" for index in range(7)]
+
+    chunks = collect(csv_upload("\n".join(lines)), chunk_size=3)
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    np.testing.assert_array_equal(np.vstack(chunks)[:, 1], np.arange(180, 187))
+    assert np.vstack(chunks)[0].tolist() == [30.0, 180.0]
+
+
+def test_xlsx_is_streamed_in_chunks_across_the_boundary():
+    rows = [["flipper_length_mm", "bill_length_mm"]] + [[200 + index, 40 + index] for index in range(5)]
+
+    chunks = collect(xlsx_upload(rows), chunk_size=2)
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    # Columns come back in the model's order, whatever their order in the sheet
+    assert np.vstack(chunks)[-1].tolist() == [44.0, 204.0]
+
+
+def test_missing_columns_and_bad_values_are_reported():
+    with pytest.raises(ValueError, match="Missing required columns"):
+        collect(csv_upload("bill_length_mm,body_mass_g\n39.1,3750\n"), chunk_size=10)
+
+    # Row numbers are spreadsheet rows, counted across chunk boundaries
+    text = "bill_length_mm,flipper_length_mm\n39.1,181\n39.5,186\n40.3,195\nabc,193\n"
+    with pytest.raises(ValueError, match=r"rows \[5\]"):
+        collect(csv_upload(text), chunk_size=2)
+
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        collect(csv_upload("bill_length_mm,flipper_length_mm\n", filename="penguins.txt"), chunk_size=10)
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from Services.github_uploader import GitHubUploader, GitHubConflictError
+
+
+def test_requests_share_one_pooled_client_until_closed(github_api_stub):
+    github_api_stub.write_file("Github_Prediction_Storage/predictions.csv", b"prediction\nAdelie\n")
+
+    async def scenario():
+        uploader = GitHubUploader()
+        client = uploader.get_http_client()
+        await uploader.get_github_file_sha("Github_Prediction_Storage/predictions.csv")
+        await uploader.get_github_file("Github_Prediction_Storage/other.csv")
+        shared = uploader.get_http_client() is client
+
+        await uploader.close()
+        return shared, client.is_closed, uploader.get_http_client() is not client
+
+    shared, closed, replaced = asyncio.run(scenario())
+
+    assert (shared, closed, replaced) == (True, True, True)
+
+
+def test_fetched_sha_is_reused_for_the_update(github_api_stub, monkeypatch):
+    monkeypatch.setenv("GITHUB_MIRROR_ENABLED", "false")
+    path = "Github_Prediction_Storage/predictions.csv"
+    github_api_stub.write_file(path, b"prediction\nAdelie\n")
+
+    async def scenario():
+        uploader = GitHubUploader()
+        rows, sha = await uploader.get_github_file(path)
+        uploaded = await uploader.upload_to_github(path, "prediction\nAdelie\nGentoo\n", False, sha, sha_known=True)
+        await uploader.close()
+        return rows, uploaded
+
+    rows, uploaded = asyncio.run(scenario())
+
+    assert rows == [{"prediction": "Adelie"}]
+    assert uploaded
+    # One GET for the contents, then the PUT with the SHA it returned: no second lookup
+    assert (github_api_stub.count("GET"), github_api_stub.count("PUT")) == (1, 1)
+    assert github_api_stub.files[path] == b"prediction\nAdelie\nGentoo\n"
+
+
+def test_stale_sha_raises_conflict(github_api_stub, monkeypatch):
+    monkeypatch.setenv("GITHUB_MIRROR_ENABLED", "false")
+    path = "Github_Prediction_Storage/predictions.csv"
+    github_api_stub.write_file(path, b"prediction\nAdelie\n")
+
+    async def scenario():
+        uploader = GitHubUploader()
+        _, sha = await uploader.get_github_file(path)
+        github_api_stub.write_file(path, b"prediction\nChinstrap\n")
+        try:
+            await uploader.upload_to_github(path, "prediction\nGentoo\n", False, sha, sha_known=True)
+        finally:
+            await uploader.close()
+
+    with pytest.raises(GitHubConflictError):
+        asyncio.run(scenario())
+    assert github_api_stub.files[path] == b"prediction\nChinstrap\n"
@@ -0,0 +1,46 @@
+import asyncio
+import numpy as np
+from Models.model_trainer import ModelTrainer
+from Models.grid_inference_engine import GridInferenceEngine
+from Models.compiled_knn_engine import CompiledKnnEngine
+from Models.hyperparameter_search import build_pipeline
+from Infrastructure.app_constants import AppConstants
+
+
+def build_engine():
+    trainer = ModelTrainer()
+    asyncio.run(trainer.train_model())
+    features = trainer.get_training_features()
+    return trainer.get_model(), features, GridInferenceEngine(trainer.get_model(), features)
+
+
+def test_grid_matches_pipeline_on_and_off_grid_points():
+    model, features, engine = build_engine()
+    parity = engine.verify_parity(model, features)
+
+    assert parity["label_agreement"] == 1.0
+    assert parity["max_probability_error"] == 0.0
+    assert 0.0 < parity["grid_hit_rate"] < 1.0
+
+
+def test_parity_is_checked_against_the_pipeline_not_the_grid_source():
+    model, features, _ = build_engine()
+    labels = model.predict(features)
+    other = build_pipeline({"n_neighbors": 15}, AppConstants.feature_columns).fit(features, labels)
+
+    compiled = GridInferenceEngine(CompiledKnnEngine(model), features)
+    mismatched = GridInferenceEngine(other, features)
+
+    assert compiled.verify_parity(model, features)["max_probability_error"] == 0.0
+    assert mismatched.verify_parity(model, features)["max_probability_error"] > 0.0
+
+
+def test_off_grid_and_out_of_range_queries_use_exact_model():
+    model, features, engine = build_engine()
+    queries = np.array([[39.15, 181.0], [10.0, 100.0], [70.0, 260.0], [45.2, 200.0]])
+
+    _, on_grid = engine.lookup(queries)
+
+    assert on_grid.tolist() == [False, False, False, True]
+    np.testing.assert_array_equal(engine.predict_proba(queries), model.predict_proba(queries))
+    np.testing.assert_array_equal(engine.predict_proba(queries, exact=True), model.predict_proba(queries))
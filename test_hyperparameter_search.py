@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from Infrastructure.app_constants import AppConstants
+from Models.hyperparameter_search import build_pipeline, run_search, select_candidate
+
+
+def test_search_reports_accuracy_and_timings_per_candidate():
+    data = pd.read_csv(AppConstants.training_data_path).dropna()
+    X = data[AppConstants.feature_columns].to_numpy(dtype=float)
+    y = data["species"].to_numpy()
+    search_space = {"n_neighbors": [3, 11], "weights": ["uniform"], "metric": ["euclidean"],
+                    "features": [AppConstants.feature_columns, ["bill_length_mm"]]}
+
+    results = run_search(X, y, search_space, AppConstants.feature_columns, folds=3, workers=2)
+
+    assert len(results) == 4
+    assert all(0 < result["mean_accuracy"] <= 1 and result["fit_ms"] > 0 and result["predict_ms"] > 0
+               for result in results)
+    # Both features separate the species far better than bill length alone
+    best = max(results, key=lambda result: result["mean_accuracy"])
+    assert best["features"] == AppConstants.feature_columns
+
+
+def test_selection_prefers_faster_candidates_within_tolerance():
+    results = [
+        {"n_neighbors": 21, "mean_accuracy": 0.960, "predict_us_per_row": 40.0},
+        {"n_neighbors": 3, "mean_accuracy": 0.957, "predict_us_per_row": 25.0},
+        {"n_neighbors": 1, "mean_accuracy": 0.900, "predict_us_per_row": 10.0}
+    ]
+
+    assert select_candidate(results)["n_neighbors"] == 21
+    assert select_candidate(results, tolerance=0.005)["n_neighbors"] == 3
+
+
+def test_feature_subsets_keep_the_served_input_shape():
+    model = build_pipeline({"n_neighbors": 3, "features": ["flipper_length_mm"]}, AppConstants.feature_columns)
+    model.fit(np.array([[39.0, 181.0], [40.0, 182.0], [50.0, 220.0], [51.0, 221.0]]), [0, 0, 1, 1])
+
+    assert model.predict(np.array([[0.0, 219.0]])).tolist() == [1]
@@ -1,3 +1,4 @@
+import logging
 from Services.logger_service import LoggerService
 
 
@@ -8,5 +9,28 @@ def test_logger_service():
     print("Logging complete. Check 'training_log.txt'.")
 
 
+def test_payloads_are_sampled_and_only_built_at_debug(tmp_path, monkeypatch):
+    monkeypatch.setattr(LoggerService.config, "log_payload_sample_every", 5)
+    log_path = tmp_path / "payload_log.txt"
+    logger = LoggerService("test_payload_logger", str(log_path)).get_logger()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"rows": len(builds)}
+
+    for _ in range(10):
+        LoggerService.log_payload(logger, "Payload", build)
+    assert builds == []
+
+    logger.setLevel(logging.DEBUG)
+    for _ in range(10):
+        LoggerService.log_payload(logger, "Payload", build)
+    LoggerService.flush()
+
+    assert len(builds) == 2
+    assert log_path.read_text(encoding="utf-8").count("Payload:") == 2
+
+
 if __name__ == "__main__":
     test_logger_service()
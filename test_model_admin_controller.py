@@ -0,0 +1,29 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from Controllers import model_admin_controller
+from Controllers.model_admin_controller import verify_admin_token
+
+
+def test_admin_api_fails_closed_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(model_admin_controller.registry_config, "admin_token", None)
+
+    with pytest.raises(HTTPException) as error:
+        verify_admin_token("anything")
+    assert error.value.status_code == 403
+
+
+def test_admin_api_requires_the_configured_token(monkeypatch):
+    monkeypatch.setattr(model_admin_controller.registry_config, "admin_token", "secret")
+
+    for token in (None, "", "wrong"):
+        with pytest.raises(HTTPException) as error:
+            verify_admin_token(token)
+        assert error.value.status_code == 401
+    verify_admin_token("secret")
+
+
+def test_activating_an_unknown_version_is_a_404():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(model_admin_controller.model_registry_service.activate_model("missing"))
+    assert error.value.status_code == 404
@@ -0,0 +1,37 @@
+import asyncio
+import numpy as np
+from Services.model_experiment_service import ModelExperimentService
+from test_model_loader import build_loader
+
+
+def test_shadow_compares_off_the_request_path_and_canary_routes(tmp_path, monkeypatch):
+    loader = build_loader(tmp_path, monkeypatch)
+    experiments = ModelExperimentService(loader)
+    features = np.array([[39.1, 181.0], [46.5, 215.0], [49.0, 195.0]])
+
+    async def scenario():
+        primary = (await loader.load_model()).model_version
+        loader.artifact_store.save("candidate", loader.artifact_store.load(primary))
+        await experiments.set_shadow("candidate", sample_rate=1.0)
+
+        with experiments.lease() as model:
+            experiments.observe(features, model.predict_proba(features), model, primary_ms=1.0)
+        # Nothing ran yet: the shadow prediction is a separate task on the shadow pool
+        compared_before_drain = experiments.get_stats()["compared_rows"]
+        await experiments.drain()
+
+        await experiments.set_canary("candidate", percent=100)
+        with experiments.lease() as model:
+            canary_version = model.version
+        return primary, compared_before_drain, canary_version
+
+    primary, compared_before_drain, canary_version = asyncio.run(scenario())
+    stats = experiments.get_stats()
+
+    assert compared_before_drain == 0
+    assert stats["compared_rows"] == 3
+    assert stats["agreement_rate"] == 1.0
+    assert stats["shadow_latency_ms"]["count"] == 1
+    assert canary_version == "candidate"
+    # The candidate stays loaded for the experiments even though MODEL_MAX_LOADED is 1
+    assert set(loader.models) == {primary, "candidate"}
@@ -0,0 +1,101 @@
+import shutil
+import pytest
+import asyncio
+import numpy as np
+from Models.model_loader import ModelLoader, ModelVersionUnavailableError
+from Models.model_artifact_store import ModelArtifactStore
+from Infrastructure.app_constants import AppConstants
+from Services.model_artifact_watcher import ModelArtifactWatcher
+
+
+def build_loader(tmp_path, monkeypatch) -> ModelLoader:
+    monkeypatch.setenv("MODEL_MAX_LOADED", "1")
+    loader = ModelLoader()
+    loader.artifact_store = ModelArtifactStore(str(tmp_path / "artifacts"))
+    return loader
+
+
+def test_swap_keeps_leased_model_until_it_drains(tmp_path, monkeypatch):
+    loader = build_loader(tmp_path, monkeypatch)
+    activated = []
+    loader.add_model_listener(activated.append)
+
+    async def scenario():
+        info = await loader.load_model()
+        first = info.model_version
+        loader.artifact_store.save("candidate", loader.artifact_store.load(first))
+
+        with loader.lease() as leased:
+            await loader.activate("candidate")
+            # The in-flight request keeps predicting with its own version while new requests get the candidate
+            still_loaded = first in loader.models
+            leased.predict_proba(np.array([[39.1, 181.0]]))
+        return first, leased, still_loaded
+
+    first, leased, still_loaded = asyncio.run(scenario())
+
+    assert leased.version == first
+    assert still_loaded
+    assert list(loader.models) == ["candidate"]
+    assert loader.get_version() == "candidate"
+    assert loader.artifact_store.read_active_key() == "candidate"
+    assert activated == [first, "candidate"]
+
+
+def test_watcher_activates_the_version_written_to_the_pointer(tmp_path, monkeypatch):
+    loader = build_loader(tmp_path, monkeypatch)
+    watcher = ModelArtifactWatcher(loader)
+
+    async def scenario():
+        first = (await loader.load_model()).model_version
+        loader.artifact_store.save("candidate", loader.artifact_store.load(first))
+        unchanged = await watcher.check()
+
+        loader.artifact_store.write_active_key("candidate")
+        changed = await watcher.check()
+        return unchanged, changed
+
+    unchanged, changed = asyncio.run(scenario())
+
+    assert (unchanged, changed) == (False, True)
+    assert loader.get_version() == "candidate"
+
+
+def test_activated_version_is_kept_until_the_training_data_changes(tmp_path, monkeypatch):
+    training_data = tmp_path / "penguins.csv"
+    shutil.copy(AppConstants.training_data_path, training_data)
+    monkeypatch.setattr(AppConstants, "training_data_path", str(training_data))
+
+    async def scenario():
+        loader = build_loader(tmp_path, monkeypatch)
+        first = (await loader.load_model()).model_version
+        loader.artifact_store.save("candidate", loader.artifact_store.load(first))
+        await loader.activate("candidate")
+
+        restarted = (await build_loader(tmp_path, monkeypatch).load_model()).model_version
+
+        with open(training_data, "a") as f:
+            f.write(open(training_data).read().splitlines()[1] + "\n")
+        retrained_loader = build_loader(tmp_path, monkeypatch)
+        retrained = (await retrained_loader.load_model()).model_version
+        return first, restarted, retrained, retrained_loader.artifact_store.read_active_key()
+
+    first, restarted, retrained, pointer = asyncio.run(scenario())
+
+    assert restarted == "candidate"
+    assert retrained not in (first, "candidate")
+    assert pointer == retrained
+
+
+def test_leasing_an_unloaded_version_raises_a_domain_error(tmp_path, monkeypatch):
+    loader = build_loader(tmp_path, monkeypatch)
+
+    async def scenario():
+        await loader.load_model()
+        with pytest.raises(ModelVersionUnavailableError):
+            with loader.lease("evicted"):
+                pass
+        with pytest.raises(ModelVersionUnavailableError):
+            await loader.activate("missing")
+
+    asyncio.run(scenario())
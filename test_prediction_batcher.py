@@ -0,0 +1,71 @@
+import asyncio
+import numpy as np
+from Config.inference_config import InferenceConfig
+from Services.prediction_batcher import PredictionBatcher
+
+
+def build_batcher(predict_proba, window_ms=20.0, max_items=256):
+    config = InferenceConfig(micro_batch_enabled=True, micro_batch_window_ms=window_ms,
+                             micro_batch_max_items=max_items)
+    return PredictionBatcher(predict_proba, config)
+
+
+def test_concurrent_requests_share_one_model_call():
+    calls = []
+
+    def predict_proba(features):
+        calls.append(len(features))
+        return np.column_stack([features[:, 0], features[:, 1]])
+
+    async def scenario():
+        batcher = build_batcher(predict_proba)
+        return batcher, await asyncio.gather(*(batcher.submit(float(i), float(-i)) for i in range(10)))
+
+    batcher, results = asyncio.run(scenario())
+
+    assert calls == [10]
+    assert [row.tolist() for row in results] == [[float(i), float(-i)] for i in range(10)]
+    assert batcher.get_stats()["batch_size"]["max"] == 10
+
+
+def test_full_batch_dispatches_early_and_errors_reach_every_caller():
+    calls = []
+
+    def predict_proba(features):
+        calls.append(len(features))
+        raise ValueError("model unavailable")
+
+    async def scenario():
+        batcher = build_batcher(predict_proba, window_ms=10_000, max_items=4)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(1.0, 2.0) for _ in range(4)), return_exceptions=True), timeout=5)
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+
+    assert calls == [4]
+    assert all(isinstance(result, ValueError) for result in results)
+    assert batcher.get_stats()["failed_batches"] == 1
+
+
+def test_requests_are_scored_by_the_model_they_leased():
+    class StubModel:
+        def __init__(self, value):
+            self.value = value
+            self.calls = []
+
+        def predict_proba(self, features):
+            self.calls.append(len(features))
+            return np.full((len(features), 1), self.value)
+
+    old, new = StubModel(1.0), StubModel(2.0)
+
+    async def scenario():
+        batcher = build_batcher(lambda features: None)
+        return await asyncio.gather(batcher.submit(1.0, 2.0, old), batcher.submit(1.0, 2.0, new),
+                                    batcher.submit(3.0, 4.0, old))
+
+    results = asyncio.run(scenario())
+
+    assert [row.tolist() for row in results] == [[1.0], [2.0], [1.0]]
+    assert (old.calls, new.calls) == ([2], [1])
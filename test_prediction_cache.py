@@ -0,0 +1,43 @@
+from Config.inference_config import InferenceConfig
+from Services.prediction_cache import PredictionCache
+from Dtos.Response.prediction_response import PredictionResponse
+
+
+def build_cache(**overrides):
+    return PredictionCache(InferenceConfig(**overrides))
+
+
+def build_prediction(label):
+    return PredictionResponse(prediction=label, probabilities={label: 1.0})
+
+
+def test_lru_eviction_and_model_version_keys():
+    cache = build_cache(prediction_cache_size=2)
+    first, second, third = (cache.make_key("v1", 39.1, value) for value in (181.0, 186.0, 195.0))
+
+    cache.put(first, build_prediction("Adelie"))
+    cache.put(second, build_prediction("Chinstrap"))
+    assert cache.get(first).prediction == "Adelie"
+
+    cache.put(third, build_prediction("Gentoo"))
+
+    assert cache.get(second) is None
+    assert cache.get(first).prediction == "Adelie"
+    assert cache.get(cache.make_key("v2", 39.1, 181.0)) is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_precise_inputs_expired_entries_and_invalidation_miss():
+    cache = build_cache(prediction_cache_ttl_seconds=0)
+    assert cache.make_key("v1", 39.15, 181.0) is None
+
+    key = cache.make_key("v1", 39.1, 181.0)
+    cache.put(key, build_prediction("Adelie"))
+    assert cache.get(key) is None
+    assert cache.get_stats()["expirations"] == 1
+
+    cache = build_cache()
+    cache.put(key, build_prediction("Adelie"))
+    cache.clear("v2")
+    assert cache.get(key) is None
+    assert cache.get_stats()["invalidations"] == 1
@@ -0,0 +1,37 @@
+import asyncio
+from Services.prediction_fingerprint_index import PredictionFingerprintIndex, fingerprint_row
+
+
+def build_row(bill_length_mm, timestamp="2025-05-04 00:53:15"):
+    return {"bill_length_mm": bill_length_mm, "flipper_length_mm": 181.0, "prediction": "Adelie",
+            "Adelie": 1.0, "Chinstrap": 0.0, "Gentoo": 0.0, "model_version": "v1.0",
+            "prediction_timestamp": timestamp}
+
+
+def test_fingerprint_ignores_timestamp_and_number_formatting():
+    csv_row = {**build_row("39.1", "2025-05-05 10:00:00"), "flipper_length_mm": "181"}
+    assert fingerprint_row(build_row(39.1)) == fingerprint_row(csv_row)
+    assert fingerprint_row(build_row(39.1)) != fingerprint_row(build_row(39.2))
+
+
+def test_index_filters_duplicates_and_persists_across_reloads(tmp_path):
+    index_path = str(tmp_path / "predictions.idx")
+    source_path = str(tmp_path / "predictions.csv")
+
+    async def read_source_rows():
+        return [build_row(39.1)]
+
+    async def scenario():
+        index = PredictionFingerprintIndex(index_path, source_path, merge_threshold=1)
+        await index.ensure_loaded(read_source_rows)
+        new_rows = index.filter_new([build_row(39.1), build_row(40.0), build_row(40.0, "2025-06-01 00:00:00")])
+        await index.add(new_rows)
+
+        reloaded = PredictionFingerprintIndex(index_path, source_path)
+        await reloaded.ensure_loaded(read_source_rows)
+        return new_rows, reloaded.filter_new([build_row(39.1), build_row(40.0), build_row(41.0)])
+
+    new_rows, after_reload = asyncio.run(scenario())
+
+    assert [row["bill_length_mm"] for row in new_rows] == [40.0]
+    assert [row["bill_length_mm"] for row in after_reload] == [41.0]
@@ -0,0 +1,75 @@
+import io
+import asyncio
+import pytest
+import pandas as pd
+from Services.prediction_storage_backend import ParquetPredictionStorageBackend, SqlitePredictionStorageBackend
+from test_prediction_storage_service import build_storage
+from test_prediction_write_behind_queue import build_row
+
+
+@pytest.mark.parametrize("backend", ["csv", "parquet", "sqlite"])
+def test_backends_store_and_query_the_same_rows(backend, github_api_stub, monkeypatch, tmp_path):
+    if backend == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setenv("STORAGE_BACKEND", backend)
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        storage = build_storage()
+        assert await storage.save_predictions([build_row(39.1), build_row(39.5)])
+        assert await storage.save_predictions([build_row(39.5), build_row(45.2)])
+
+        queried = await storage.query_predictions(["bill_length_mm", "prediction"],
+                                                  [("bill_length_mm", ">", 39.2)])
+        exported = [row async for block in storage.iter_stored_rows() for row in block]
+        workbook = pd.read_excel(io.BytesIO(await storage.get_predictions_excel()))
+        return storage, queried, exported, workbook
+
+    storage, queried, exported, workbook = asyncio.run(scenario())
+
+    assert storage.data_path.endswith(f".{backend}")
+    assert list(queried.columns) == ["bill_length_mm", "prediction"]
+    assert sorted(queried["bill_length_mm"]) == [39.5, 45.2]
+    assert [row[0] for row in exported] == [39.1, 39.5, 45.2]
+    assert all(isinstance(row[-1], str) for row in exported)
+    assert list(workbook.columns) == ["id", *build_row(0).keys()]
+    assert workbook["bill_length_mm"].tolist() == [39.1, 39.5, 45.2]
+
+
+def test_parquet_parts_are_compacted(tmp_path):
+    pytest.importorskip("pyarrow")
+    backend = ParquetPredictionStorageBackend(compaction_parts=2)
+    path = str(tmp_path / "predictions.parquet")
+    headers = list(build_row(0).keys())
+
+    bill_lengths = [39.1, 39.5, 40.3, 41.0, 42.2]
+    for bill_length in bill_lengths[:3]:
+        asyncio.run(backend.append(path, [build_row(bill_length)], headers))
+    first_merge = [part for part in backend.part_paths(path) if backend.part_name(part)[1] == 1]
+
+    # A new save only merges the small parts of its own tier; the first merged part is left alone
+    assert [backend.part_name(part)[1] for part in backend.part_paths(path)] == [1, 0]
+
+    for bill_length in bill_lengths[3:]:
+        asyncio.run(backend.append(path, [build_row(bill_length)], headers))
+
+    assert [backend.part_name(part)[1] for part in backend.part_paths(path)] == [2, 0]
+    assert not any(part in backend.part_paths(path) for part in first_merge)
+    assert backend.read_frame([path], ["bill_length_mm"])["bill_length_mm"].tolist() == bill_lengths
+
+
+def test_sqlite_unique_index_drops_duplicates_and_pages(tmp_path):
+    backend = SqlitePredictionStorageBackend()
+    path = str(tmp_path / "predictions.sqlite")
+    headers = list(build_row(0).keys())
+    rows = [build_row(30 + index / 10) for index in range(25)]
+
+    inserted = asyncio.run(backend.append(path, rows, headers))
+    # A duplicate with a different timestamp and integer-valued floats is still the same prediction
+    duplicate = {**rows[0], "flipper_length_mm": 181, "prediction_timestamp": "2030-01-01 00:00:00"}
+    reinserted = asyncio.run(backend.append(path, [duplicate, build_row(45.0)], headers))
+    total, page = backend.read_page([path], 20, 10)
+
+    assert (inserted, reinserted) == (25, 1)
+    assert total == 26
+    assert page["bill_length_mm"].tolist() == [32.0, 32.1, 32.2, 32.3, 32.4, 45.0]
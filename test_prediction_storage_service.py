@@ -0,0 +1,140 @@
+import io
+import json
+import asyncio
+import pandas as pd
+from Infrastructure.app_constants import AppConstants
+from Services.prediction_storage_service import PredictionStorageService
+from test_prediction_write_behind_queue import build_row
+
+
+def build_storage() -> PredictionStorageService:
+    storage = PredictionStorageService()
+    storage.class_labels = ["Adelie", "Chinstrap", "Gentoo"]
+    return storage
+
+
+def test_upload_reuses_the_fetched_sha_and_one_pooled_client(github_api_stub):
+    async def scenario():
+        storage = build_storage()
+        first = await storage.upload_prediction_to_github([build_row(39.1)])
+        client = storage.github_uploader.http_client
+        second = await storage.upload_prediction_to_github([build_row(39.5)])
+        reused = storage.github_uploader.http_client is client
+        await storage.github_uploader.close()
+        return first, second, reused
+
+    first, second, reused = asyncio.run(scenario())
+
+    assert first and second and reused
+    # First flush: CSV fetch and Excel SHA lookup, then both PUTs. Second flush: only the CSV PUT, from the mirror
+    assert github_api_stub.count("GET", AppConstants.github_csv_path) == 1
+    assert github_api_stub.count("PUT", AppConstants.github_csv_path) == 2
+    assert github_api_stub.count("GET", AppConstants.github_excel_path) == 1
+    assert github_api_stub.count("PUT", AppConstants.github_excel_path) == 1
+
+
+def test_mirror_skips_downloads_and_merges_after_a_conflict(github_api_stub):
+    async def scenario():
+        storage = build_storage()
+        await storage.upload_prediction_to_github([build_row(39.1)])
+        downloads_after_first = github_api_stub.count("GET", AppConstants.github_csv_path)
+
+        # Our own upload is trusted, so the next flush goes straight to the PUT
+        await storage.upload_prediction_to_github([build_row(39.5)])
+        downloads_after_second = github_api_stub.count("GET", AppConstants.github_csv_path)
+
+        # Another writer adds a row: the stale SHA conflicts, and the retry re-fetches and merges
+        external = github_api_stub.files[AppConstants.github_csv_path].decode("utf-8")
+        external += "50.0,220.0,Gentoo,0.0,0.0,1.0,v1.0,2025-05-04 20:40:00\n"
+        github_api_stub.files[AppConstants.github_csv_path] = external.encode("utf-8")
+        uploaded = await storage.upload_prediction_to_github([build_row(40.3)])
+
+        # Once a download has recorded the ETag, re-reading an unchanged file is answered with 304
+        storage.github_uploader.mirror.get(AppConstants.github_csv_path).trusted = False
+        await storage.github_uploader.get_github_file(AppConstants.github_csv_path)
+        await storage.github_uploader.get_github_file(AppConstants.github_csv_path)
+        stats = storage.github_uploader.mirror.get_stats()
+        await storage.github_uploader.close()
+        return downloads_after_first, downloads_after_second, uploaded, stats
+
+    downloads_after_first, downloads_after_second, uploaded, stats = asyncio.run(scenario())
+    csv_lines = github_api_stub.files[AppConstants.github_csv_path].decode("utf-8").strip().splitlines()
+
+    assert downloads_after_first == downloads_after_second == 1
+    assert uploaded
+    assert len(csv_lines) == 5
+    assert stats["conflicts"] == 1
+    assert stats["not_modified"] == 1
+
+
+def test_bulk_commit_mode_writes_both_files_in_one_commit(github_api_stub, monkeypatch):
+    monkeypatch.setenv("GITHUB_BULK_COMMIT_ENABLED", "true")
+
+    async def scenario():
+        storage = build_storage()
+        first = await storage.upload_prediction_to_github([build_row(39.1)])
+
+        # A commit by another writer moves the branch: the stale CSV is re-fetched and merged before committing
+        external = github_api_stub.files[AppConstants.github_csv_path].decode("utf-8")
+        github_api_stub.write_file(AppConstants.github_csv_path,
+                                   (external + "50.0,220.0,Gentoo,0.0,0.0,1.0,v1.0,2025-05-04 20:40:00\n").encode())
+        second = await storage.upload_prediction_to_github([build_row(39.5)])
+        await storage.github_uploader.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    csv_lines = github_api_stub.files[AppConstants.github_csv_path].decode("utf-8").strip().splitlines()
+
+    assert first and second
+    assert github_api_stub.count("PUT") == 0
+    assert github_api_stub.count("PATCH", "/git/refs/heads/main") == 2
+    assert AppConstants.github_excel_path in github_api_stub.files
+    assert len(csv_lines) == 4
+
+
+def test_sharded_storage_only_rewrites_the_active_shard(github_api_stub, monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_SHARDING_ENABLED", "true")
+    monkeypatch.setenv("STORAGE_SHARD_MAX_ROWS", "2")
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        storage = build_storage()
+        for bill_length in (39.1, 39.5, 40.3):
+            assert await storage.upload_prediction_to_github([build_row(bill_length)])
+            assert await storage.save_predictions([build_row(bill_length)])
+
+        exported = [row async for block in storage.iter_stored_rows(chunk_size=1) for row in block]
+        await storage.github_uploader.close()
+        return storage, exported
+
+    storage, exported = asyncio.run(scenario())
+    manifest = json.loads(github_api_stub.files[AppConstants.github_manifest_path])
+    shard_paths = [shard["path"] for shard in manifest["shards"]]
+
+    assert len(shard_paths) == 2
+    assert [len(github_api_stub.files[path].decode("utf-8").strip().splitlines()) for path in shard_paths] == [3, 2]
+    assert AppConstants.github_csv_path not in github_api_stub.files
+    assert github_api_stub.count("PUT", AppConstants.github_manifest_path) == 2
+
+    assert [shard["rows"] for shard in storage.local_manifest.shards] == [2, 1]
+    assert [row[0] for row in exported] == [39.1, 39.5, 40.3]
+
+
+def test_excel_snapshot_sees_rows_saved_by_another_worker(github_api_stub, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        first_worker, second_worker = build_storage(), build_storage()
+        await first_worker.save_predictions([build_row(39.1)])
+        before = await first_worker.get_predictions_excel()
+        cached = await first_worker.get_predictions_excel()
+
+        await second_worker.save_predictions([build_row(39.5)])
+        after = await first_worker.get_predictions_excel()
+        return before, cached, after, first_worker.local_excel_cache.builds
+
+    before, cached, after, builds = asyncio.run(scenario())
+
+    assert cached is before
+    assert builds == 2
+    assert pd.read_excel(io.BytesIO(after))["bill_length_mm"].tolist() == [39.1, 39.5]
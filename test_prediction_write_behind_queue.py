@@ -0,0 +1,122 @@
+import os
+import asyncio
+from Config.write_behind_config import WriteBehindConfig
+from Infrastructure.app_constants import AppConstants
+from Services.prediction_storage_service import PredictionStorageService
+from Services.prediction_write_behind_queue import PredictionWriteBehindQueue
+
+
+def build_row(bill_length_mm: float) -> dict:
+    return {
+        "bill_length_mm": bill_length_mm,
+        "flipper_length_mm": 181.0,
+        "prediction": "Adelie",
+        "Adelie": 1.0,
+        "Chinstrap": 0.0,
+        "Gentoo": 0.0,
+        "model_version": "v1.0",
+        "prediction_timestamp": "2025-05-04 20:35:00"
+    }
+
+
+def build_queue(tmp_path, **overrides) -> PredictionWriteBehindQueue:
+    storage = PredictionStorageService()
+    storage.class_labels = ["Adelie", "Chinstrap", "Gentoo"]
+    config = WriteBehindConfig(spool_path=str(tmp_path / "spool.jsonl"), **overrides)
+    return PredictionWriteBehindQueue(storage.upload_prediction_to_github, config)
+
+
+def test_rows_are_coalesced_into_one_upload_per_window(github_api_stub, tmp_path):
+    async def scenario():
+        queue = build_queue(tmp_path, flush_interval_seconds=0.2)
+        await queue.start()
+        for bill_length in (39.1, 39.5, 40.3):
+            assert await queue.enqueue([build_row(bill_length)])
+        await asyncio.sleep(0.6)
+        await queue.stop()
+        return queue.get_stats()
+
+    stats = asyncio.run(scenario())
+    csv_content = github_api_stub.files[AppConstants.github_csv_path].decode("utf-8")
+
+    assert stats["flushes"] == 1
+    assert stats["flushed_rows"] == 3
+    assert stats["pending_rows"] == 0
+    assert github_api_stub.count("PUT", AppConstants.github_csv_path) == 1
+    assert len(csv_content.strip().splitlines()) == 4
+
+
+def test_queue_is_bounded_and_reports_rejections(github_api_stub, tmp_path):
+    async def scenario():
+        queue = build_queue(tmp_path, max_pending_rows=2)
+        accepted = [await queue.enqueue([build_row(40.0 + i)]) for i in range(3)]
+        return accepted, queue.get_stats()
+
+    accepted, stats = asyncio.run(scenario())
+
+    assert accepted == [True, True, False]
+    assert stats["rejected_rows"] == 1
+    assert stats["pending_rows"] == 2
+
+
+def test_spooled_rows_survive_a_restart(github_api_stub, tmp_path):
+    async def enqueue_without_flush():
+        queue = build_queue(tmp_path)
+        await queue.enqueue([build_row(41.0), build_row(42.0)])
+        queue.release_spool()
+
+    async def restart_and_flush():
+        queue = build_queue(tmp_path)
+        pending = queue.get_stats()["pending_rows"]
+        flushed = await queue.flush()
+        return pending, flushed, queue.spool_path
+
+    asyncio.run(enqueue_without_flush())
+    pending, flushed, spool_path = asyncio.run(restart_and_flush())
+
+    assert pending == 2
+    assert flushed
+    assert sorted(path.name for path in tmp_path.glob("spool.*.jsonl")) == [os.path.basename(spool_path)]
+    assert open(spool_path).read() == ""
+    assert AppConstants.github_csv_path in github_api_stub.files
+
+
+def test_workers_sharing_a_spool_directory_keep_their_own_rows(tmp_path):
+    flushed, failing = {}, set()
+
+    def build_worker(name):
+        async def flush_handler(rows):
+            if name in failing:
+                return False
+            flushed.setdefault(name, []).extend(row["bill_length_mm"] for row in rows)
+            return True
+        config = WriteBehindConfig(spool_path=str(tmp_path / "spool.jsonl"))
+        return PredictionWriteBehindQueue(flush_handler, config)
+
+    async def scenario():
+        first, second = build_worker("first"), build_worker("second")
+        await first.enqueue([build_row(41.0), build_row(42.0)])
+        await second.enqueue([build_row(43.0)])
+
+        # A worker starting next to live ones adopts none of their rows
+        late = build_worker("late")
+        late_pending = late.get_stats()["pending_rows"]
+
+        await first.flush()
+        second_pending = second.get_stats()["pending_rows"]
+
+        # The second worker exits with its upload failing; a fresh worker picks its spool up exactly once
+        failing.add("second")
+        await second.stop()
+        restarted = build_worker("restarted")
+        await restarted.flush()
+        return late_pending, second_pending, restarted.get_stats()["pending_rows"]
+
+    late_pending, second_pending, restarted_pending = asyncio.run(scenario())
+
+    assert late_pending == 0
+    assert second_pending == 1
+    assert restarted_pending == 0
+    assert flushed["first"] == [41.0, 42.0]
+    assert flushed["restarted"] == [43.0]
+    assert "late" not in flushed
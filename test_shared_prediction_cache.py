@@ -0,0 +1,34 @@
+import asyncio
+import numpy as np
+import pytest
+from Config.inference_config import InferenceConfig
+from Services.redis_service import RedisService
+from Services.shared_prediction_cache import SharedPredictionCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_batch_reads_in_one_round_trip_and_computes_only_misses():
+    computed = []
+
+    async def compute(features):
+        computed.append(features.tolist())
+        return np.column_stack([features[:, 0] / 100, features[:, 1] / 1000, np.full(len(features), 1 / 3)])
+
+    async def scenario():
+        redis_service = RedisService(fakeredis.FakeAsyncRedis())
+        cache = SharedPredictionCache(InferenceConfig(shared_prediction_cache_enabled=True), redis_service)
+
+        first = np.array([[39.1, 181.0], [46.5, 195.0], [39.1, 181.0]])
+        second = np.array([[46.5, 195.0], [50.0, 220.0]])
+        first_probas = await cache.predict_proba("key", first, 3, compute)
+        second_probas = await cache.predict_proba("key", second, 3, compute)
+        return cache, first_probas, second_probas
+
+    cache, first_probas, second_probas = asyncio.run(scenario())
+
+    assert computed == [[[39.1, 181.0], [46.5, 195.0]], [[50.0, 220.0]]]
+    np.testing.assert_array_equal(first_probas[0], first_probas[2])
+    np.testing.assert_array_equal(second_probas[0], first_probas[1])
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 3
@@ -0,0 +1,29 @@
+import numpy as np
+from Models.model_trainer import ModelTrainer
+from Models.surrogate_model import create_surrogate
+
+
+def test_surrogates_learn_teacher_probabilities():
+    rng = np.random.default_rng(0)
+    centers = np.array([[39.0, 190.0], [49.0, 196.0], [47.5, 217.0]])
+    X = np.vstack([rng.normal(center, [2.5, 6.0], size=(100, 2)) for center in centers])
+    teacher = np.repeat(np.eye(3), 100, axis=0)
+
+    for kind in ("logistic", "gaussian"):
+        surrogate = create_surrogate(kind).fit(X, teacher)
+        probas = surrogate.predict_proba(X)
+
+        np.testing.assert_allclose(probas.sum(axis=1), 1.0)
+        assert (probas.argmax(axis=1) == surrogate.predict(X)).all()
+        assert surrogate.agreement(X, teacher.argmax(axis=1)) > 0.95
+
+
+def test_trainer_distils_surrogate_and_reports_agreement(monkeypatch):
+    monkeypatch.setenv("TRAINING_SURROGATE_MODEL", "logistic")
+    trainer = ModelTrainer()
+    info = trainer.fit()
+
+    assert info.surrogate.kind == "logistic"
+    assert info.surrogate.knn_agreement >= 0.9
+    assert trainer.get_artifact_parameters()["surrogate_model"] == "logistic"
+    assert trainer.get_surrogate().predict(np.array([[39.1, 181.0]])).shape == (1,)